@@ -0,0 +1,101 @@
+"""
+Benchmark YAML emission of markdown_to_yaml on large Markdown documents.
+大きなMarkdownドキュメントでmarkdown_to_yamlのYAML出力をベンチマークする
+
+Compares the pure-Python emitter (yaml.dump) with md_to_yaml.dump_yaml, which uses
+libyaml's CSafeDumper when it produces identical output, and checks that both outputs
+are byte-for-byte equal.
+
+Usage:
+    python benchmarks/yaml_emit_benchmark.py [--repeat N] [file.md ...]
+
+Without files, synthetic documents are generated: one the C emitter can handle and one
+with indented lines, whose content falls back to the Python emitter while its links and
+images still use libyaml.
+"""
+import argparse
+import os
+import sys
+import time
+
+import yaml
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from deepwiki_to_md.compression import read_text  # noqa: E402
+from deepwiki_to_md.md_to_yaml import FastDumper, _libyaml_compatible, dump_yaml, markdown_to_dict  # noqa: E402
+
+SECTION = """## Section {index}
+
+This section explains how the component works, with a [link](https://example.com/{index})
+and an image ![diagram](images/{index}.png). Each paragraph is long enough to wrap when it is
+emitted as YAML, which is where most of the time goes for big wikis.
+
+- First point about the design
+- Second point about the implementation
+1. Step one
+2. Step two
+
+| Name | Value |
+|------|-------|
+| a    | {index} |
+
+"""
+
+INDENTED_SECTION = """## Section {index}
+
+- Item with nested content, see [the guide](https://example.com/guide/{index})
+  - Nested item {index} ![figure](images/{index}.png)
+    continued on an indented line
+
+```python
+def example_{index}():
+    return {index}
+```
+
+"""
+
+
+def best_time(func, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def run(name, markdown_content, repeat):
+    data = markdown_to_dict(markdown_content)
+    python_yaml = yaml.dump(data, allow_unicode=True, sort_keys=False)
+    fast_yaml = dump_yaml(data)
+
+    python_time = best_time(lambda: yaml.dump(data, allow_unicode=True, sort_keys=False), repeat)
+    fast_time = best_time(lambda: dump_yaml(data), repeat)
+    compatible = [FastDumper is not None and _libyaml_compatible(value) for value in data.values()]
+    emitter = "libyaml" if all(compatible) else "mixed" if any(compatible) else "python"
+    print(f"{name}: {len(markdown_content) / 1024:.0f} KiB, emitter={emitter}, "
+          f"yaml.dump {python_time * 1000:.1f} ms, dump_yaml {fast_time * 1000:.1f} ms "
+          f"({python_time / fast_time:.1f}x), identical={python_yaml == fast_yaml}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark YAML emission of markdown_to_yaml")
+    parser.add_argument('files', nargs='*', help="Markdown files to benchmark (.md, .md.gz, .md.zst)")
+    parser.add_argument('--repeat', type=int, default=5, help="Number of runs; the best time is reported")
+    args = parser.parse_args()
+
+    if FastDumper is None:
+        print("PyYAML was built without libyaml; dump_yaml uses the Python emitter")
+
+    if args.files:
+        for path in args.files:
+            run(path, read_text(path), args.repeat)
+    else:
+        run("synthetic", "# Title\n\n" + "".join(SECTION.format(index=i) for i in range(2000)), args.repeat)
+        run("synthetic-indented", "# Title\n\n" + "".join(INDENTED_SECTION.format(index=i) for i in range(2000)),
+            args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+import io
+import json
+import logging
+import os
+import tarfile
+import time
+import warnings
+import zipfile
+from typing import Dict, Optional
+
+from .compression import check_compression, compressed_path, zstd_stream_writer
+from .output_writer import (Content, OutputWriter, _fsync_directory, atomic_write, content_to_bytes,
+                            split_output_path)
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Supported archive types
+# 対応するアーカイブ形式
+ARCHIVE_TYPES = ("zip", "tar")
+
+# Name of the index member written into every archive
+# 各アーカイブに書き込むインデックスのメンバー名
+INDEX_MEMBER = "index.json"
+
+
+class _LibraryArchive:
+    """
+    1つのライブラリのアーカイブ（一時ファイルに書き込み、完了時にリネームする）
+    The archive of one library, written to a temporary file and renamed when finalized
+    """
+
+    def __init__(self, library: str, path: str, archive_type: str, compression: Optional[str] = None):
+        self.library = library
+        self.path = path
+        self.tmp_path = f"{path}.tmp"
+        self.archive_type = archive_type
+        self.members: Dict[str, int] = {}
+        # Whether a zip member was written more than once (see _drop_replaced_members)
+        # zipのメンバーが複数回書き込まれたかどうか
+        self._replaced = False
+        self._stream = None
+        if archive_type == "zip":
+            self._archive = zipfile.ZipFile(self.tmp_path, 'w', compression=zipfile.ZIP_DEFLATED)
+        elif compression == "gzip":
+            self._archive = tarfile.open(self.tmp_path, 'w:gz')
+        elif compression == "zstd":
+            # tarfile has no zstd mode here, so stream the tar through a zstd compressor
+            # tarfileはzstdに対応していないため、zstd圧縮ストリーム経由でtarを書き込む
+            self._stream = zstd_stream_writer(open(self.tmp_path, 'wb'))
+            self._archive = tarfile.open(fileobj=self._stream, mode='w|')
+        else:
+            self._archive = tarfile.open(self.tmp_path, 'w')
+
+    def add(self, name: str, data: bytes) -> None:
+        if self.archive_type == "zip":
+            if name in self.members:
+                self._replaced = True
+            with warnings.catch_warnings():
+                # 重複したメンバーは確定時に取り除く
+                # Duplicate members are removed when the archive is finalized
+                warnings.filterwarnings("ignore", message="Duplicate name", category=UserWarning)
+                self._archive.writestr(name, data)
+        else:
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            info.mtime = int(time.time())
+            self._archive.addfile(info, io.BytesIO(data))
+        self.members[name] = len(data)
+
+    def finalize(self, fsync: bool) -> None:
+        index = {
+            "library": self.library,
+            "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "files": [{"path": name, "size": size} for name, size in self.members.items()],
+        }
+        self.add(INDEX_MEMBER, json.dumps(index, ensure_ascii=False, indent=1).encode('utf-8'))
+        self._archive.close()
+        if self._stream is not None:
+            self._stream.close()
+        if self._replaced:
+            self._drop_replaced_members()
+        if fsync:
+            with open(self.tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.replace(self.tmp_path, self.path)
+
+    def _drop_replaced_members(self) -> None:
+        """
+        Rewrite the zip keeping only the last copy of each member, as os.replace does for files.
+        各メンバーの最後のコピーだけを残してzipを書き直す（ファイルに対するos.replaceと同じ）
+
+        Zip members cannot be replaced in place, and extractors disagree about which of
+        several members with the same name wins. Tar extractors always take the last one.
+        """
+        rebuilt_path = f"{self.tmp_path}.rebuild"
+        with zipfile.ZipFile(self.tmp_path, 'r') as source:
+            latest = {info.filename: info for info in source.infolist()}
+            with zipfile.ZipFile(rebuilt_path, 'w', compression=zipfile.ZIP_DEFLATED) as target:
+                for info in latest.values():
+                    target.writestr(info, source.read(info))
+        os.replace(rebuilt_path, self.tmp_path)
+
+
+class ArchiveWriter(OutputWriter):
+    """
+    ライブラリごとに1つのアーカイブ（zip/tar）へ出力をストリーミングするライター
+    Writer that streams every page and section of a library into one zip or tar archive
+
+    Paths handed to write() are interpreted relative to the output directory: the first
+    component is the library, the rest becomes the member name. For example
+    <output_dir>/cpython/md/1-overview_intro.md is stored as md/1-overview_intro.md in
+    <output_dir>/cpython.zip. Each archive also gets an index.json member listing its
+    files. Archives are built under a temporary name and only appear once the writer is
+    closed, so an interrupted run never leaves a truncated archive behind.
+    """
+
+    writes_files = False
+
+    def __init__(self, output_dir: str, archive_type: str = "zip", fsync: bool = False,
+                 batch_size: int = 64, max_queue: int = 1024, compression: Optional[str] = None):
+        """
+        Initialize the ArchiveWriter.
+
+        Args:
+            output_dir (str): The base output directory; archives are created directly inside it.
+            archive_type (str): "zip" (deflate-compressed) or "tar".
+            fsync (bool): Whether to fsync archives when they are finalized.
+            batch_size (int): Maximum number of queued writes handled per batch.
+            max_queue (int): Maximum number of pending writes before write() blocks.
+            compression (str, optional): "gzip" or "zstd" to compress tar archives as a whole
+                (<library>.tar.gz / <library>.tar.zst). Zip archives are always deflate-compressed.
+        """
+        if archive_type not in ARCHIVE_TYPES:
+            raise ValueError(f"Invalid archive type: {archive_type}. Use one of {', '.join(ARCHIVE_TYPES)}.")
+        check_compression(compression)
+        super().__init__(fsync=fsync, batch_size=batch_size, max_queue=max_queue)
+        self.output_dir = output_dir
+        self.archive_type = archive_type
+        self.archive_compression = compression if archive_type == "tar" else None
+        self._archives: Dict[str, _LibraryArchive] = {}
+
+    def archive_path(self, library: str) -> str:
+        """
+        Return the path of the archive for a library.
+        ライブラリのアーカイブのパスを返す
+        """
+        return compressed_path(os.path.join(self.output_dir, f"{library}.{self.archive_type}"),
+                               self.archive_compression)
+
+    def _write_item(self, path: str, content: Content, encoding: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        split = split_output_path(self.output_dir, path)
+        if split is None:
+            # 出力ディレクトリ外のパスは通常のファイルとして書き込む
+            # Paths outside the output directory are written as regular files
+            logger.warning(f"{path} is outside {self.output_dir}; writing it as a regular file")
+            self._ensure_dir(os.path.dirname(path))
+            atomic_write(path, content, fsync=self.fsync, encoding=encoding)
+            return
+
+        library, member = split
+        archive = self._archives.get(library)
+        if archive is None:
+            self._ensure_dir(self.output_dir)
+            archive = _LibraryArchive(library, self.archive_path(library), self.archive_type,
+                                      self.archive_compression)
+            self._archives[library] = archive
+        archive.add(member, content_to_bytes(content, encoding))
+
+    def _end_batch(self, stopping: bool) -> None:
+        if not stopping:
+            return
+        # 書き込み終了時にインデックスを追加してアーカイブを確定する
+        # When closing, add the index and finalize every archive
+        for library, archive in list(self._archives.items()):
+            archive.finalize(self.fsync)
+            logger.info(f"Saved archive: {archive.path} ({len(archive.members)} files)")
+            del self._archives[library]
+        if self.fsync:
+            _fsync_directory(self.output_dir)
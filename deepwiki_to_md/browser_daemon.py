@@ -0,0 +1,522 @@
+import argparse
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import time
+import urllib.request
+
+from .browser_options import LEAN_ARGUMENTS, attach_options
+
+# ログ設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Defaults: DevTools port of the daemon browser and seconds without clients before it exits
+# デフォルト: デーモンのブラウザのDevToolsポートと、クライアントがいない状態で終了するまでの秒数
+DEFAULT_PORT = 9222
+DEFAULT_IDLE_TIMEOUT = 15 * 60
+
+# Seconds between idle checks of the daemon, and age after which a lease is treated as stale
+# デーモンのアイドル確認の間隔（秒）と、リースを無効とみなす経過時間
+CHECK_INTERVAL = 5
+STALE_LEASE_SECONDS = 6 * 60 * 60
+
+# Seconds the daemon waits for its Chrome to answer before giving up
+# デーモンがChromeの応答を待つ最大秒数
+STARTUP_TIMEOUT = 30
+
+# Executable names and paths tried when looking for Chrome
+# Chromeを探すときに試す実行ファイル名とパス
+CHROME_CANDIDATES = [
+    "google-chrome", "google-chrome-stable", "chromium", "chromium-browser", "chrome",
+    "/Applications/Google Chrome.app/Contents/MacOS/Google Chrome",
+    r"C:\Program Files\Google\Chrome\Application\chrome.exe",
+    r"C:\Program Files (x86)\Google\Chrome\Application\chrome.exe",
+]
+
+
+def daemon_dir():
+    """
+    Return the directory holding the daemon state, leases and default profile.
+    デーモンの状態、リース、デフォルトのプロファイルを保存するディレクトリを返す
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "deepwiki-to-md", "browser_daemon")
+
+
+def _state_path():
+    return os.path.join(daemon_dir(), "state.json")
+
+
+def _lease_dir():
+    return os.path.join(daemon_dir(), "leases")
+
+
+def _lock_path():
+    return os.path.join(daemon_dir(), "daemon.lock")
+
+
+def find_chrome(chrome=None):
+    """
+    Return the path of the Chrome executable ($CHROME_BINARY or a known location).
+    Chromeの実行ファイルのパスを返す（$CHROME_BINARYまたは既知の場所）
+    """
+    for candidate in [chrome, os.environ.get("CHROME_BINARY")] + CHROME_CANDIDATES:
+        if not candidate:
+            continue
+        path = shutil.which(candidate) or (candidate if os.path.isfile(candidate) else None)
+        if path:
+            return path
+    raise FileNotFoundError("Chrome was not found; pass --chrome or set CHROME_BINARY")
+
+
+def _responds(address):
+    """
+    Check whether a DevTools endpoint answers at host:port.
+    host:portでDevToolsのエンドポイントが応答するか確認する
+    """
+    try:
+        with urllib.request.urlopen(f"http://{address}/json/version", timeout=1) as response:
+            return response.status == 200
+    except Exception:
+        return False
+
+
+def daemon_status():
+    """
+    Return the state of the running daemon, or None if no daemon is running.
+    実行中のデーモンの状態を返す（デーモンが実行されていない場合はNone）
+
+    Returns:
+        dict or None: "address" (host:port for debuggerAddress), "pid", "idle_timeout" and "started".
+    """
+    try:
+        with open(_state_path(), 'r', encoding='utf-8') as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return state if _responds(state.get("address", "")) else None
+
+
+def _write_state(state):
+    os.makedirs(daemon_dir(), exist_ok=True)
+    tmp_path = f"{_state_path()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(state, f)
+    os.replace(tmp_path, _state_path())
+
+
+def _remove_state(pid):
+    """
+    Remove the state file if it belongs to the daemon process pid.
+    状態ファイルがpidのデーモンプロセスのものであれば削除する
+    """
+    try:
+        with open(_state_path(), 'r', encoding='utf-8') as f:
+            owner = json.load(f).get("pid")
+    except (OSError, ValueError):
+        return
+    if owner == pid:
+        try:
+            os.remove(_state_path())
+        except OSError:
+            pass
+
+
+def _acquire_lock():
+    """
+    Take the exclusive daemon lock without waiting.
+    デーモンの排他ロックを待たずに取得する
+
+    The operating system releases the lock when the process exits, so a crashed daemon
+    never leaves a stale lock behind.
+
+    Returns:
+        file or None: The open lock file (keep it open while serving), or None if another daemon holds the lock.
+    """
+    os.makedirs(daemon_dir(), exist_ok=True)
+    lock_file = open(_lock_path(), 'a+')
+    try:
+        if os.name == "nt":
+            import msvcrt
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return None
+    return lock_file
+
+
+def _touch_last_used():
+    os.makedirs(daemon_dir(), exist_ok=True)
+    with open(os.path.join(daemon_dir(), "last_used"), 'w', encoding='utf-8') as f:
+        f.write(str(time.time()))
+
+
+def _last_used():
+    try:
+        return os.path.getmtime(os.path.join(daemon_dir(), "last_used"))
+    except OSError:
+        return 0
+
+
+def _pid_alive(pid):
+    if os.name == "nt":
+        # Windowsではos.killでプロセスの存在を確認できないため、リースの経過時間だけで判断する
+        # os.kill cannot probe processes on Windows, so only the lease age is used there
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _active_leases():
+    """
+    Return the number of clients attached to the daemon, removing stale leases.
+    デーモンに接続中のクライアント数を返す（無効なリースは削除する）
+    """
+    try:
+        names = os.listdir(_lease_dir())
+    except OSError:
+        return 0
+    active = 0
+    for name in names:
+        path = os.path.join(_lease_dir(), name)
+        try:
+            pid = int(name.split("-")[0])
+            stale = time.time() - os.path.getmtime(path) > STALE_LEASE_SECONDS or not _pid_alive(pid)
+        except (OSError, ValueError):
+            stale = True
+        if stale:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        else:
+            active += 1
+    return active
+
+
+def serve(port=DEFAULT_PORT, headless=True, lean=False, profile_dir=None, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+          chrome=None):
+    """
+    Run Chrome with remote debugging and stop it when no client has used it for idle_timeout seconds.
+    リモートデバッグを有効にしたChromeを実行し、idle_timeout秒間クライアントに使われなかったら停止する
+
+    Only one daemon runs at a time: a second serve returns right away without touching the
+    state of the running one.
+
+    Returns:
+        bool: False if another daemon is running or Chrome did not start, True otherwise.
+    """
+    lock_file = _acquire_lock()
+    if lock_file is None:
+        logger.info("ブラウザデーモンは既に実行中です")
+        logger.info("A browser daemon is already running")
+        return False
+
+    try:
+        profile_dir = os.path.abspath(profile_dir or os.path.join(daemon_dir(), "profile"))
+        os.makedirs(profile_dir, exist_ok=True)
+        command = [find_chrome(chrome), f"--remote-debugging-port={port}", f"--user-data-dir={profile_dir}",
+                   "--no-first-run", "--no-default-browser-check", "--disable-gpu", "--no-sandbox",
+                   "--disable-dev-shm-usage"]
+        if headless:
+            command.append("--headless=new")
+        if lean:
+            command.extend(argument for argument in LEAN_ARGUMENTS if argument not in command)
+        command.append("about:blank")
+
+        process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        address = f"127.0.0.1:{port}"
+        try:
+            # Chromeが応答してから状態を書き込み、クライアントが起動途中のデーモンに接続しないようにする
+            # Write the state only once Chrome answers, so clients never attach to a daemon that is still starting
+            deadline = time.time() + STARTUP_TIMEOUT
+            while not _responds(address):
+                if process.poll() is not None or time.time() > deadline:
+                    logger.error(f"Chromeが{address}で応答しませんでした")
+                    logger.error(f"Chrome did not answer on {address}")
+                    return False
+                time.sleep(0.2)
+
+            _touch_last_used()
+            _write_state({"address": address, "pid": os.getpid(), "chrome_pid": process.pid,
+                          "idle_timeout": idle_timeout, "started": time.time()})
+            logger.info(f"Browser daemon listening on {address} (idle timeout {idle_timeout} s)")
+
+            while process.poll() is None:
+                time.sleep(CHECK_INTERVAL)
+                if _active_leases() == 0 and time.time() - _last_used() > idle_timeout:
+                    logger.info("Browser daemon is idle, stopping")
+                    break
+            return True
+        finally:
+            if process.poll() is None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            _remove_state(os.getpid())
+    finally:
+        lock_file.close()
+
+
+def start_daemon(port=DEFAULT_PORT, headless=True, lean=False, profile_dir=None,
+                 idle_timeout=DEFAULT_IDLE_TIMEOUT, chrome=None, timeout=30):
+    """
+    Start the daemon in the background (or return the running one) and wait until Chrome answers.
+    デーモンをバックグラウンドで起動し（実行中ならそれを返す）、Chromeが応答するまで待機する
+
+    When several callers start the daemon at once, the daemon lock lets only one of the
+    spawned processes run Chrome, and every caller gets its state.
+
+    Returns:
+        dict: The daemon state (see daemon_status).
+    """
+    state = daemon_status()
+    if state:
+        return state
+
+    command = [sys.executable, "-m", "deepwiki_to_md.browser_daemon", "serve", "--port", str(port),
+               "--idle-timeout", str(idle_timeout)]
+    if not headless:
+        command.append("--no-headless")
+    if lean:
+        command.append("--lean")
+    if profile_dir:
+        command.extend(["--profile-dir", os.path.abspath(profile_dir)])
+    if chrome:
+        command.extend(["--chrome", chrome])
+
+    # 呼び出し元のプロセスが終了してもデーモンが動き続けるように切り離して起動する
+    # Detach the daemon so it outlives the calling process
+    if os.name == "nt":
+        detach = {"creationflags": subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP}
+    else:
+        detach = {"start_new_session": True}
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [package_root, os.environ.get("PYTHONPATH")])))
+    subprocess.Popen(command, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                     env=env, **detach)
+
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        state = daemon_status()
+        if state:
+            return state
+        time.sleep(0.2)
+    raise RuntimeError(f"The browser daemon did not start within {timeout} seconds")
+
+
+def stop_daemon():
+    """
+    Stop the running daemon (and its Chrome).
+    実行中のデーモン（とそのChrome）を停止する
+
+    Returns:
+        bool: True if a daemon was running.
+    """
+    state = daemon_status()
+    if not state:
+        return False
+    import signal
+    for pid in (state.get("pid"), state.get("chrome_pid")):
+        if pid:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except OSError:
+                pass
+    _remove_state(state.get("pid"))
+    return True
+
+
+def resolve_browser(browser=None, daemon=False, headless=True, lean=False, profile_dir=None):
+    """
+    Return the debuggerAddress the CLIs attach to: the given address, the local daemon
+    (started if needed) when daemon is True, or None to start a browser of their own.
+    CLIが接続するdebuggerAddressを返す（指定されたアドレス、daemonがTrueの場合はローカルデーモン
+    （必要なら起動する）、独自のブラウザを起動する場合はNone）
+    """
+    if browser:
+        return browser
+    if daemon:
+        return start_daemon(headless=headless, lean=lean, profile_dir=profile_dir)["address"]
+    return None
+
+
+class DaemonSession:
+    """
+    デーモンのブラウザ内の分離されたセッション
+    Isolated session in the daemon browser
+
+    attach() connects a WebDriver to the daemon through debuggerAddress and opens a
+    tab in a new browser context (separate cookies, storage and cache), so concurrent
+    requests do not see each other's state. close() disposes of the context, closing
+    its tabs, and leaves the daemon browser running. While a session is open, a lease
+    file keeps the daemon from stopping on its idle timeout.
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.driver = None
+        self._context_id = None
+        self._lease_path = os.path.join(_lease_dir(), f"{os.getpid()}-{id(self)}")
+
+    def attach(self, options=None):
+        """
+        Connect to the daemon and switch to a tab in a new browser context.
+        デーモンに接続し、新しいブラウザコンテキストのタブに切り替える
+
+        Args:
+            options (Options, optional): Chrome options of the session (see browser_options.attach_options).
+
+        Returns:
+            WebDriver: The attached driver.
+        """
+        from selenium import webdriver
+
+        os.makedirs(_lease_dir(), exist_ok=True)
+        with open(self._lease_path, 'w', encoding='utf-8') as f:
+            f.write(self.address)
+        _touch_last_used()
+
+        options = options if options is not None else attach_options()
+        options.debugger_address = self.address
+        try:
+            self.driver = webdriver.Chrome(options=options)
+        except Exception:
+            self._release()
+            raise
+
+        try:
+            self._context_id = self.driver.execute_cdp_cmd("Target.createBrowserContext",
+                                                           {"disposeOnDetach": False})["browserContextId"]
+        except Exception as e:
+            logger.warning(f"ブラウザコンテキストを作成できませんでした。新しいタブを使用します: {e}")
+            self._context_id = None
+        self.new_tab()
+        return self.driver
+
+    def new_tab(self):
+        """
+        Open a tab in the session's browser context and switch to it.
+        セッションのブラウザコンテキストでタブを開き、そのタブに切り替える
+        """
+        if self._context_id:
+            try:
+                target_id = self.driver.execute_cdp_cmd("Target.createTarget", {
+                    "url": "about:blank", "browserContextId": self._context_id})["targetId"]
+                # WebDriverのウィンドウハンドルはDevToolsのターゲットIDと同じ
+                # WebDriver window handles are the DevTools target ids
+                self.driver.switch_to.window(target_id)
+                return
+            except Exception as e:
+                logger.warning(f"コンテキスト内にタブを開くことができませんでした: {e}")
+        self.driver.switch_to.new_window('tab')
+
+    def close(self):
+        """
+        Dispose of the session's context (closing its tabs) and release the lease.
+        セッションのコンテキストを破棄し（タブを閉じる）、リースを解放する
+        """
+        try:
+            if self.driver is not None:
+                if self._context_id:
+                    self.driver.execute_cdp_cmd("Target.disposeBrowserContext",
+                                                {"browserContextId": self._context_id})
+                else:
+                    self.driver.close()
+                # debuggerAddressで接続した場合、quitはブラウザを終了しない
+                # quit does not stop a browser attached through debuggerAddress
+                self.driver.quit()
+        except Exception as e:
+            logger.warning(f"セッションを閉じることができませんでした: {e}")
+        finally:
+            self.driver = None
+            self._release()
+
+    def _release(self):
+        _touch_last_used()
+        try:
+            os.remove(self._lease_path)
+        except OSError:
+            pass
+
+
+def parse_arguments(argv=None):
+    """
+    コマンドライン引数を解析する
+    Parse command line arguments
+    """
+    parser = argparse.ArgumentParser(prog="deepwiki-browser",
+                                     description="ウォームなChromeデーモン (Warm Chrome daemon shared by deepwiki-chat and "
+                                                 "deepwiki-create)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    for name, help_text in (("start", "デーモンをバックグラウンドで起動する (Start the daemon in the background)"),
+                            ("serve", "デーモンをフォアグラウンドで実行する (Run the daemon in the foreground)")):
+        command_parser = subparsers.add_parser(name, help=help_text)
+        command_parser.add_argument("--port", type=int, default=DEFAULT_PORT,
+                                    help=f"DevToolsのポート (DevTools port) [デフォルト: {DEFAULT_PORT}]")
+        command_parser.add_argument("--idle-timeout", type=float, default=DEFAULT_IDLE_TIMEOUT,
+                                    help="クライアントがいない状態で終了するまでの秒数 (Seconds without clients before the daemon stops) "
+                                         f"[デフォルト: {DEFAULT_IDLE_TIMEOUT}]")
+        command_parser.add_argument("--no-headless", action="store_true",
+                                    help="ブラウザウィンドウを表示する (Show the browser window)")
+        command_parser.add_argument("--lean", action="store_true",
+                                    help="軽量プロファイルのフラグを使用する (Use the lean profile flags)")
+        command_parser.add_argument("--profile-dir",
+                                    help="Chromeのプロファイルディレクトリ (Chrome profile directory)")
+        command_parser.add_argument("--chrome", help="Chromeの実行ファイル (Chrome executable)")
+
+    subparsers.add_parser("stop", help="デーモンを停止する (Stop the daemon)")
+    subparsers.add_parser("status", help="デーモンの状態を表示する (Show the daemon status)")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Main function of deepwiki-browser.
+    deepwiki-browserのメイン関数
+    """
+    args = parse_arguments(argv)
+    if args.command in ("start", "serve"):
+        options = dict(port=args.port, headless=not args.no_headless, lean=args.lean, profile_dir=args.profile_dir,
+                       idle_timeout=args.idle_timeout, chrome=args.chrome)
+        if args.command == "serve":
+            return 0 if serve(**options) else 1
+        state = start_daemon(**options)
+        print(f"ブラウザデーモンが実行中です: {state['address']}")
+        print(f"Browser daemon running: {state['address']}")
+    elif args.command == "stop":
+        if stop_daemon():
+            print("ブラウザデーモンを停止しました")
+            print("Browser daemon stopped")
+        else:
+            print("ブラウザデーモンは実行されていません")
+            print("No browser daemon is running")
+    else:
+        state = daemon_status()
+        if state:
+            print(f"Browser daemon running: {state['address']} (pid {state['pid']}, "
+                  f"idle timeout {state['idle_timeout']} s)")
+        else:
+            print("No browser daemon is running")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
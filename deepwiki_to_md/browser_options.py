@@ -0,0 +1,102 @@
+import logging
+import os
+
+from selenium.webdriver.chrome.options import Options
+
+# ログ設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Chrome flags of the lean profile: no background traffic, extensions or first-run work
+# 軽量プロファイルのChromeフラグ: バックグラウンド通信、拡張機能、初回起動処理を無効にする
+LEAN_ARGUMENTS = [
+    "--disable-background-networking",
+    "--disable-component-update",
+    "--disable-default-apps",
+    "--disable-extensions",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--no-first-run",
+    "--blink-settings=imagesEnabled=false",
+]
+
+# Chrome preferences of the lean profile (2 = block)
+# 軽量プロファイルのChrome設定（2 = ブロック）
+LEAN_PREFS = {
+    "profile.managed_default_content_settings.images": 2,
+    "profile.default_content_setting_values.notifications": 2,
+}
+
+# URL patterns blocked through the DevTools protocol in the lean profile: fonts, images and analytics
+# 軽量プロファイルでDevToolsプロトコルによりブロックするURLパターン: フォント、画像、アクセス解析
+LEAN_BLOCKED_URLS = [
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.svg", "*.ico",
+    "*google-analytics.com*", "*googletagmanager.com*", "*doubleclick.net*",
+    "*segment.io*", "*segment.com*", "*posthog.com*", "*sentry.io*", "*hotjar.com*", "*clarity.ms*",
+]
+
+
+def chrome_options(headless=False, lean=False, profile_dir=None):
+    """
+    Build the Chrome options shared by the chat scraper and the repository creator.
+    チャットスクレイパーとリポジトリ作成で共通のChromeオプションを作成する
+
+    Args:
+        headless (bool): Whether to run the browser in headless mode.
+        lean (bool): Whether to use the lean profile: pageLoadStrategy "eager" (continue once the
+            DOM is ready), no images and no background networking.
+        profile_dir (str, optional): Chrome user data directory to reuse across runs, so the HTTP
+            cache and static assets survive. Created if missing. One directory can only be used by
+            one browser at a time.
+
+    Returns:
+        Options: The Chrome options.
+    """
+    options = Options()
+    if headless:
+        options.add_argument("--headless")
+    options.add_argument("--disable-gpu")
+    options.add_argument("--no-sandbox")
+    options.add_argument("--disable-dev-shm-usage")
+
+    if lean:
+        options.page_load_strategy = "eager"
+        for argument in LEAN_ARGUMENTS:
+            options.add_argument(argument)
+        options.add_experimental_option("prefs", LEAN_PREFS)
+
+    if profile_dir:
+        profile_dir = os.path.abspath(profile_dir)
+        os.makedirs(profile_dir, exist_ok=True)
+        options.add_argument(f"--user-data-dir={profile_dir}")
+
+    return options
+
+
+def attach_options(lean=False):
+    """
+    Build the options of a session attached to an already running Chrome (see browser_daemon).
+    起動済みのChromeに接続するセッションのオプションを作成する（browser_daemonを参照）
+
+    Command-line flags and preferences only apply when Chrome starts, so they are set on the
+    daemon instead; only the page load strategy of the lean profile applies per session.
+    """
+    options = Options()
+    if lean:
+        options.page_load_strategy = "eager"
+    return options
+
+
+def apply_lean_settings(driver):
+    """
+    Block fonts, images and analytics requests of the current tab through the DevTools protocol.
+    現在のタブのフォント、画像、アクセス解析のリクエストをDevToolsプロトコルでブロックする
+
+    The blocking only applies to that tab, so call it again after switching to a new tab.
+    """
+    try:
+        driver.execute_cdp_cmd("Network.enable", {})
+        driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": LEAN_BLOCKED_URLS})
+    except Exception as e:
+        logger.warning(f"URLのブロックを設定できませんでした: {e}")
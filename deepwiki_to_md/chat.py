@@ -1,22 +1,39 @@
 import argparse
+import json
 import logging
 import os
 import re
+import sys
 import time
 
 from selenium import webdriver
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
 # Import the md_to_yaml module
 try:
-    from deepwiki_to_md.md_to_yaml import markdown_to_yaml, html_to_markdown, html_to_yaml, convert_md_file_to_yaml
+    from deepwiki_to_md.md_to_yaml import (markdown_to_yaml, html_to_markdown, html_to_yaml, convert_md_file_to_yaml,
+                                           convert_md_files_to_yaml)
+    from deepwiki_to_md.stream_export import EXPORT_FORMATS, export_markdown_tree
+    from deepwiki_to_md.output_writer import OutputWriter
+    from deepwiki_to_md.chat_network import PERFORMANCE_LOG_CAPABILITY, NetworkCapture
+    from deepwiki_to_md.browser_options import apply_lean_settings, attach_options, chrome_options
+    from deepwiki_to_md.browser_daemon import DaemonSession, resolve_browser
+    from deepwiki_to_md.chat_cache import (DEFAULT_MAX_ENTRIES, DEFAULT_TTL, default_cache_path, normalize_chat_url,
+                                           open_cache)
 except ImportError:
     # If the module import fails, try relative import
     try:
-        from .md_to_yaml import markdown_to_yaml, html_to_markdown, html_to_yaml, convert_md_file_to_yaml
+        from .md_to_yaml import (markdown_to_yaml, html_to_markdown, html_to_yaml, convert_md_file_to_yaml,
+                                 convert_md_files_to_yaml)
+        from .stream_export import EXPORT_FORMATS, export_markdown_tree
+        from .output_writer import OutputWriter
+        from .chat_network import PERFORMANCE_LOG_CAPABILITY, NetworkCapture
+        from .browser_options import apply_lean_settings, attach_options, chrome_options
+        from .browser_daemon import DaemonSession, resolve_browser
+        from .chat_cache import (DEFAULT_MAX_ENTRIES, DEFAULT_TTL, default_cache_path, normalize_chat_url,
+                                 open_cache)
     except ImportError:
         logging.error("Could not import md_to_yaml module")
 
@@ -24,9 +41,220 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# サムズアップ/ダウンボタンのセレクター（レスポンス完了の指標）
+# Selector of the thumbs up/down buttons (indicator of a completed response)
+THUMBS_SELECTOR = "div.flex.items-center.gap-1.text-neutral-300"
+
+# レスポンス要素の候補となるセレクター（先頭から順に試す）
+# Candidate selectors of the response element (tried in order)
+RESPONSE_SELECTORS = [
+    'div.prose-custom',
+    'div.dark\\:\\[\\&amp\\;_pre\\:has\\(code\\)\\]\\:bg-shade',
+    '.chat-response',
+    '.message-content',
+    '.response-content',
+    '.ai-response',
+    'div[role="presentation"]',
+    'div.chat-message',
+    'div.response',
+    # 新しいタブでのレスポンス要素のセレクター
+    # Selectors for response elements in the new tab
+    'main article',
+    'main .content',
+    'article',
+    '.markdown-body'
+]
+
+# Script that returns the outerHTML of the first selector matching an element with text,
+# together with the thumbs up/down buttons, in a single round-trip
+# テキストを持つ要素に最初に一致したセレクターのouterHTMLとサムズボタンを1回の往復で返すスクリプト
+RESPONSE_LOOKUP_SCRIPT = """
+const selectors = arguments[0], thumbsSelector = arguments[1];
+for (const selector of selectors) {
+    let element = null;
+    try {
+        element = document.querySelector(selector);
+    } catch (e) {
+        continue;
+    }
+    if (element && (element.innerText || element.textContent || '').trim()) {
+        const thumbs = document.querySelector(thumbsSelector);
+        return {selector: selector, html: element.outerHTML, thumbs: thumbs ? thumbs.outerHTML : null};
+    }
+}
+return null;
+"""
+
+# Script that checks whether the page still shows an answer (thumbs buttons or a response element
+# with text) and clears the completion tracker of the previous question
+# ページに回答（サムズボタンまたはテキストを持つレスポンス要素）が残っているか確認し、
+# 前の質問の完了トラッカーを削除するスクリプト
+PREVIOUS_RESPONSE_SCRIPT = """
+const selectors = arguments[0], thumbsSelector = arguments[1];
+delete window.__deepwikiChatTracker;
+if (document.querySelector(thumbsSelector)) return true;
+return selectors.some((selector) => {
+    try {
+        const element = document.querySelector(selector);
+        return !!(element && (element.innerText || element.textContent || '').trim());
+    } catch (e) {
+        return false;
+    }
+});
+"""
+
+# How answers are captured: from the rendered page, or from the network payload
+# 回答の取得方法: 表示されたページから、またはネットワークのペイロードから
+CAPTURE_MODES = ("dom", "network")
+
+# Default time (seconds) the response text must stop changing before it is treated as complete
+# レスポンスを完了とみなすまでにテキストの変化が止まっている必要がある時間（秒）のデフォルト
+DEFAULT_QUIET_PERIOD = 5
+
+# JavaScript function returning the text of the first response element with text (as RESPONSE_LOOKUP_SCRIPT)
+# テキストを持つ最初のレスポンス要素のテキストを返すJavaScript関数（RESPONSE_LOOKUP_SCRIPTと同じ順序）
+RESPONSE_TEXT_FUNCTION = """
+const responseText = (selectors) => {
+    for (const selector of selectors) {
+        let element = null;
+        try {
+            element = document.querySelector(selector);
+        } catch (e) {
+            continue;
+        }
+        const text = element ? (element.textContent || '').trim() : '';
+        if (text) return text;
+    }
+    return '';
+};
+"""
+
+# Async script: resolves when the thumbs buttons appear, when the response text has not changed
+# for quietMs after it started changing, or after timeoutMs. Mutations elsewhere on the page (the
+# submit form, a "thinking" indicator) do not start the quiet clock.
+# 非同期スクリプト: サムズボタンが表示されたとき、レスポンスのテキストが変化し始めた後にquietMs間
+# 変化しなかったとき、またはtimeoutMs経過時に完了する（ページの他の部分の変化は対象外）
+COMPLETION_SCRIPT = RESPONSE_TEXT_FUNCTION + """
+const thumbsSelector = arguments[0], selectors = arguments[1], quietMs = arguments[2], timeoutMs = arguments[3];
+const done = arguments[arguments.length - 1];
+const start = Date.now();
+let text = responseText(selectors), last = start, mutated = start, dirty = false, started = false, timer = null;
+const observer = new MutationObserver(() => { mutated = Date.now(); dirty = true; });
+const finish = (reason) => { observer.disconnect(); clearInterval(timer); done(reason); };
+const check = () => {
+    const now = Date.now();
+    if (dirty) {
+        dirty = false;
+        const current = responseText(selectors);
+        if (current !== text) {
+            text = current;
+            last = mutated;
+            started = !!current;
+        }
+    }
+    if (document.querySelector(thumbsSelector)) finish('thumbs');
+    else if (started && now - last >= quietMs) finish('quiet');
+    else if (now - start >= timeoutMs) finish('timeout');
+};
+observer.observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+timer = setInterval(check, 100);
+check();
+"""
+
+# Script that installs a MutationObserver once per page and reports the completion state
+# without blocking (used when several tabs are polled); only changes of the response text count
+# ページごとに一度MutationObserverを設置し、ブロックせずに完了状態を返すスクリプト（複数タブのポーリング用）
+# レスポンスのテキストの変化だけを数える
+COMPLETION_STATE_SCRIPT = RESPONSE_TEXT_FUNCTION + """
+const thumbsSelector = arguments[0], selectors = arguments[1];
+const now = Date.now();
+let tracker = window.__deepwikiChatTracker;
+if (!tracker) {
+    tracker = window.__deepwikiChatTracker = {text: responseText(selectors), last: now, mutated: now,
+                                              dirty: false, changed: false};
+    new MutationObserver(() => { tracker.mutated = Date.now(); tracker.dirty = true; })
+        .observe(document.documentElement, {childList: true, subtree: true, characterData: true});
+} else if (tracker.dirty) {
+    tracker.dirty = false;
+    const text = responseText(selectors);
+    if (text !== tracker.text) {
+        tracker.text = text;
+        tracker.last = tracker.mutated;
+        tracker.changed = !!text;
+    }
+}
+return {thumbs: !!document.querySelector(thumbsSelector), changed: tracker.changed, quiet: (now - tracker.last) / 1000};
+"""
+
+
+def load_questions(path, default_url=None, default_deep=False):
+    """
+    Load a batch question file.
+    バッチ用の質問ファイルを読み込む
+
+    Each non-empty line is either plain text (one question, sent to default_url) or a
+    JSON object such as {"message": "...", "url": "...", "deep": true}; "question" is
+    accepted as an alias of "message". Lines starting with "#" are comments.
+
+    Args:
+        path (str): Path of the question file (text or JSONL).
+        default_url (str, optional): URL used for questions without their own URL.
+        default_deep (bool): Deep Research flag used for questions without their own flag.
+
+    Returns:
+        list: Dicts with "url", "message" and "deep".
+    """
+    questions = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                entry = json.loads(line)
+                message = entry.get("message") or entry.get("question")
+                url = entry.get("url") or default_url
+                deep = bool(entry.get("deep", default_deep))
+            else:
+                message, url, deep = line, default_url, default_deep
+            if not message:
+                raise ValueError(f"{path}:{line_number}: question has no message")
+            if not url:
+                raise ValueError(f"{path}:{line_number}: question has no URL (use --url for a default)")
+            questions.append({"url": url, "message": message, "deep": deep})
+    return questions
+
+
+def batch_result(question, response, saved_files, output_dir, start):
+    """
+    Build the index entry of one batch question.
+    バッチの1つの質問のインデックス項目を作成する
+    """
+    return {
+        "url": question["url"],
+        "message": question["message"],
+        "deep": question["deep"],
+        "status": "ok" if response else "failed",
+        "files": [os.path.relpath(path, output_dir).replace(os.sep, '/') for path in saved_files],
+        "seconds": round(time.time() - start, 2),
+    }
+
+
+def write_batch_index(writer, output_dir, results):
+    """
+    Write the aggregated index of a batch run and return its path.
+    バッチ実行の集約インデックスを書き込み、そのパスを返す
+    """
+    index_path = os.path.join(output_dir, f"{time.strftime('%Y%m%d_%H%M%S')}_batch_index.json")
+    index_path = writer.write(index_path, json.dumps(results, ensure_ascii=False, indent=2))
+    logger.info(f"バッチのインデックスを保存しました: {index_path}")
+    logger.info(f"Saved batch index: {index_path}")
+    return index_path
+
 
 class ChatScraperSelenium:
-    def __init__(self, output_dir="ChatResponses", headless=False, output_format="html"):
+    def __init__(self, output_dir="ChatResponses", headless=False, output_format="html", writer=None,
+                 capture="dom", lean=False, profile_dir=None, cache=None, refresh=False, browser=None):
         """
         Initialize the ChatScraperSelenium.
 
@@ -34,20 +262,41 @@ class ChatScraperSelenium:
             output_dir (str): The directory to save the responses.
             headless (bool): Whether to run the browser in headless mode.
             output_format (str): The format to save the responses in. Can be "html", "md", "yaml", or a comma-separated list of formats.
+            writer (OutputWriter, optional): Background writer used to save responses. A new one is created
+                (and closed by close()) if None; a given writer is shared and left open.
+            capture (str): "dom" to read answers from the rendered page, or "network" to assemble them
+                from the streamed network payload (Chrome DevTools), falling back to the page if nothing is captured.
+            lean (bool): Whether to use the lean browser profile (eager page loads; no images, fonts,
+                analytics or background networking).
+            profile_dir (str, optional): Chrome profile directory reused across runs to keep the cache.
+            cache (ChatCache, optional): Response cache checked before a message is sent; a hit is saved
+                without starting the browser.
+            refresh (bool): Whether to ignore cached responses (fresh responses are still stored).
+            browser (str, optional): debuggerAddress (host:port) of a running Chrome, e.g. the browser
+                daemon, to attach to instead of starting a browser. The session gets its own browser
+                context, which is disposed of by close(); headless and profile_dir then belong to the daemon.
         """
+        if capture not in CAPTURE_MODES:
+            raise ValueError(f"Invalid capture mode: {capture}. Use one of {', '.join(CAPTURE_MODES)}.")
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
 
+        # Responses are written atomically by a background writer
+        self._owns_writer = writer is None
+        self.writer = writer if writer is not None else OutputWriter()
+
         # Parse output_format to handle multiple formats
-        self.output_formats = [fmt.strip().lower() for fmt in output_format.split(",")]
+        requested_formats = [fmt.strip().lower() for fmt in output_format.split(",")]
 
         # Validate output formats
         valid_formats = ["html", "md", "yaml"]
-        for fmt in self.output_formats:
-            if fmt not in valid_formats:
+        self.output_formats = []
+        for fmt in requested_formats:
+            if fmt in valid_formats:
+                self.output_formats.append(fmt)
+            else:
                 logger.warning(f"無効な出力フォーマット: {fmt}。'html'、'md'、または 'yaml' を使用してください。")
                 logger.warning(f"Invalid output format: {fmt}. Use 'html', 'md', or 'yaml'.")
-                self.output_formats.remove(fmt)
 
         # Default to HTML if no valid formats are specified
         if not self.output_formats:
@@ -55,18 +304,52 @@ class ChatScraperSelenium:
             logger.warning("No valid output formats specified. Using default 'html'.")
             self.output_formats = ["html"]
 
-        options = Options()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-
-        self.driver = webdriver.Chrome(options=options)
-        self.wait = WebDriverWait(self.driver, 20)
+        self.headless = headless
+        self.capture = capture
+        self.lean = lean
+        self.profile_dir = profile_dir
+        self.cache = cache
+        self.refresh = refresh
+        self.browser = browser
+
+        # The browser is started on first use, so cached responses never launch Chrome
+        self._driver = None
+        self._session = None
+        self.wait = None
+        self.network_capture = None
+        # Files saved for the last message sent
+        self.last_saved_files = []
+
+    @property
+    def driver(self):
+        """
+        The Chrome WebDriver, started on first use.
+        最初の使用時に起動するChrome WebDriver
+        """
+        if self._driver is None:
+            if self.browser:
+                options = attach_options(lean=self.lean)
+            else:
+                options = chrome_options(headless=self.headless, lean=self.lean, profile_dir=self.profile_dir)
+            if self.capture == "network":
+                # ネットワークイベントをパフォーマンスログに記録する
+                # Record network events in the performance log
+                options.set_capability(*PERFORMANCE_LOG_CAPABILITY)
+
+            if self.browser:
+                # 起動済みのブラウザに接続し、このセッション専用のブラウザコンテキストを使う
+                # Attach to the running browser and use a browser context of this session
+                self._session = DaemonSession(self.browser)
+                self._driver = self._session.attach(options)
+            else:
+                self._driver = webdriver.Chrome(options=options)
+            self.wait = WebDriverWait(self._driver, 20)
+            self._prepare_tab()
+            self.network_capture = NetworkCapture(self._driver) if self.capture == "network" else None
+        return self._driver
 
     def send_chat_message(self, url, message, chat_selector="textarea", submit_selector="button[type='submit']",
-                          wait_time=5, debug=False, use_deep_research=False):
+                          wait_time=5, debug=False, use_deep_research=False, quiet_period=DEFAULT_QUIET_PERIOD):
         """
         Send a chat message and retrieve the response.
 
@@ -75,133 +358,56 @@ class ChatScraperSelenium:
             message (str): The message to send.
             chat_selector (str): CSS selector for the chat input element.
             submit_selector (str): CSS selector for the submit button.
-            wait_time (int): Time to wait for response in seconds.
+            wait_time (int): Maximum time to wait for response in seconds.
             debug (bool): Whether to enable debug mode.
             use_deep_research (bool): Whether to enable the "深い研究" (Deep Research) toggle.
+            quiet_period (float): Seconds without changes of the response text after which it is treated as complete.
 
         Returns:
-            str or None: The HTML of the response, or None if no response was found.
+            str or None: The HTML of the response (the Markdown when it was captured from the network),
+                or None if no response was found.
         """
+        self.last_saved_files = []
+        cached = self._cached_response(url, message, use_deep_research)
+        if cached:
+            # キャッシュされたレスポンスをブラウザを使わずに保存する
+            # Save the cached response without using the browser
+            logger.info(f"キャッシュされたレスポンスを使用します: {message}")
+            logger.info(f"Using cached response: {message}")
+            self.last_saved_files = self._save_response(cached["html"], message,
+                                                        markdown_content=cached["markdown"])
+            return cached["html"] or cached["markdown"]
+
+        original_window = None
         try:
-            logger.info(f"URLにアクセス中: {url}")
-            self.driver.get(url)
-
             # 現在のウィンドウハンドルを保存
             # Save the current window handle
             original_window = self.driver.current_window_handle
 
-            # チャット入力要素を待機して取得
-            chat_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, chat_selector)))
-
-            # 入力要素を含むフォームを見つける
-            # Find the form containing the input element
-            form_element = None
-            try:
-                form_element = chat_input.find_element(By.XPATH, "./ancestor::form")
-                logger.info("フォーム要素を見つけました")
-            except Exception as e:
-                logger.warning(f"フォーム要素が見つかりませんでした。直接セレクタを使用します: {e}")
-
-            chat_input.clear()
-            chat_input.send_keys(message)
-            logger.info(f"メッセージ入力: {message}")
-
-            # 深い研究トグルを有効にする（存在する場合）
-            if use_deep_research:
-                try:
-                    if form_element:
-                        # フォーム内で深い研究トグルを探す
-                        deep_research_label = form_element.find_element(By.XPATH,
-                                                                        ".//label[contains(text(), '深い研究')]")
-                        if deep_research_label:
-                            # ラベルの親要素からトグルを見つける
-                            toggle_div = deep_research_label.find_element(By.XPATH,
-                                                                          "./following-sibling::div[@id='useDeep']")
-                            if toggle_div:
-                                toggle_div.click()
-                                logger.info("「深い研究」トグルを有効化しました")
-                    else:
-                        # フォームが見つからない場合は従来の方法で探す
-                        deep_research_label = self.driver.find_element(By.XPATH,
-                                                                       "//label[contains(text(), '深い研究')]")
-                        if deep_research_label:
-                            toggle_div = deep_research_label.find_element(By.XPATH,
-                                                                          "./following-sibling::div[@id='useDeep']")
-                            if toggle_div:
-                                toggle_div.click()
-                                logger.info("「深い研究」トグルを有効化しました")
-                except Exception as e:
-                    logger.warning(f"「深い研究」トグルが見つからないか、クリックできませんでした: {e}")
-
-            # 送信ボタンを探してクリック
-            submit_button = None
-            if form_element:
-                # フォーム内でボタンを探す（より信頼性が高い）
-                try:
-                    # まずフォーム内で指定されたセレクタを使用
-                    submit_button = form_element.find_element(By.CSS_SELECTOR, submit_selector)
-                    logger.info("フォーム内で指定されたセレクタでボタンを見つけました")
-                except Exception:
-                    # 指定されたセレクタが見つからない場合、フォーム内の任意のボタンを探す
-                    try:
-                        submit_button = form_element.find_element(By.CSS_SELECTOR, "button[type='submit']")
-                        logger.info("フォーム内でtype='submit'のボタンを見つけました")
-                    except Exception:
-                        try:
-                            # 最後の手段としてフォーム内の任意のボタンを探す
-                            submit_button = form_element.find_element(By.TAG_NAME, "button")
-                            logger.info("フォーム内で任意のボタンを見つけました")
-                        except Exception as e:
-                            logger.warning(f"フォーム内でボタンが見つかりませんでした: {e}")
-
-            # フォーム内でボタンが見つからなかった場合、従来の方法で探す
-            if not submit_button:
-                submit_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, submit_selector)))
-                logger.info("従来の方法でボタンを見つけました")
-
-            # ボタンをクリック
-            submit_button.click()
-            logger.info("送信ボタンをクリック")
-
-            # 新しいタブが開いたかチェック
-            # Check if a new tab has opened
-            wait_new_tab = WebDriverWait(self.driver, 5)
-            try:
-                # 新しいウィンドウが開くのを待機
-                # Wait for a new window to open
-                wait_new_tab.until(lambda d: len(d.window_handles) > 1)
-                logger.info("新しいタブが開きました")
-
-                # 新しいタブに切り替え
-                # Switch to the new tab
-                for window_handle in self.driver.window_handles:
-                    if window_handle != original_window:
-                        self.driver.switch_to.window(window_handle)
-                        logger.info("新しいタブに切り替えました")
-                        break
-            except Exception as e:
-                logger.info(f"新しいタブは開きませんでした: {e}")
+            if self.network_capture:
+                self.network_capture.reset()
+            self._submit_message(url, message, chat_selector, submit_selector, use_deep_research)
+            complete = self._wait_for_completion(wait_time, quiet_period)
 
-            # サムズアップ/ダウンボタンが表示されるのを待機（メッセージ完了の指標）
-            # Wait for thumbs up/down buttons to appear (indicator of message completion)
-            thumbs_selector = "div.flex.items-center.gap-1.text-neutral-300"
-            try:
-                # 最大wait_time秒間待機
-                # Wait for a maximum of wait_time seconds
-                thumbs_wait = WebDriverWait(self.driver, wait_time)
-                thumbs_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, thumbs_selector)))
-                logger.info("サムズアップ/ダウンボタンが表示されました（メッセージ完了）")
-            except Exception as e:
-                logger.warning(f"サムズアップ/ダウンボタンが表示されませんでした: {e}")
-                # 固定の待機時間を使用
-                # Use fixed wait time as fallback
-                logger.info(f"{wait_time}秒間待機中...")
-                time.sleep(wait_time)
+            if self.network_capture:
+                # ネットワークから取得した回答をDOMを経由せずに保存する
+                # Save the answer captured from the network without going through the DOM
+                markdown_content = self.network_capture.collect()
+                if markdown_content:
+                    logger.info("ネットワークから回答を取得しました")
+                    html_content = self._extract_response_html() if "html" in self.output_formats else None
+                    self.last_saved_files = self._save_response(html_content, message,
+                                                                markdown_content=markdown_content)
+                    self._cache_response(url, message, use_deep_research, html_content, markdown_content,
+                                         complete=complete)
+                    return markdown_content
+                logger.warning("ネットワークから回答を取得できませんでした。ページから取得します")
 
             # レスポンス要素を取得
             response_html = self._extract_response_html()
             if response_html:
-                self._save_response(response_html, message)
+                self.last_saved_files = self._save_response(response_html, message)
+                self._cache_response(url, message, use_deep_research, response_html, complete=complete)
                 return response_html
             else:
                 logger.warning("レスポンスが見つかりませんでした")
@@ -210,54 +416,429 @@ class ChatScraperSelenium:
         except Exception as e:
             logger.error(f"エラーが発生しました: {e}")
             return None
+        finally:
+            self._close_extra_tabs(original_window)
 
-    def _extract_response_html(self):
-        # 可能性のあるセレクターのリスト
-        selectors = [
-            'div.prose-custom',
-            'div.dark\\:\\[\\&amp\\;_pre\\:has\\(code\\)\\]\\:bg-shade',
-            '.chat-response',
-            '.message-content',
-            '.response-content',
-            '.ai-response',
-            'div[role="presentation"]',
-            'div.chat-message',
-            'div.response',
-            # 新しいタブでのレスポンス要素のセレクター
-            # Selectors for response elements in the new tab
-            'main article',
-            'main .content',
-            'article',
-            '.markdown-body'
-        ]
-
-        for selector in selectors:
+    def stream_chat_message(self, url, message, chat_selector="textarea", submit_selector="button[type='submit']",
+                            wait_time=5, debug=False, use_deep_research=False, quiet_period=DEFAULT_QUIET_PERIOD,
+                            poll_interval=1.0):
+        """
+        Send a chat message and yield the response as Markdown while it renders.
+        チャットメッセージを送信し、表示中のレスポンスをMarkdownとして逐次返す
+
+        The response container is polled every poll_interval seconds. Complete lines
+        that were added since the last poll are yielded and appended to
+        <output_dir>/<timestamp>_<query>.partial.md, so partial results survive a
+        browser crash. When the response is complete, the remaining text is yielded,
+        the response is saved in the normal output formats and the partial file is
+        removed. The stream is best effort: if already yielded text is re-rendered
+        differently, only the saved outputs reflect the change.
+
+        Args:
+            url (str): The URL of the chat interface.
+            message (str): The message to send.
+            chat_selector (str): CSS selector for the chat input element.
+            submit_selector (str): CSS selector for the submit button.
+            wait_time (int): Maximum time to wait for response in seconds.
+            debug (bool): Whether to enable debug mode.
+            use_deep_research (bool): Whether to enable the "深い研究" (Deep Research) toggle.
+            quiet_period (float): Seconds without changes of the response text after which it is treated as complete.
+            poll_interval (float): Seconds between polls of the response container.
+
+        Yields:
+            str: New Markdown text of the response.
+
+        Returns:
+            str or None: The HTML of the response (the value of StopIteration), or None if no response was found.
+        """
+        self.last_saved_files = []
+        original_window = None
+        base_filename = self._base_filename(message)
+        partial_path = os.path.join(self.output_dir, f"{base_filename}.partial.md")
+        emitted = ""
+        finished = False
+        try:
+            original_window = self.driver.current_window_handle
+            self._submit_message(url, message, chat_selector, submit_selector, use_deep_research)
+
+            start = time.time()
+            with open(partial_path, 'w', encoding='utf-8') as partial:
+                while True:
+                    finished = self._completion_state(quiet_period)
+                    result = self._lookup_response()
+                    markdown_content = self._html_to_markdown(result["html"]) if result else None
+                    if markdown_content:
+                        # 完成した行だけを返す（最後の行はまだ書き換わる可能性がある）
+                        # Only yield complete lines (the last line may still change)
+                        stable = markdown_content if finished else markdown_content[:markdown_content.rfind('\n') + 1]
+                        if len(stable) > len(emitted):
+                            delta = stable[len(emitted):]
+                            emitted = stable
+                            partial.write(delta)
+                            partial.flush()
+                            yield delta
+                    if finished:
+                        break
+                    if time.time() - start >= wait_time:
+                        logger.warning(f"{wait_time}秒以内にレスポンスが完了しませんでした")
+                        break
+                    time.sleep(poll_interval)
+
+            # レスポンスを通常の出力形式で保存し、部分ファイルを削除する
+            # Save the response in the normal output formats and remove the partial file
+            response_html = self._extract_response_html()
+            if not response_html:
+                logger.warning("レスポンスが見つかりませんでした")
+                return None
+            self.last_saved_files = self._save_response(response_html, message, base_filename=base_filename)
+            self._cache_response(url, message, use_deep_research, response_html, complete=finished)
+            os.remove(partial_path)
+            return response_html
+
+        except Exception as e:
+            logger.error(f"エラーが発生しました: {e}")
+            if emitted:
+                logger.info(f"部分的なレスポンスを保存しました: {partial_path}")
+                logger.info(f"Saved partial response: {partial_path}")
+            return None
+        finally:
+            self._close_extra_tabs(original_window)
+
+    def _cached_response(self, url, message, use_deep_research):
+        """
+        Return the cached response of a question if it can produce every requested output format.
+        要求されたすべての出力形式を作成できる場合、質問のキャッシュされたレスポンスを返す
+
+        HTML output needs the cached HTML; Markdown and YAML need the Markdown or the HTML.
+        An entry stored without them (e.g. captured from the network without HTML) is a miss.
+
+        Returns:
+            dict or None: "html" and "markdown" of the response, or None if it must be sent.
+        """
+        if self.cache is None or self.refresh:
+            return None
+        try:
+            cached = self.cache.get(url, message, use_deep_research)
+        except Exception as e:
+            logger.warning(f"キャッシュを読み込めませんでした: {e}")
+            return None
+        if not cached:
+            return None
+        if "html" in self.output_formats and not cached["html"]:
+            return None
+        if ("md" in self.output_formats or "yaml" in self.output_formats) and not (cached["markdown"] or
+                                                                                  cached["html"]):
+            return None
+        return cached
+
+    def _cache_response(self, url, message, use_deep_research, html_content, markdown_content=None,
+                        complete=True):
+        """
+        Store a response in the cache (if one is used). Responses that did not complete within
+        the wait time may be partial and are not stored.
+        レスポンスをキャッシュに保存する（キャッシュを使用している場合）。待機時間内に完了しなかった
+        レスポンスは部分的な可能性があるため保存しない
+        """
+        if self.cache is None:
+            return
+        if not complete:
+            logger.info("完了しなかったレスポンスはキャッシュに保存しません")
+            logger.info("The response did not complete, so it is not cached")
+            return
+        try:
+            self.cache.put(url, message, use_deep_research, html=html_content, markdown=markdown_content)
+        except Exception as e:
+            logger.warning(f"レスポンスをキャッシュに保存できませんでした: {e}")
+
+    def _submit_message(self, url, message, chat_selector, submit_selector, use_deep_research):
+        """
+        Open the chat page in the current tab (if needed), type the message and submit it.
+        現在のタブでチャットページを開き（必要な場合）、メッセージを入力して送信する
+
+        When the answer opens in a new tab, the driver is switched to that tab.
+        """
+        # 同じURLを表示中で前の回答が残っていない場合はページを再読み込みしない（バッチモードでセッションを再利用）
+        # Do not reload the page if it already shows the URL and no previous answer (reuses the session in batch mode)
+        if normalize_chat_url(self.driver.current_url) != normalize_chat_url(url) or self._shows_previous_response():
+            logger.info(f"URLにアクセス中: {url}")
+            self.driver.get(url)
+
+        # チャット入力要素を待機して取得
+        chat_input = self.wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, chat_selector)))
+
+        # 入力要素を含むフォームを見つける
+        # Find the form containing the input element
+        form_element = None
+        try:
+            form_element = chat_input.find_element(By.XPATH, "./ancestor::form")
+            logger.info("フォーム要素を見つけました")
+        except Exception as e:
+            logger.warning(f"フォーム要素が見つかりませんでした。直接セレクタを使用します: {e}")
+
+        chat_input.clear()
+        chat_input.send_keys(message)
+        logger.info(f"メッセージ入力: {message}")
+
+        # 深い研究トグルを有効にする（存在する場合）
+        if use_deep_research:
             try:
-                element = self.driver.find_element(By.CSS_SELECTOR, selector)
-                if element and element.text.strip():
-                    logger.info(f"レスポンス要素を発見: {selector}")
+                if form_element:
+                    # フォーム内で深い研究トグルを探す
+                    deep_research_label = form_element.find_element(By.XPATH,
+                                                                    ".//label[contains(text(), '深い研究')]")
+                    if deep_research_label:
+                        # ラベルの親要素からトグルを見つける
+                        toggle_div = deep_research_label.find_element(By.XPATH,
+                                                                      "./following-sibling::div[@id='useDeep']")
+                        if toggle_div:
+                            toggle_div.click()
+                            logger.info("「深い研究」トグルを有効化しました")
+                else:
+                    # フォームが見つからない場合は従来の方法で探す
+                    deep_research_label = self.driver.find_element(By.XPATH,
+                                                                   "//label[contains(text(), '深い研究')]")
+                    if deep_research_label:
+                        toggle_div = deep_research_label.find_element(By.XPATH,
+                                                                      "./following-sibling::div[@id='useDeep']")
+                        if toggle_div:
+                            toggle_div.click()
+                            logger.info("「深い研究」トグルを有効化しました")
+            except Exception as e:
+                logger.warning(f"「深い研究」トグルが見つからないか、クリックできませんでした: {e}")
 
-                    # サムズアップ/ダウンボタンが存在するか確認
-                    # Check if thumbs up/down buttons exist
-                    thumbs_selector = "div.flex.items-center.gap-1.text-neutral-300"
+        # 送信ボタンを探してクリック
+        submit_button = None
+        if form_element:
+            # フォーム内でボタンを探す（より信頼性が高い）
+            try:
+                # まずフォーム内で指定されたセレクタを使用
+                submit_button = form_element.find_element(By.CSS_SELECTOR, submit_selector)
+                logger.info("フォーム内で指定されたセレクタでボタンを見つけました")
+            except Exception:
+                # 指定されたセレクタが見つからない場合、フォーム内の任意のボタンを探す
+                try:
+                    submit_button = form_element.find_element(By.CSS_SELECTOR, "button[type='submit']")
+                    logger.info("フォーム内でtype='submit'のボタンを見つけました")
+                except Exception:
                     try:
-                        thumbs_element = self.driver.find_element(By.CSS_SELECTOR, thumbs_selector)
-                        logger.info("サムズアップ/ダウンボタンを発見")
-
-                        # サムズアップ/ダウンボタンを含むレスポンスを返す
-                        # Return the response including thumbs up/down buttons
-                        full_html = element.get_attribute("outerHTML")
-                        thumbs_html = thumbs_element.get_attribute("outerHTML")
-                        return f"{full_html}\n{thumbs_html}"
-                    except:
-                        # サムズアップ/ダウンボタンが見つからない場合は通常のレスポンスを返す
-                        # Return the normal response if thumbs up/down buttons are not found
-                        return element.get_attribute("outerHTML")
-            except Exception as e:
-                continue
+                        # 最後の手段としてフォーム内の任意のボタンを探す
+                        submit_button = form_element.find_element(By.TAG_NAME, "button")
+                        logger.info("フォーム内で任意のボタンを見つけました")
+                    except Exception as e:
+                        logger.warning(f"フォーム内でボタンが見つかりませんでした: {e}")
+
+        # フォーム内でボタンが見つからなかった場合、従来の方法で探す
+        if not submit_button:
+            submit_button = self.wait.until(EC.element_to_be_clickable((By.CSS_SELECTOR, submit_selector)))
+            logger.info("従来の方法でボタンを見つけました")
+
+        # ボタンをクリック
+        handles_before = set(self.driver.window_handles)
+        submit_button.click()
+        logger.info("送信ボタンをクリック")
+
+        # 新しいタブが開いたかチェック
+        # Check if a new tab has opened
+        wait_new_tab = WebDriverWait(self.driver, 5)
+        try:
+            # 新しいウィンドウが開くのを待機
+            # Wait for a new window to open
+            wait_new_tab.until(lambda d: len(d.window_handles) > len(handles_before))
+            logger.info("新しいタブが開きました")
+
+            # 新しいタブに切り替え
+            # Switch to the new tab
+            for window_handle in self.driver.window_handles:
+                if window_handle not in handles_before:
+                    self.driver.switch_to.window(window_handle)
+                    logger.info("新しいタブに切り替えました")
+                    self._prepare_tab()
+                    break
+        except Exception as e:
+            logger.info(f"新しいタブは開きませんでした: {e}")
+
+    def _wait_for_completion(self, wait_time, quiet_period=DEFAULT_QUIET_PERIOD):
+        """
+        Wait until the response on the current tab is complete.
+        現在のタブのレスポンスが完了するまで待機する
+
+        A MutationObserver injected into the page resolves as soon as the thumbs up/down
+        buttons appear, or once the response text has appeared and then stopped changing
+        for quiet_period seconds, so the wait follows the actual length of the response
+        (up to wait_time). A slow first token never counts as quiet. If the script cannot
+        run, the thumbs selector is waited for from Python instead.
+
+        Returns:
+            bool: True if the response completed, False if wait_time ran out.
+        """
+        try:
+            self.driver.set_script_timeout(wait_time + 10)
+            reason = self.driver.execute_async_script(COMPLETION_SCRIPT, THUMBS_SELECTOR, RESPONSE_SELECTORS,
+                                                      int(quiet_period * 1000), int(wait_time * 1000))
+            if reason == "thumbs":
+                logger.info("サムズアップ/ダウンボタンが表示されました（メッセージ完了）")
+            elif reason == "quiet":
+                logger.info(f"レスポンスが{quiet_period}秒間変化しませんでした（メッセージ完了）")
+            else:
+                logger.warning(f"{wait_time}秒以内にレスポンスが完了しませんでした")
+            return reason in ("thumbs", "quiet")
+        except Exception as e:
+            logger.warning(f"MutationObserverによる完了検出に失敗しました。サムズボタンを待機します: {e}")
+
+        # サムズアップ/ダウンボタンが表示されるのを待機（メッセージ完了の指標）
+        # Wait for thumbs up/down buttons to appear (indicator of message completion)
+        try:
+            # 最大wait_time秒間待機
+            # Wait for a maximum of wait_time seconds
+            thumbs_wait = WebDriverWait(self.driver, wait_time)
+            thumbs_wait.until(EC.presence_of_element_located((By.CSS_SELECTOR, THUMBS_SELECTOR)))
+            logger.info("サムズアップ/ダウンボタンが表示されました（メッセージ完了）")
+            return True
+        except Exception as e:
+            logger.warning(f"サムズアップ/ダウンボタンが表示されませんでした: {e}")
+            # 固定の待機時間を使用
+            # Use fixed wait time as fallback
+            logger.info(f"{wait_time}秒間待機中...")
+            time.sleep(wait_time)
+            return False
+
+    def _completion_state(self, quiet_period=DEFAULT_QUIET_PERIOD):
+        """
+        Check without blocking whether the response on the current tab is complete.
+        現在のタブのレスポンスが完了したかをブロックせずに確認する
+
+        Returns:
+            bool: True if the thumbs up/down buttons are shown or the response text has stopped changing.
+        """
+        try:
+            state = self.driver.execute_script(COMPLETION_STATE_SCRIPT, THUMBS_SELECTOR, RESPONSE_SELECTORS)
+            return bool(state["thumbs"] or (state["changed"] and state["quiet"] >= quiet_period))
+        except Exception:
+            return bool(self.driver.find_elements(By.CSS_SELECTOR, THUMBS_SELECTOR))
+
+    def _new_tab(self):
+        """
+        Open a new tab and switch to it (in the session's browser context when attached to a daemon).
+        新しいタブを開いて切り替える（デーモンに接続している場合はセッションのブラウザコンテキスト内）
+        """
+        if self._session is not None:
+            self._session.new_tab()
+        else:
+            self.driver.switch_to.new_window('tab')
+        self._prepare_tab()
+
+    def _prepare_tab(self):
+        """
+        Apply the lean URL blocking to the current tab (Network.setBlockedURLs only affects one tab).
+        現在のタブに軽量プロファイルのURLブロックを適用する（Network.setBlockedURLsは1つのタブにしか効かない）
+        """
+        if self.lean:
+            apply_lean_settings(self.driver)
+
+    def _close_extra_tabs(self, original_window):
+        """
+        Close the tab a question switched to and go back to the original tab, so the next question reuses it.
+        質問で切り替えたタブを閉じて元のタブに戻る（次の質問で同じタブを再利用するため）
+
+        Only that tab is closed: a daemon browser also holds the tabs of other sessions.
+        """
+        if original_window is None:
+            return
+        try:
+            if self.driver.current_window_handle != original_window:
+                self.driver.close()
+            self.driver.switch_to.window(original_window)
+        except Exception as e:
+            logger.warning(f"タブを閉じることができませんでした: {e}")
 
-        logger.warning("レスポンス要素が見つかりませんでした")
-        return None
+    def run_batch(self, questions, chat_selector="textarea", submit_selector="button[type='submit']",
+                  wait_time=5, debug=False, quiet_period=DEFAULT_QUIET_PERIOD):
+        """
+        Send a list of questions through this browser session and write one index of the results.
+        このブラウザセッションで質問のリストを送信し、結果を1つのインデックスにまとめる
+
+        The driver is started once and reused for every question; the page is only
+        loaded when the target URL differs from the one currently shown or the tab still
+        shows the previous answer.
+
+        Args:
+            questions (list): Dicts with "url", "message" and "deep" (see load_questions).
+            chat_selector (str): CSS selector for the chat input element.
+            submit_selector (str): CSS selector for the submit button.
+            wait_time (int): Maximum time to wait for each response in seconds.
+            debug (bool): Whether to enable debug mode.
+            quiet_period (float): Seconds without changes of the response text after which it is treated as complete.
+
+        Returns:
+            tuple: (results, index_path), where results is a list of dicts with the url, message,
+                deep flag, status, saved files and elapsed seconds of each question.
+        """
+        results = []
+        for number, question in enumerate(questions, 1):
+            logger.info(f"質問 {number}/{len(questions)}: {question['message']}")
+            logger.info(f"Question {number}/{len(questions)}: {question['message']}")
+            start = time.time()
+            response = self.send_chat_message(
+                url=question["url"],
+                message=question["message"],
+                chat_selector=chat_selector,
+                submit_selector=submit_selector,
+                wait_time=wait_time,
+                debug=debug,
+                use_deep_research=question["deep"],
+                quiet_period=quiet_period
+            )
+            results.append(batch_result(question, response, self.last_saved_files, self.output_dir, start))
+
+        return results, write_batch_index(self.writer, self.output_dir, results)
+
+    def _shows_previous_response(self):
+        """
+        Check whether the current tab still shows an answer, whose thumbs buttons and response
+        element would be mistaken for the next answer.
+        現在のタブに回答が残っているか確認する（そのサムズボタンとレスポンス要素が次の回答と誤認されるため）
+        """
+        try:
+            return bool(self.driver.execute_script(PREVIOUS_RESPONSE_SCRIPT, RESPONSE_SELECTORS, THUMBS_SELECTOR))
+        except Exception as e:
+            logger.debug(f"Could not inspect the current page, reloading it: {e}")
+            return True
+
+    def _lookup_response(self):
+        """
+        Find the response element on the current tab in one round-trip.
+        現在のタブのレスポンス要素を1回の往復で検索する
+
+        Returns:
+            dict or None: "selector", "html" (outerHTML of the response) and "thumbs"
+                (outerHTML of the thumbs up/down buttons, or None), or None if nothing was found.
+        """
+        try:
+            return self.driver.execute_script(RESPONSE_LOOKUP_SCRIPT, RESPONSE_SELECTORS, THUMBS_SELECTOR)
+        except Exception as e:
+            logger.warning(f"レスポンス要素の検索に失敗しました: {e}")
+            return None
+
+    def _extract_response_html(self):
+        """
+        Return the HTML of the response on the current tab (with the thumbs up/down buttons, if shown).
+        現在のタブのレスポンスのHTMLを返す（サムズアップ/ダウンボタンが表示されていれば含める）
+
+        Every selector is evaluated in the browser by one execute_script call instead of
+        one WebDriver round-trip per selector.
+        """
+        result = self._lookup_response()
+        if not result:
+            logger.warning("レスポンス要素が見つかりませんでした")
+            return None
+
+        logger.info(f"レスポンス要素を発見: {result['selector']}")
+        if result["thumbs"]:
+            # サムズアップ/ダウンボタンを含むレスポンスを返す
+            # Return the response including thumbs up/down buttons
+            logger.info("サムズアップ/ダウンボタンを発見")
+            return f"{result['html']}\n{result['thumbs']}"
+        return result["html"]
 
     def _html_to_markdown(self, html_content):
         """
@@ -295,66 +876,76 @@ class ChatScraperSelenium:
         """
         return markdown_to_yaml(markdown_content)
 
-    def _save_response(self, html_content, query):
+    @staticmethod
+    def _base_filename(query):
+        """
+        Return the file name (without extension) of a response: timestamp and the start of the query.
+        レスポンスのファイル名（拡張子なし）を返す: タイムスタンプとクエリの先頭
+        """
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        query_part = re.sub(r'[^\w\s]', '', query)[:20].strip().replace(' ', '_')
+        return f"{timestamp}_{query_part}"
+
+    def _save_response(self, html_content, query, base_filename=None, markdown_content=None):
         """
         Save the response in the specified formats.
 
         Args:
-            html_content (str): The HTML content to save.
+            html_content (str): The HTML content to save (may be None when markdown_content is given).
             query (str): The query that generated the response.
+            base_filename (str, optional): File name without extension. Derived from the time and query if None.
+            markdown_content (str, optional): Markdown of the response, if already known (e.g. captured
+                from the network); otherwise it is converted from html_content.
+
+        Returns:
+            list: The paths of the saved files.
         """
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        query_part = re.sub(r'[^\w\s]', '', query)[:20].strip().replace(' ', '_')
-        base_filename = f"{timestamp}_{query_part}"
+        if base_filename is None:
+            base_filename = self._base_filename(query)
+
+        # Markdownは一度だけ変換し、md/yamlの両方で使い回す
+        # Convert to Markdown once and fan it out to both md and yaml
+        if markdown_content is None and html_content and ("md" in self.output_formats or
+                                                          "yaml" in self.output_formats):
+            markdown_content = self._html_to_markdown(html_content)
+
+        contents = {
+            "html": html_content,
+            "md": markdown_content,
+            "yaml": self._markdown_to_yaml(markdown_content) if "yaml" in self.output_formats and markdown_content
+            else None,
+        }
+        labels = {"html": "HTML", "md": "Markdown", "yaml": "YAML"}
 
         saved_files = []
 
-        # Save in each specified format
+        # Save in each specified format (files are written by the background writer)
         for fmt in self.output_formats:
-            if fmt == "html":
-                # Save as HTML
-                html_filename = f"{base_filename}.html"
-                html_file_path = os.path.join(self.output_dir, html_filename)
-                with open(html_file_path, 'w', encoding='utf-8') as f:
-                    f.write(html_content)
-                saved_files.append(html_file_path)
-                logger.info(f"HTMLレスポンスを保存しました: {html_file_path}")
-                logger.info(f"Saved HTML response: {html_file_path}")
-
-            elif fmt == "md":
-                # Convert to Markdown and save
-                markdown_content = self._html_to_markdown(html_content)
-                if markdown_content:
-                    md_filename = f"{base_filename}.md"
-                    md_file_path = os.path.join(self.output_dir, md_filename)
-                    with open(md_file_path, 'w', encoding='utf-8') as f:
-                        f.write(markdown_content)
-                    saved_files.append(md_file_path)
-                    logger.info(f"Markdownレスポンスを保存しました: {md_file_path}")
-                    logger.info(f"Saved Markdown response: {md_file_path}")
-
-            elif fmt == "yaml":
-                # If we already have Markdown content, convert directly from Markdown to YAML
-                # This preserves formatting better than going through HTML
-                if 'md' in self.output_formats and 'markdown_content' in locals():
-                    yaml_content = self._markdown_to_yaml(markdown_content)
-                else:
-                    # Otherwise convert from HTML to YAML
-                    yaml_content = self._html_to_yaml(html_content)
-
-                if yaml_content:
-                    yaml_filename = f"{base_filename}.yaml"
-                    yaml_file_path = os.path.join(self.output_dir, yaml_filename)
-                    with open(yaml_file_path, 'w', encoding='utf-8') as f:
-                        f.write(yaml_content)
-                    saved_files.append(yaml_file_path)
-                    logger.info(f"YAMLレスポンスを保存しました: {yaml_file_path}")
-                    logger.info(f"Saved YAML response: {yaml_file_path}")
+            content = contents.get(fmt)
+            if not content:
+                continue
+            file_path = self.writer.write(os.path.join(self.output_dir, f"{base_filename}.{fmt}"), content)
+            saved_files.append(file_path)
+            logger.info(f"{labels[fmt]}レスポンスを保存しました: {file_path}")
+            logger.info(f"Saved {labels[fmt]} response: {file_path}")
 
         return saved_files
 
     def close(self):
-        self.driver.quit()
+        try:
+            if self._session is not None:
+                # ブラウザコンテキストを破棄する（デーモンのブラウザは動き続ける）
+                # Dispose of the browser context (the daemon browser keeps running)
+                self._session.close()
+            elif self._driver is not None:
+                self._driver.quit()
+        finally:
+            # 未書き込みのレスポンスを書き出す
+            # Write any pending responses
+            if self._owns_writer:
+                self.writer.close()
+            else:
+                self.writer.flush()
 
 
 def convert_md_to_yaml(md_file_path, output_dir=None):
@@ -385,19 +976,73 @@ def parse_arguments():
     # Convert mode parser
     convert_parser = subparsers.add_parser("convert", help="変換モード (Convert mode)")
     convert_parser.add_argument("--md", required=True,
-                                help="変換するMarkdownファイルのパス (Path to Markdown file to convert)")
+                                help="変換するMarkdownファイル、ディレクトリ、またはglobパターン "
+                                     "(Markdown file, directory or glob pattern to convert)")
     convert_parser.add_argument("--output",
                                 help="出力ディレクトリ (Output directory) [デフォルト: 入力ファイルと同じディレクトリ]")
+    convert_parser.add_argument("--workers", type=int,
+                                help="ディレクトリ/glob変換のワーカープロセス数 (Worker processes for directory/glob conversion) "
+                                     "[デフォルト: CPU数]")
+    convert_parser.add_argument("--force", action="store_true",
+                                help="YAMLが最新でも再変換する (Convert even if the YAML is newer than the Markdown)")
+    convert_parser.add_argument("--export", choices=["jsonl", "yaml-stream"],
+                                help="すべてのファイルを1つのJSONL/マルチドキュメントYAMLに書き込む。--outputは出力ファイル "
+                                     "(Stream all files into one JSONL or multi-document YAML file; --output is the "
+                                     "output file)")
 
     # Add chat mode arguments to the main parser for backward compatibility
     parser.add_argument("--url", help="チャットインターフェースのURL (URL of the chat interface)")
     parser.add_argument("--message", help="送信するメッセージ (Message to send)")
+    parser.add_argument("--batch",
+                        help="質問ファイル（1行1質問のテキスト、またはurl/message/deepを持つJSONL）を1つのブラウザで順に送信する "
+                             "(Send every question of a file (text, one per line, or JSONL with url/message/deep) "
+                             "through one browser)")
+    parser.add_argument("--parallel", type=int, default=1,
+                        help="--batchで並列に使うブラウザ/タブの数 (Number of browsers or tabs used in parallel with --batch) "
+                             "[デフォルト: 1]")
+    parser.add_argument("--parallel-mode", choices=["drivers", "tabs"], default="drivers",
+                        help="並列実行の方法: ワーカーごとのブラウザ、または1つのブラウザ内のタブ "
+                             "(Run workers as separate browsers or as tabs of one browser) [デフォルト: drivers]")
     parser.add_argument("--selector", default="textarea",
                         help="チャット入力要素のCSSセレクタ (CSS selector for the chat input element) [デフォルト: textarea]")
     parser.add_argument("--button", default="button",
                         help="送信ボタンのCSSセレクタ (CSS selector for the submit button) [デフォルト: button[type='submit']]")
     parser.add_argument("--wait", type=int, default=30,
                         help="レスポンスを待つ時間（秒） (Time to wait for response in seconds) [デフォルト: 30]")
+    parser.add_argument("--quiet", type=float, default=DEFAULT_QUIET_PERIOD,
+                        help="レスポンスのテキストの変化がこの秒数止まったら完了とみなす (Treat the response as complete when its text has not "
+                             "changed for this many seconds) [デフォルト: 5]")
+    parser.add_argument("--capture", choices=["dom", "network"], default="dom",
+                        help="回答の取得方法: ページ、またはChrome DevToolsで取得したネットワークのペイロード（取得できない場合はページ） "
+                             "(Read answers from the page, or from the network payload via Chrome DevTools with the "
+                             "page as fallback) [デフォルト: dom]")
+    parser.add_argument("--lean", action="store_true",
+                        help="軽量プロファイルを使用する（eagerページ読み込み、画像・フォント・アクセス解析・バックグラウンド通信を無効化） "
+                             "(Use the lean browser profile: eager page loads; no images, fonts, analytics or "
+                             "background networking)")
+    parser.add_argument("--profile-dir",
+                        help="実行間で再利用するChromeのプロファイル/キャッシュディレクトリ (Chrome profile/cache directory reused across runs)")
+    parser.add_argument("--browser", metavar="HOST:PORT",
+                        help="起動済みのChrome（ブラウザデーモンなど）にdebuggerAddressで接続する "
+                             "(Attach to a running Chrome, e.g. the browser daemon, through its debuggerAddress)")
+    parser.add_argument("--daemon", action="store_true",
+                        help="ローカルのブラウザデーモンに接続する（起動していない場合は起動する） "
+                             "(Attach to the local browser daemon, starting it if needed)")
+    parser.add_argument("--refresh", action="store_true",
+                        help="キャッシュを使わずに質問を送信する（新しいレスポンスはキャッシュに保存される） "
+                             "(Ignore cached responses; fresh responses are still cached)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="レスポンスキャッシュを無効にする (Disable the response cache)")
+    parser.add_argument("--cache-file", default=default_cache_path(),
+                        help="レスポンスキャッシュのデータベース (Response cache database) "
+                             "[デフォルト: ~/.cache/deepwiki-to-md/chat_cache.sqlite3]")
+    parser.add_argument("--cache-ttl", type=float, default=DEFAULT_TTL,
+                        help="キャッシュの有効期間（秒） (Seconds a cached response stays valid) [デフォルト: 86400]")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_MAX_ENTRIES,
+                        help="キャッシュする最大レスポンス数 (Maximum number of cached responses) [デフォルト: 1000]")
+    parser.add_argument("--stream", action="store_true",
+                        help="レスポンスを表示中に標準出力へ逐次出力し、.partial.mdに追記する "
+                             "(Print the response while it renders and append it to a .partial.md file)")
     parser.add_argument("--debug", action="store_true", help="デバッグモードを有効にする (Enable debug mode)")
     parser.add_argument("--output", default="ChatResponses",
                         help="出力ディレクトリ (Output directory) [デフォルト: ChatResponses]")
@@ -410,14 +1055,14 @@ def parse_arguments():
 
     # Set default mode to chat if not specified or if chat-related arguments are provided
     if args.mode is None:
-        if args.url or args.message:
+        if args.url or args.message or args.batch:
             args.mode = "chat"
         else:
             args.mode = "chat"  # Default to chat mode
 
     # Validate required arguments for chat mode
-    if args.mode == "chat" and (args.url is None or args.message is None):
-        parser.error("Chat mode requires --url and --message arguments")
+    if args.mode == "chat" and args.batch is None and (args.url is None or args.message is None):
+        parser.error("Chat mode requires --url and --message arguments (or --batch)")
 
     return args
 
@@ -429,7 +1074,35 @@ def main():
 
     # モードに応じて処理を分岐
     # Branch processing according to mode
-    if args.mode == "convert":
+    if args.mode == "convert" and args.export:
+        # Stream every Markdown file into one export file
+        output_path = args.output or f"export{EXPORT_FORMATS[args.export]}"
+        try:
+            count = export_markdown_tree(args.md, output_path, export_format=args.export)
+        except FileNotFoundError:
+            print(f"ファイルまたはディレクトリが見つかりません: {args.md}")
+            print(f"No such file or directory: {args.md}")
+            return 1
+        print(f"{count} 件のレコードを書き込みました: {output_path}")
+        print(f"Wrote {count} records: {output_path}")
+    elif args.mode == "convert" and not os.path.isfile(args.md):
+        # Bulk conversion of a directory tree or glob pattern
+        print(f"Markdownファイルを一括変換中: {args.md}")
+        print(f"Converting Markdown files: {args.md}")
+
+        try:
+            summary = convert_md_files_to_yaml(args.md, args.output, force=args.force, max_workers=args.workers)
+        except FileNotFoundError:
+            print(f"ファイルまたはディレクトリが見つかりません: {args.md}")
+            print(f"No such file or directory: {args.md}")
+            return 1
+
+        print(f"変換: {summary['converted']} / {summary['files']}、スキップ（最新）: {summary['skipped']}、"
+              f"失敗: {summary['failed']}")
+        print(f"Converted: {summary['converted']} of {summary['files']}, skipped (up to date): "
+              f"{summary['skipped']}, failed: {summary['failed']}")
+        print(f"{summary['seconds']} s, {summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s")
+    elif args.mode == "convert":
         # Markdown to YAML conversion mode
         print(f"Markdownファイルを変換中: {args.md}")
         print(f"Converting Markdown file: {args.md}")
@@ -442,13 +1115,84 @@ def main():
         else:
             print("変換に失敗しました")
             print("Conversion failed")
+    elif args.batch:
+        # バッチモード: すべての質問を1つのブラウザで送信する
+        # Batch mode: send every question through one browser
+        cache = None if args.no_cache else open_cache(args.cache_file, ttl=args.cache_ttl, max_entries=args.cache_size)
+        browser = resolve_browser(args.browser, args.daemon, headless=args.headless, lean=args.lean,
+                                  profile_dir=args.profile_dir)
+        questions = load_questions(args.batch, default_url=args.url, default_deep=args.deep)
+        print(f"{len(questions)} 件の質問を送信します: {args.batch}")
+        print(f"Sending {len(questions)} questions: {args.batch}")
+
+        if args.parallel > 1:
+            # 複数のブラウザ/タブで並列に送信する
+            # Send the questions in parallel from several browsers or tabs
+            try:
+                from deepwiki_to_md.chat_executor import ParallelChatExecutor
+            except ImportError:
+                from .chat_executor import ParallelChatExecutor
+            scraper = ParallelChatExecutor(
+                workers=args.parallel,
+                mode=args.parallel_mode,
+                output_dir=args.output,
+                headless=args.headless,
+                output_format=args.format,
+                capture=args.capture,
+                lean=args.lean,
+                profile_dir=args.profile_dir,
+                cache=cache,
+                refresh=args.refresh,
+                browser=browser
+            )
+            run = scraper.run
+        else:
+            scraper = ChatScraperSelenium(
+                output_dir=args.output,
+                headless=args.headless,
+                output_format=args.format,
+                capture=args.capture,
+                lean=args.lean,
+                profile_dir=args.profile_dir,
+                cache=cache,
+                refresh=args.refresh,
+                browser=browser
+            )
+            run = scraper.run_batch
+
+        try:
+            results, index_path = run(
+                questions,
+                chat_selector=args.selector,
+                submit_selector=args.button,
+                wait_time=args.wait,
+                debug=args.debug,
+                quiet_period=args.quiet
+            )
+        finally:
+            # ブラウザを閉じる
+            # Close the browser
+            scraper.close()
+
+        succeeded = sum(1 for result in results if result["status"] == "ok")
+        print(f"成功: {succeeded} / {len(results)}、インデックス: {index_path}")
+        print(f"Succeeded: {succeeded} of {len(results)}, index: {index_path}")
     else:  # "chat" mode (default)
         # スクレイパーを初期化
         # Initialize the scraper
+        cache = None if args.no_cache else open_cache(args.cache_file, ttl=args.cache_ttl, max_entries=args.cache_size)
+        browser = resolve_browser(args.browser, args.daemon, headless=args.headless, lean=args.lean,
+                                  profile_dir=args.profile_dir)
         scraper = ChatScraperSelenium(
             output_dir=args.output,
             headless=args.headless,
-            output_format=args.format
+            output_format=args.format,
+            capture=args.capture,
+            lean=args.lean,
+            profile_dir=args.profile_dir,
+            cache=cache,
+            refresh=args.refresh,
+            browser=browser
         )
 
         try:
@@ -461,15 +1205,30 @@ def main():
             print(f"出力フォーマット: {args.format}")
             print(f"Output format: {args.format}")
 
-            response = scraper.send_chat_message(
+            options = dict(
                 url=args.url,
                 message=args.message,
                 chat_selector=args.selector,
                 submit_selector=args.button,
                 wait_time=args.wait,
                 debug=args.debug,
-                use_deep_research=args.deep
+                use_deep_research=args.deep,
+                quiet_period=args.quiet
             )
+            if args.stream:
+                # 表示中のレスポンスを逐次出力する
+                # Print the response while it renders
+                stream = scraper.stream_chat_message(**options)
+                while True:
+                    try:
+                        sys.stdout.write(next(stream))
+                        sys.stdout.flush()
+                    except StopIteration as stop:
+                        response = stop.value
+                        print()
+                        break
+            else:
+                response = scraper.send_chat_message(**options)
 
             if response:
                 print("レスポンスを取得しました")
@@ -483,7 +1242,7 @@ def main():
             # Close the browser
             scraper.close()
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
 
 # 使用例:
 # チャットモード (Chat mode):
@@ -492,10 +1251,28 @@ if __name__ == "__main__":
 # python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "こんにちは" --format "md" --wait 10 --debug
 # python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "詳細な説明をお願いします" --format "yaml" --wait 15 --debug
 # python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "詳細な説明をお願いします" --format "html,md,yaml" --wait 15 --deep --debug
+# python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "詳細な説明をお願いします" \
+#     --format "md" --wait 300 --deep --stream
+# python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "こんにちは" \
+#     --format "md" --headless --lean --profile-dir ".chrome-profile"
+# python -m deepwiki_to_md.test_chat --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" --message "こんにちは" \
+#     --format "md" --headless --daemon
+#
+# バッチモード (Batch mode):
+# python -m deepwiki_to_md.test_chat --batch "questions.txt" --url "https://deepwiki.com/yuyu1815/deepwiki_to_md" \
+#     --format "md" --headless
+# python -m deepwiki_to_md.test_chat --batch "questions.jsonl" --format "html,md,yaml" --headless
+# python -m deepwiki_to_md.test_chat --batch "questions.jsonl" --format "md" --headless --parallel 4
+# python -m deepwiki_to_md.test_chat --batch "questions.jsonl" --format "md" --headless --parallel 4 \
+#     --parallel-mode tabs
+# python -m deepwiki_to_md.test_chat --batch "questions.jsonl" --format "md" --parallel 4 --browser "127.0.0.1:9222"
 #
 # 変換モード (Convert mode):
 # python -m deepwiki_to_md.test_chat convert --md "path/to/markdown/file.md"
 # python -m deepwiki_to_md.test_chat convert --md "path/to/markdown/file.md" --output "path/to/output/directory"
+# python -m deepwiki_to_md.test_chat convert --md "Documents/cpython" --output "YAML/cpython" --workers 8
+# python -m deepwiki_to_md.test_chat convert --md "Documents/**/md/*.md"
+# python -m deepwiki_to_md.test_chat convert --md "Documents/cpython" --export jsonl --output "cpython.jsonl"
 #
 # 注意: ボタンセレクタの指定について
 # --button オプションでボタンのCSSセレクタを指定できますが、より確実にクリックするために
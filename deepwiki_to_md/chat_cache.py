@@ -0,0 +1,155 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, Optional
+from urllib.parse import urlsplit, urlunsplit
+
+# ログ設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Defaults: entries expire after one day and at most 1000 responses are kept
+# デフォルト: エントリーは1日で期限切れになり、最大1000件のレスポンスを保持する
+DEFAULT_TTL = 24 * 60 * 60
+DEFAULT_MAX_ENTRIES = 1000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    key TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    message TEXT NOT NULL,
+    deep INTEGER NOT NULL,
+    html TEXT,
+    markdown TEXT,
+    created REAL NOT NULL,
+    accessed REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed);
+"""
+
+
+def default_cache_path() -> str:
+    """
+    Return the default cache database path (under $XDG_CACHE_HOME or ~/.cache).
+    デフォルトのキャッシュデータベースのパスを返す（$XDG_CACHE_HOMEまたは~/.cache以下）
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "deepwiki-to-md", "chat_cache.sqlite3")
+
+
+def normalize_chat_url(url):
+    """
+    Normalize a chat URL for comparison (scheme/host case, trailing slash and fragment are ignored).
+    比較用にチャットのURLを正規化する（スキーム・ホストの大文字小文字、末尾のスラッシュ、フラグメントを無視）
+    """
+    parts = urlsplit(url or "")
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path.rstrip('/'), parts.query, ''))
+
+
+def cache_key(url: str, message: str, deep: bool) -> str:
+    """
+    Return the cache key of a question: the normalized URL, the message and the Deep Research flag.
+    質問のキャッシュキーを返す（正規化したURL、メッセージ、「深い研究」フラグ）
+    """
+    data = json.dumps([normalize_chat_url(url), message.strip(), bool(deep)], ensure_ascii=False)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+
+class ChatCache:
+    """
+    同じ質問へのチャットレスポンスを保存するローカルキャッシュ
+    Local cache of chat responses to identical questions
+
+    Responses are stored in a small SQLite database keyed by cache_key(). Entries older
+    than ttl seconds are treated as missing, and when more than max_entries are stored
+    the least recently used ones are evicted. Each call opens its own connection, so one
+    cache file can be shared by several threads and processes.
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: float = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        """
+        Initialize the ChatCache.
+
+        Args:
+            path (str, optional): Path of the cache database. Defaults to default_cache_path().
+            ttl (float): Seconds after which an entry expires.
+            max_entries (int): Maximum number of stored responses.
+        """
+        self.path = path or default_cache_path()
+        self.ttl = ttl
+        self.max_entries = max(1, max_entries)
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        connection = self._connect()
+        try:
+            connection.executescript(_SCHEMA)
+        finally:
+            connection.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, url: str, message: str, deep: bool = False) -> Optional[Dict[str, Optional[str]]]:
+        """
+        Return the cached response of a question, or None if it is missing or expired.
+        質問のキャッシュされたレスポンスを返す（存在しないか期限切れの場合はNone）
+
+        Returns:
+            dict or None: "html" and "markdown" of the response (either may be None).
+        """
+        key = cache_key(url, message, deep)
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute("SELECT html, markdown, created FROM responses WHERE key = ?",
+                                         (key,)).fetchone()
+                if row is None:
+                    return None
+                if now - row[2] > self.ttl:
+                    connection.execute("DELETE FROM responses WHERE key = ?", (key,))
+                    return None
+                connection.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            return {"html": row[0], "markdown": row[1]}
+        finally:
+            connection.close()
+
+    def put(self, url: str, message: str, deep: bool, html: Optional[str] = None,
+            markdown: Optional[str] = None) -> None:
+        """
+        Store the response of a question, evicting expired and least recently used entries.
+        質問のレスポンスを保存し、期限切れと最も使われていないエントリーを削除する
+        """
+        now = time.time()
+        connection = self._connect()
+        try:
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO responses (key, url, message, deep, html, markdown, created, accessed) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (cache_key(url, message, deep), url, message, int(bool(deep)), html, markdown, now, now))
+                connection.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl,))
+                connection.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY accessed DESC LIMIT -1 OFFSET ?)", (self.max_entries,))
+        finally:
+            connection.close()
+
+
+def open_cache(path: Optional[str] = None, ttl: float = DEFAULT_TTL,
+               max_entries: int = DEFAULT_MAX_ENTRIES) -> Optional[ChatCache]:
+    """
+    Open the response cache, or return None (and run without it) if it cannot be opened.
+    レスポンスキャッシュを開く（開けない場合は警告を出してNoneを返し、キャッシュなしで実行する）
+
+    The cache is used by default, so a directory that cannot be written (a read-only home,
+    some containers) must not stop the chat before a single message is sent.
+    """
+    try:
+        return ChatCache(path, ttl=ttl, max_entries=max_entries)
+    except (sqlite3.Error, OSError) as e:
+        logger.warning(f"レスポンスキャッシュを開けませんでした。キャッシュなしで実行します: {e}")
+        logger.warning(f"Could not open the response cache, running without it: {e}")
+        return None
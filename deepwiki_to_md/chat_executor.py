@@ -0,0 +1,259 @@
+import logging
+import os
+import threading
+import time
+
+from .chat import DEFAULT_QUIET_PERIOD, ChatScraperSelenium, batch_result, write_batch_index
+from .output_writer import OutputWriter
+from .worker_pool import run_worker_pool
+
+# ログ設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Supported parallel modes: one browser per worker, or one tab per worker in a single browser
+# 対応する並列モード: ワーカーごとに1つのブラウザ、または1つのブラウザ内でワーカーごとに1つのタブ
+PARALLEL_MODES = ("drivers", "tabs")
+
+
+class ParallelChatExecutor:
+    """
+    複数のブラウザまたはタブで質問を並列に送信するチャット実行器
+    Chat executor that submits questions in parallel from several browsers or tabs
+
+    In "drivers" mode, each worker owns a ChatScraperSelenium (its own Chrome) and
+    takes questions from a shared queue. In "tabs" mode, one browser keeps up to
+    `workers` questions in flight, each in its own tab, and polls the tabs for the
+    thumbs up/down buttons or a response text that has stopped changing. Every response
+    is saved through _save_response as soon as it completes, and all workers share one
+    background writer.
+    """
+
+    def __init__(self, workers=2, mode="drivers", output_dir="ChatResponses", headless=True, output_format="html",
+                 poll_interval=1.0, capture="dom", lean=False, profile_dir=None, cache=None, refresh=False,
+                 browser=None):
+        """
+        Initialize the ParallelChatExecutor.
+
+        Args:
+            workers (int): Number of browsers ("drivers") or tabs ("tabs") used in parallel.
+            mode (str): "drivers" or "tabs".
+            output_dir (str): The directory to save the responses.
+            headless (bool): Whether to run the browsers in headless mode.
+            output_format (str): "html", "md", "yaml", or a comma-separated list of formats.
+            poll_interval (float): Seconds between completion checks of the open tabs ("tabs" mode).
+            capture (str): "dom" or "network" (see ChatScraperSelenium). The tabs of one browser share
+                its network log, so "tabs" mode always reads answers from the page.
+            lean (bool): Whether to use the lean browser profile.
+            profile_dir (str, optional): Chrome profile directory reused across runs. A browser can only
+                use one profile at a time, so each browser of "drivers" mode gets its own subdirectory.
+            cache (ChatCache, optional): Response cache shared by all workers.
+            refresh (bool): Whether to ignore cached responses (fresh responses are still stored).
+            browser (str, optional): debuggerAddress of a running Chrome (the browser daemon). Each
+                worker then attaches to it with its own browser context instead of starting Chrome.
+        """
+        if mode not in PARALLEL_MODES:
+            raise ValueError(f"Invalid parallel mode: {mode}. Use one of {', '.join(PARALLEL_MODES)}.")
+        self.workers = max(1, workers)
+        self.mode = mode
+        self.output_dir = output_dir
+        self.headless = headless
+        self.output_format = output_format
+        self.poll_interval = poll_interval
+        if capture == "network" and mode == "tabs":
+            logger.warning("tabsモードではネットワークキャプチャを使用できません。ページから取得します")
+            logger.warning("Network capture is not available in tabs mode; answers are read from the page")
+            capture = "dom"
+        self.capture = capture
+        self.lean = lean
+        self.profile_dir = profile_dir
+        self.cache = cache
+        self.refresh = refresh
+        self.browser = browser
+        self._started = 0
+        self._lock = threading.Lock()
+        self.writer = OutputWriter()
+
+    def _create_scraper(self):
+        profile_dir = self.profile_dir
+        if profile_dir and not self.browser:
+            with self._lock:
+                profile_dir = os.path.join(profile_dir, f"worker-{self._started}")
+                self._started += 1
+        return ChatScraperSelenium(output_dir=self.output_dir, headless=self.headless,
+                                   output_format=self.output_format, writer=self.writer, capture=self.capture,
+                                   lean=self.lean, profile_dir=profile_dir, cache=self.cache, refresh=self.refresh,
+                                   browser=self.browser)
+
+    def run(self, questions, chat_selector="textarea", submit_selector="button[type='submit']", wait_time=30,
+            debug=False, quiet_period=DEFAULT_QUIET_PERIOD):
+        """
+        Send every question and write one index of the results.
+        すべての質問を送信し、結果を1つのインデックスにまとめる
+
+        Args:
+            questions (list): Dicts with "url", "message" and "deep" (see chat.load_questions).
+            chat_selector (str): CSS selector for the chat input element.
+            submit_selector (str): CSS selector for the submit button.
+            wait_time (int): Maximum time to wait for each response in seconds.
+            debug (bool): Whether to enable debug mode.
+            quiet_period (float): Seconds without changes of the response text after which it is treated as complete.
+
+        Returns:
+            tuple: (results, index_path); results are in the order of the questions.
+        """
+        options = dict(chat_selector=chat_selector, submit_selector=submit_selector, wait_time=wait_time,
+                       debug=debug, quiet_period=quiet_period)
+        if self.mode == "drivers":
+            results = self._run_drivers(questions, options)
+        else:
+            results = self._run_tabs(questions, options)
+        return results, write_batch_index(self.writer, self.output_dir, results)
+
+    def _run_drivers(self, questions, options):
+        """
+        Run the questions on a pool of browsers, one worker thread per browser.
+        ブラウザのプールで質問を実行する（ブラウザごとに1つのワーカースレッド）
+        """
+        results = [None] * len(questions)
+        # キャッシュ用のスクレイパーはブラウザを起動しない
+        # The scraper used for the cache never starts a browser
+        cache_scraper = ChatScraperSelenium(output_dir=self.output_dir, output_format=self.output_format,
+                                            writer=self.writer, cache=self.cache, refresh=self.refresh)
+        pending = self._answer_cached(cache_scraper, questions, results)
+
+        def start_worker(number):
+            scraper = self._create_scraper()
+            try:
+                # ブラウザは遅延起動されるため、ここで起動して失敗を検出する
+                # The browser starts lazily, so start it here to detect a failure
+                scraper.driver
+            except Exception:
+                scraper.close()
+                raise
+            return scraper
+
+        def handle_question(scraper, index):
+            question = questions[index]
+            start = time.time()
+            response = scraper.send_chat_message(url=question["url"], message=question["message"],
+                                                 use_deep_research=question["deep"], **options)
+            logger.info(f"完了 {index + 1}/{len(questions)} ({threading.current_thread().name})")
+            logger.info(f"Finished {index + 1}/{len(questions)} ({threading.current_thread().name})")
+            return batch_result(question, response, scraper.last_saved_files, self.output_dir, start)
+
+        def handle_error(index, error):
+            return batch_result(questions[index], None, [], self.output_dir, time.time())
+
+        for index, result in zip(pending, run_worker_pool(pending, self.workers, start_worker, handle_question,
+                                                          handle_error, thread_name_prefix="ChatWorker")):
+            results[index] = result
+
+        # どのブラウザも処理しなかった質問は失敗として記録する
+        # Record questions that no browser could take as failed
+        return [result if result is not None else batch_result(question, None, [], self.output_dir, time.time())
+                for question, result in zip(questions, results)]
+
+    def _run_tabs(self, questions, options):
+        """
+        Run the questions in up to `workers` tabs of one browser, polling the tabs for completion.
+        1つのブラウザの最大workers個のタブで質問を実行し、タブの完了をポーリングする
+        """
+        scraper = self._create_scraper()
+        results = [None] * len(questions)
+        pending = self._answer_cached(scraper, questions, results)
+        if not pending:
+            return results
+
+        driver = scraper.driver
+        home_window = driver.current_window_handle
+        # answer tab -> (index, question, question tab, start time)
+        active = {}
+
+        try:
+            while pending or active:
+                # 空いているタブに次の質問を送信する
+                # Submit the next questions while tabs are free
+                while pending and len(active) < self.workers:
+                    index = pending.pop(0)
+                    question = questions[index]
+                    start = time.time()
+                    scraper._new_tab()
+                    question_window = driver.current_window_handle
+                    try:
+                        scraper._submit_message(question["url"], question["message"], options["chat_selector"],
+                                                options["submit_selector"], question["deep"])
+                    except Exception as e:
+                        logger.error(f"エラーが発生しました: {e}")
+                        results[index] = batch_result(question, None, [], self.output_dir, start)
+                        self._close_tabs(driver, {driver.current_window_handle, question_window}, home_window)
+                        continue
+                    active[driver.current_window_handle] = (index, question, question_window, start)
+
+                # 各タブの完了を確認し、完了したレスポンスをすぐに保存する
+                # Check each tab and save finished responses right away
+                for answer_window, (index, question, question_window, start) in list(active.items()):
+                    driver.switch_to.window(answer_window)
+                    finished = scraper._completion_state(options["quiet_period"])
+                    if not finished and time.time() - start < options["wait_time"]:
+                        continue
+                    if not finished:
+                        logger.warning(f"{options['wait_time']}秒以内にレスポンスが完了しませんでした: {question['message']}")
+
+                    response_html = scraper._extract_response_html()
+                    saved_files = scraper._save_response(response_html, question["message"]) if response_html else []
+                    if response_html:
+                        scraper._cache_response(question["url"], question["message"], question["deep"], response_html,
+                                                complete=finished)
+                    results[index] = batch_result(question, response_html, saved_files, self.output_dir, start)
+                    logger.info(f"完了 {index + 1}/{len(questions)}")
+                    logger.info(f"Finished {index + 1}/{len(questions)}")
+                    self._close_tabs(driver, {answer_window, question_window}, home_window)
+                    del active[answer_window]
+
+                if active:
+                    time.sleep(self.poll_interval)
+        finally:
+            scraper.close()
+        return results
+
+    def _answer_cached(self, scraper, questions, results):
+        """
+        Save the questions found in the cache without using the browser.
+        キャッシュにある質問をブラウザを使わずに保存する
+
+        Returns:
+            list: Indices of the questions that still have to be sent.
+        """
+        pending = []
+        for index, question in enumerate(questions):
+            cached = scraper._cached_response(question["url"], question["message"], question["deep"])
+            if cached:
+                start = time.time()
+                saved_files = scraper._save_response(cached["html"], question["message"],
+                                                     markdown_content=cached["markdown"])
+                results[index] = batch_result(question, True, saved_files, self.output_dir, start)
+            else:
+                pending.append(index)
+        return pending
+
+    @staticmethod
+    def _close_tabs(driver, windows, home_window):
+        """
+        Close the tabs of one question and go back to the first tab.
+        1つの質問のタブを閉じて最初のタブに戻る
+        """
+        for window in windows:
+            try:
+                driver.switch_to.window(window)
+                driver.close()
+            except Exception as e:
+                logger.warning(f"タブを閉じることができませんでした: {e}")
+        driver.switch_to.window(home_window)
+
+    def close(self):
+        """
+        Write any pending responses.
+        未書き込みのレスポンスを書き出す
+        """
+        self.writer.close()
@@ -0,0 +1,184 @@
+import base64
+import json
+import logging
+
+# ログ設定
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Chrome capability that makes ChromeDriver record DevTools network events in the performance log
+# ChromeDriverがDevToolsのネットワークイベントをパフォーマンスログに記録するためのChromeの設定
+PERFORMANCE_LOG_CAPABILITY = ("goog:loggingPrefs", {"performance": "ALL"})
+
+# Resource types whose responses may carry the streamed answer
+# ストリーミングされた回答を含む可能性のあるリソースの種類
+STREAM_RESOURCE_TYPES = {"Fetch", "XHR", "EventSource"}
+
+# MIME types of streamed answers: server-sent events and JSON lines
+# ストリーミングされた回答のMIMEタイプ: Server-Sent EventsとJSON行
+STREAM_MIME_TYPES = {"text/event-stream", "application/x-ndjson", "application/ndjson", "application/jsonl",
+                     "application/x-jsonlines", "application/stream+json"}
+
+# JSON keys that hold text in streamed chunks, in order of preference
+# ストリーミングされたチャンクでテキストを持つJSONのキー（優先順）
+TEXT_KEYS = ("delta", "content", "text", "chunk", "data", "message", "choices")
+
+
+def payload_text(value):
+    """
+    Extract the text of one decoded JSON chunk.
+    デコードされたJSONチャンク1つからテキストを取り出す
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, list):
+        return "".join(payload_text(item) for item in value)
+    if isinstance(value, dict):
+        for key in TEXT_KEYS:
+            if key in value:
+                text = payload_text(value[key])
+                if text:
+                    return text
+    return ""
+
+
+def is_stream_response(resource_type, mime_type):
+    """
+    Check whether a response may carry a streamed answer (an EventSource, or an SSE/JSON lines body).
+    レスポンスがストリーミングされた回答を含む可能性があるか確認する（EventSource、またはSSE/JSON行のボディ）
+    """
+    if resource_type not in STREAM_RESOURCE_TYPES:
+        return False
+    return resource_type == "EventSource" or (mime_type or "").split(";")[0].strip().lower() in STREAM_MIME_TYPES
+
+
+def split_payload(body):
+    """
+    Split a streamed response body into chunks.
+    ストリーミングされたレスポンスボディをチャンクに分割する
+
+    Returns:
+        tuple: (chunks, plain_text) - server-sent event data lines (which may be plain text), or
+            the JSON lines of the body (other lines are dropped).
+    """
+    lines = body.splitlines()
+    data_lines = [line[5:].lstrip() for line in lines if line.startswith("data:")]
+    if data_lines:
+        return [line for line in data_lines if line and line != "[DONE]"], True
+    return [line for line in lines if line.lstrip().startswith(("{", "["))], False
+
+
+def assemble_markdown(chunks, plain_text=True):
+    """
+    Join the text of streamed chunks into the Markdown of the answer.
+    ストリーミングされたチャンクのテキストを連結して回答のMarkdownにする
+
+    JSON chunks contribute the text found under TEXT_KEYS. Other chunks are used as they are
+    when plain_text is True (server-sent event data) and dropped otherwise.
+    """
+    parts = []
+    for chunk in chunks:
+        try:
+            parts.append(payload_text(json.loads(chunk)))
+        except ValueError:
+            if plain_text:
+                parts.append(chunk)
+    return "".join(parts).strip()
+
+
+class NetworkCapture:
+    """
+    DevToolsのネットワークイベントからチャットの回答を取り出すキャプチャ
+    Capture of chat answers from the DevTools network events of a Chrome session
+
+    The driver must be created with PERFORMANCE_LOG_CAPABILITY. reset() discards the
+    events recorded so far (call it before submitting a question); collect() reads the
+    new events and assembles the answer from, in order of preference, EventSource
+    messages, the body of the last finished streaming fetch/XHR response (SSE or JSON
+    lines), or JSON WebSocket frames. Other responses (HTML, scripts, RSC payloads) are
+    ignored, so when no stream is found the caller falls back to the page.
+    """
+
+    def __init__(self, driver):
+        self.driver = driver
+        try:
+            self.driver.execute_cdp_cmd("Network.enable", {})
+        except Exception as e:
+            logger.warning(f"Network.enableに失敗しました: {e}")
+
+    def reset(self):
+        """
+        Discard the network events recorded so far.
+        これまでに記録されたネットワークイベントを破棄する
+        """
+        try:
+            self.driver.get_log("performance")
+        except Exception as e:
+            logger.warning(f"パフォーマンスログを読み込めませんでした: {e}")
+
+    def collect(self):
+        """
+        Assemble the answer from the network events recorded since reset().
+        reset()以降に記録されたネットワークイベントから回答を組み立てる
+
+        Returns:
+            str or None: The Markdown of the answer, or None if nothing was captured.
+        """
+        try:
+            entries = self.driver.get_log("performance")
+        except Exception as e:
+            logger.warning(f"パフォーマンスログを読み込めませんでした: {e}")
+            return None
+
+        responses = {}
+        finished = []
+        frames = []
+        event_source_messages = []
+        for entry in entries:
+            try:
+                message = json.loads(entry["message"])["message"]
+            except (KeyError, TypeError, ValueError):
+                continue
+            method, params = message.get("method"), message.get("params", {})
+            if method == "Network.responseReceived" and is_stream_response(
+                    params.get("type"), params.get("response", {}).get("mimeType")):
+                responses[params["requestId"]] = params["response"].get("url", "")
+            elif method == "Network.loadingFinished":
+                finished.append(params.get("requestId"))
+            elif method == "Network.webSocketFrameReceived":
+                frames.append(params.get("response", {}).get("payloadData", ""))
+            elif method == "Network.eventSourceMessageReceived":
+                event_source_messages.append(params.get("data", ""))
+
+        # 情報源の優先順に回答を選ぶ（長さでは選ばない）
+        # Choose the answer by source, not by length
+        answer = assemble_markdown(event_source_messages)
+        if not answer:
+            answer = self._stream_body_answer([request_id for request_id in finished if request_id in responses],
+                                              responses)
+        if not answer:
+            answer = assemble_markdown(frames, plain_text=False)
+        return answer or None
+
+    def _stream_body_answer(self, request_ids, responses):
+        """
+        Assemble the answer from the last finished streaming response that yields text.
+        テキストが得られる最後に完了したストリーミングレスポンスから回答を組み立てる
+        """
+        for request_id in reversed(request_ids):
+            url = responses[request_id]
+            try:
+                result = self.driver.execute_cdp_cmd("Network.getResponseBody", {"requestId": request_id})
+            except Exception as e:
+                logger.debug(f"Could not read the response body of {url}: {e}")
+                continue
+            body = result.get("body", "")
+            if result.get("base64Encoded"):
+                try:
+                    body = base64.b64decode(body).decode("utf-8")
+                except ValueError:
+                    continue
+            answer = assemble_markdown(*split_payload(body))
+            if answer:
+                return answer
+        return ""
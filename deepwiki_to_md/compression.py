@@ -0,0 +1,133 @@
+import gzip
+from typing import Optional
+
+# File suffix of each supported compression method
+# 対応する圧縮方式ごとのファイル拡張子
+COMPRESSION_SUFFIXES = {
+    "gzip": ".gz",
+    "zstd": ".zst",
+}
+
+# Default compression levels (fast, still several times smaller for Markdown/HTML)
+# デフォルトの圧縮レベル（高速で、Markdown/HTMLでも数倍小さくなる）
+DEFAULT_LEVELS = {
+    "gzip": 6,
+    "zstd": 3,
+}
+
+
+def _zstandard():
+    """
+    Import the optional zstandard package.
+    オプションのzstandardパッケージをインポートする
+    """
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the 'zstandard' package (pip install zstandard)")
+    return zstandard
+
+
+def check_compression(method: Optional[str]) -> None:
+    """
+    Validate a compression method (None means no compression).
+    圧縮方式を検証する（Noneは圧縮なし）
+    """
+    if method is None:
+        return
+    if method not in COMPRESSION_SUFFIXES:
+        raise ValueError(f"Invalid compression: {method}. Use one of {', '.join(COMPRESSION_SUFFIXES)}.")
+    if method == "zstd":
+        _zstandard()
+
+
+def compressed_path(path: str, method: Optional[str]) -> str:
+    """
+    Return the path with the compression suffix added (e.g. page.md -> page.md.zst).
+    圧縮方式の拡張子を付けたパスを返す
+    """
+    return path + COMPRESSION_SUFFIXES[method] if method else path
+
+
+def detect_compression(path: str) -> Optional[str]:
+    """
+    Return the compression method of a file from its suffix, or None for plain files.
+    拡張子からファイルの圧縮方式を返す（非圧縮の場合はNone）
+    """
+    for method, suffix in COMPRESSION_SUFFIXES.items():
+        if path.endswith(suffix):
+            return method
+    return None
+
+
+def strip_compression_suffix(path: str) -> str:
+    """
+    Remove the compression suffix from a path (page.md.zst -> page.md).
+    パスから圧縮の拡張子を取り除く
+    """
+    method = detect_compression(path)
+    return path[:-len(COMPRESSION_SUFFIXES[method])] if method else path
+
+
+def has_extension(path: str, extension: str) -> bool:
+    """
+    Check the extension of a possibly compressed file (page.md.zst has the extension .md).
+    圧縮されている可能性のあるファイルの拡張子を確認する
+    """
+    return strip_compression_suffix(path).endswith(extension)
+
+
+def compress_bytes(data: bytes, method: Optional[str], level: Optional[int] = None) -> bytes:
+    """
+    Compress bytes with the given method (returned unchanged when method is None).
+    指定した方式でバイト列を圧縮する（methodがNoneの場合はそのまま返す）
+    """
+    if method is None:
+        return data
+    if level is None:
+        level = DEFAULT_LEVELS[method]
+    if method == "gzip":
+        # mtime=0 keeps the output deterministic so identical content compresses to identical files
+        # mtime=0 で出力を決定的にし、同じ内容が同じファイルになるようにする
+        return gzip.compress(data, compresslevel=level, mtime=0)
+    return _zstandard().ZstdCompressor(level=level).compress(data)
+
+
+def decompress_bytes(data: bytes, method: Optional[str]) -> bytes:
+    """
+    Decompress bytes written by compress_bytes.
+    compress_bytesで圧縮したバイト列を展開する
+    """
+    if method is None:
+        return data
+    if method == "gzip":
+        return gzip.decompress(data)
+    return _zstandard().ZstdDecompressor().decompressobj().decompress(data)
+
+
+def read_bytes(path: str) -> bytes:
+    """
+    Read a file, decompressing it transparently according to its suffix.
+    拡張子に応じて透過的に展開しながらファイルを読み込む
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return decompress_bytes(data, detect_compression(path))
+
+
+def read_text(path: str, encoding: str = 'utf-8') -> str:
+    """
+    Read a text file that may be gzip/zstd compressed.
+    gzip/zstdで圧縮されている可能性のあるテキストファイルを読み込む
+    """
+    return read_bytes(path).decode(encoding)
+
+
+def zstd_stream_writer(fileobj, level: Optional[int] = None):
+    """
+    Wrap a binary file object in a zstd compressing stream (closing it also closes the file).
+    バイナリファイルオブジェクトをzstd圧縮ストリームでラップする（閉じるとファイルも閉じる）
+    """
+    if level is None:
+        level = DEFAULT_LEVELS["zstd"]
+    return _zstandard().ZstdCompressor(level=level).stream_writer(fileobj)
@@ -1,14 +1,20 @@
 import argparse
+import csv
+import json
 import logging
+import os
+import time
 
 from selenium import webdriver
 from selenium.common.exceptions import TimeoutException
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support import expected_conditions as EC
 from selenium.webdriver.support.ui import WebDriverWait
 
+from deepwiki_to_md.browser_daemon import DaemonSession, resolve_browser
+from deepwiki_to_md.browser_options import apply_lean_settings, attach_options, chrome_options
 from deepwiki_to_md.localization import get_message
+from deepwiki_to_md.worker_pool import run_worker_pool
 
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,22 +27,30 @@ class RepositoryCreator:
     Class for creating repository requests
     """
 
-    def __init__(self, headless=False):
+    def __init__(self, headless=False, lean=False, profile_dir=None, browser=None):
         """
         Initialize the RepositoryCreator.
 
         Args:
             headless (bool): Whether to run the browser in headless mode.
+            lean (bool): Whether to use the lean browser profile (eager page loads; no images, fonts,
+                analytics or background networking).
+            profile_dir (str, optional): Chrome profile directory reused across runs to keep the cache.
+            browser (str, optional): debuggerAddress (host:port) of a running Chrome, e.g. the browser
+                daemon, to attach to with a browser context of its own instead of starting a browser.
         """
-        options = Options()
-        if headless:
-            options.add_argument("--headless")
-        options.add_argument("--disable-gpu")
-        options.add_argument("--no-sandbox")
-        options.add_argument("--disable-dev-shm-usage")
-
-        self.driver = webdriver.Chrome(options=options)
+        self.session = None
+        # 直近のcreate()が失敗した理由 (Reason the last create() call failed)
+        self.last_error = None
+        if browser:
+            self.session = DaemonSession(browser)
+            self.driver = self.session.attach(attach_options(lean=lean))
+        else:
+            options = chrome_options(headless=headless, lean=lean, profile_dir=profile_dir)
+            self.driver = webdriver.Chrome(options=options)
         self.wait = WebDriverWait(self.driver, 20)
+        if lean:
+            apply_lean_settings(self.driver)
 
     def create(self, url, email):
         """
@@ -47,8 +61,10 @@ class RepositoryCreator:
             email (str): The email to notify.
 
         Returns:
-            bool: True if the request was submitted successfully, False otherwise.
+            bool: True if the request was submitted successfully, False otherwise; the reason
+            of a failure is kept in last_error.
         """
+        self.last_error = None
         try:
             logger.info(get_message("accessing_url", url=url))
             self.driver.get(url)
@@ -84,18 +100,120 @@ class RepositoryCreator:
                 )
                 return True
             except TimeoutException:
-                logger.error(get_message("error", error=get_message("success_message_wait_failed")))
+                self.last_error = get_message("success_message_wait_failed")
+                logger.error(get_message("error", error=self.last_error))
                 return False
 
         except Exception as e:
-            logger.error(get_message("error", error=str(e)))
+            self.last_error = str(e)
+            logger.error(get_message("error", error=self.last_error))
             return False
 
     def close(self):
         """
-        Close the browser.
+        Close the browser (or only this session's browser context when attached to a daemon).
         """
-        self.driver.quit()
+        if self.session is not None:
+            self.session.close()
+        else:
+            self.driver.quit()
+
+
+def load_requests(path, default_email=None):
+    """
+    Load a batch file of repository creation requests.
+    リポジトリ作成リクエストのバッチファイルを読み込む
+
+    Each non-empty line is "url,email", "url email", just "url" (sent with default_email),
+    or a JSON object such as {"url": "...", "email": "..."}. Lines starting with "#" are comments.
+
+    Args:
+        path (str): Path of the batch file.
+        default_email (str, optional): Email used for lines without one.
+
+    Returns:
+        list: Dicts with "url" and "email".
+    """
+    requests = []
+    with open(path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            if line.startswith('{'):
+                entry = json.loads(line)
+                url, email = entry.get("url"), entry.get("email") or default_email
+            else:
+                fields = line.replace(',', ' ').split()
+                url = fields[0]
+                email = fields[1] if len(fields) > 1 else default_email
+            if not url or not email:
+                raise ValueError(get_message("batch_line_invalid", path=path, line=line_number))
+            requests.append({"url": url, "email": email})
+    return requests
+
+
+def create_batch(requests, workers=1, headless=False, lean=False, profile_dir=None, browser=None):
+    """
+    Submit many repository creation requests with a small pool of browsers.
+    少数のブラウザのプールで多数のリポジトリ作成リクエストを送信する
+
+    Each worker thread starts one RepositoryCreator and reuses it for the requests it
+    takes from a shared queue, so at most `workers` browsers run at the same time.
+
+    Args:
+        requests (list): Dicts with "url" and "email" (see load_requests).
+        workers (int): Maximum number of browsers running in parallel.
+        headless (bool): Whether to run the browsers in headless mode.
+        lean (bool): Whether to use the lean browser profile.
+        profile_dir (str, optional): Chrome profile directory; each browser uses its own subdirectory.
+        browser (str, optional): debuggerAddress of a running Chrome (the browser daemon); each worker
+            then attaches to it with its own browser context.
+
+    Returns:
+        list: Results in the order of the requests, as dicts with url, email, status, seconds and error.
+    """
+    def start_worker(number):
+        return RepositoryCreator(headless=headless, lean=lean,
+                                 profile_dir=os.path.join(profile_dir, f"worker-{number}")
+                                 if profile_dir and not browser else None, browser=browser)
+
+    def handle_request(creator, request):
+        start = time.time()
+        success = creator.create(url=request["url"], email=request["email"])
+        return {"url": request["url"], "email": request["email"], "status": "ok" if success else "failed",
+                "seconds": round(time.time() - start, 2), "error": "" if success else creator.last_error or ""}
+
+    def handle_error(request, error):
+        return {"url": request["url"], "email": request["email"], "status": "failed", "seconds": 0,
+                "error": str(error)}
+
+    results = run_worker_pool(requests, max(1, workers), start_worker, handle_request, handle_error,
+                              thread_name_prefix="CreateWorker")
+
+    # どのブラウザも処理しなかったリクエストは失敗として記録する
+    # Record requests that no browser could take as failed
+    return [result or {"url": request["url"], "email": request["email"], "status": "failed", "seconds": 0,
+                       "error": get_message("browser_start_failed")}
+            for request, result in zip(requests, results)]
+
+
+def write_report(results, path):
+    """
+    Write the results of a batch as CSV or JSON (chosen by the file extension).
+    バッチの結果をCSVまたはJSONで書き込む（拡張子で選択）
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    if path.lower().endswith(".json"):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+    else:
+        with open(path, 'w', encoding='utf-8', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=["url", "email", "status", "seconds", "error"])
+            writer.writeheader()
+            writer.writerows(results)
 
 
 def parse_arguments():
@@ -105,14 +223,31 @@ def parse_arguments():
     """
     parser = argparse.ArgumentParser(description=get_message("repo_creation_description"))
 
-    parser.add_argument("--url", required=True,
+    parser.add_argument("--url",
                         help=get_message("repo_url_help"))
-    parser.add_argument("--email", required=True,
+    parser.add_argument("--email",
                         help=get_message("repo_email_help"))
+    parser.add_argument("--batch",
+                        help=get_message("repo_batch_help"))
+    parser.add_argument("--parallel", type=int, default=1,
+                        help=get_message("repo_parallel_help", default=1))
+    parser.add_argument("--report", default="create_report.csv",
+                        help=get_message("repo_report_help", default="create_report.csv"))
     parser.add_argument("--headless", action="store_true",
                         help=get_message("headless_mode_help"))
+    parser.add_argument("--lean", action="store_true",
+                        help=get_message("lean_mode_help"))
+    parser.add_argument("--profile-dir",
+                        help=get_message("profile_dir_help"))
+    parser.add_argument("--browser", metavar="HOST:PORT",
+                        help=get_message("browser_address_help"))
+    parser.add_argument("--daemon", action="store_true",
+                        help=get_message("browser_daemon_help"))
 
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.batch is None and (args.url is None or args.email is None):
+        parser.error(get_message("repo_url_email_required"))
+    return args
 
 
 def main():
@@ -123,10 +258,25 @@ def main():
     # コマンドライン引数を解析
     # Parse command line arguments
     args = parse_arguments()
+    browser = resolve_browser(args.browser, args.daemon, headless=args.headless, lean=args.lean,
+                              profile_dir=args.profile_dir)
+
+    if args.batch:
+        # バッチモード: ファイル内のすべてのリクエストをブラウザのプールで送信する
+        # Batch mode: submit every request of the file with a pool of browsers
+        requests = load_requests(args.batch, default_email=args.email)
+        print(get_message("repo_batch_info", count=len(requests), workers=max(1, args.parallel)))
+        results = create_batch(requests, workers=args.parallel, headless=args.headless, lean=args.lean,
+                               profile_dir=args.profile_dir, browser=browser)
+        write_report(results, args.report)
+        succeeded = sum(1 for result in results if result["status"] == "ok")
+        print(get_message("repo_batch_summary", succeeded=succeeded, total=len(results), report=args.report))
+        return 0 if succeeded == len(results) else 1
 
     # リポジトリ作成リクエスタを初期化
     # Initialize the repository creator
-    creator = RepositoryCreator(headless=args.headless)
+    creator = RepositoryCreator(headless=args.headless, lean=args.lean, profile_dir=args.profile_dir,
+                                browser=browser)
 
     try:
         # リポジトリ作成リクエストを送信
@@ -155,3 +305,9 @@ if __name__ == "__main__":
 # 使用例:
 # python -m deepwiki_to_md.create --url "https://example.com/repository/create" --email "user@example.com"
 # python -m deepwiki_to_md.create --url "https://example.com/repository/create" --email "user@example.com" --headless
+# python -m deepwiki_to_md.create --url "https://example.com/repository/create" --email "user@example.com" \
+#     --headless --lean --profile-dir ".chrome-profile"
+# python -m deepwiki_to_md.create --batch "repos.txt" --email "user@example.com" --parallel 4 --headless \
+#     --report "report.json"
+# python -m deepwiki_to_md.create --url "https://example.com/repository/create" --email "user@example.com" \
+#     --headless --daemon
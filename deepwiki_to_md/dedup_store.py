@@ -0,0 +1,130 @@
+import hashlib
+import logging
+import os
+import shutil
+import threading
+
+from .output_writer import Content, atomic_write, content_to_bytes
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Name of the object directory inside the store root
+# ストアのルート内のオブジェクトディレクトリの名前
+OBJECTS_DIR = ".objects"
+
+
+class DedupStore:
+    """
+    コンテンツアドレス方式の重複排除ストア
+    Content-addressed deduplication store
+
+    Each file written through the store is hashed (SHA-256) and its bytes are kept
+    once under <root>/.objects. Every output path is a hardlink to that object, so
+    identical sections repeated across pages or library versions cost one copy on
+    disk and one write. Objects persist under the root, so duplicates are also
+    detected across runs. On filesystems without hardlinks a plain copy is written.
+    """
+
+    def __init__(self, root: str):
+        """
+        Initialize the DedupStore.
+
+        Args:
+            root (str): Root directory of the store (usually the scraper's output directory).
+        """
+        self.root = root
+        self.objects_dir = os.path.join(root, OBJECTS_DIR)
+        self.stats = {"unique": 0, "duplicates": 0, "bytes_saved": 0}
+        self._known_objects = set()
+        self._lock = threading.Lock()
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest[2:])
+
+    def materialize(self, path: str, content: Content, fsync: bool = False, encoding: str = 'utf-8') -> bool:
+        """
+        Write content to path as a hardlink to its stored object, storing the object first if it is new.
+        内容をオブジェクトとして一度だけ保存し、パスはそのオブジェクトへのハードリンクにする
+
+        Args:
+            path (str): Destination file path.
+            content (str | bytes | sequence): Content to write.
+            fsync (bool): Whether to fsync newly written files.
+            encoding (str): Encoding used when content is a string.
+
+        Returns:
+            bool: True if the content was a duplicate of something already stored.
+        """
+        data = content_to_bytes(content, encoding)
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+        with self._lock:
+            duplicate = digest in self._known_objects or os.path.exists(object_path)
+            if not duplicate:
+                os.makedirs(os.path.dirname(object_path), exist_ok=True)
+                atomic_write(object_path, data, fsync=fsync)
+            self._known_objects.add(digest)
+
+        # 既に同じオブジェクトへのリンクであれば何もしない
+        # Nothing to do if path already links to the same object
+        try:
+            if os.path.samefile(path, object_path):
+                self._count(duplicate, len(data))
+                return duplicate
+        except OSError:
+            pass
+
+        # 一時名でリンクしてからリネームし、既存ファイルをアトミックに置き換える
+        # Link under a temporary name, then rename to replace any existing file atomically
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.lnk"
+        try:
+            os.link(object_path, tmp_path)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            # ハードリンク非対応のファイルシステムではコピーにフォールバックする
+            # Fall back to a plain copy on filesystems without hardlinks
+            logger.debug(f"Hardlink failed for {path}, writing a copy instead: {e}")
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+            atomic_write(path, data, fsync=fsync)
+
+        self._count(duplicate, len(data))
+        return duplicate
+
+    def _count(self, duplicate: bool, size: int) -> None:
+        with self._lock:
+            if duplicate:
+                self.stats["duplicates"] += 1
+                self.stats["bytes_saved"] += size
+            else:
+                self.stats["unique"] += 1
+
+    def prune(self) -> int:
+        """
+        Remove stored objects that no longer have any hardlinked file.
+        ハードリンクされたファイルがなくなったオブジェクトを削除する
+
+        Returns:
+            int: Number of objects removed.
+        """
+        if not os.path.isdir(self.objects_dir):
+            return 0
+        removed = 0
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            for name in os.listdir(prefix_dir):
+                object_path = os.path.join(prefix_dir, name)
+                if os.stat(object_path).st_nlink <= 1:
+                    os.remove(object_path)
+                    self._known_objects.discard(prefix + name)
+                    removed += 1
+            if not os.listdir(prefix_dir):
+                shutil.rmtree(prefix_dir, ignore_errors=True)
+        return removed
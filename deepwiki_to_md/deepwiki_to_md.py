@@ -11,6 +11,7 @@ from bs4 import BeautifulSoup
 from markdownify import markdownify
 
 from .localization import get_message
+from .output_writer import create_writer
 
 # Import DirectDeepwikiScraper
 try:
@@ -21,11 +22,13 @@ except ImportError:
         from .direct_scraper import DirectDeepwikiScraper
     except ImportError:
         logging.error("Could not import DirectDeepwikiScraper module")
+
         # Define a dummy class that does nothing if import fails
         # インポートに失敗した場合、何もしないダミークラスを定義する
         class DirectDeepwikiScraper:
             def __init__(self, *args, **kwargs):
                 pass
+
             def scrape_page(self, *args, **kwargs):
                 raise NotImplementedError("DirectDeepwikiScraper is not available.")
 
@@ -38,6 +41,7 @@ except ImportError:
         from .direct_scraper import scrape_deepwiki
     except ImportError:
         logging.error("Could not import scrape_deepwiki function from direct_scraper.py")
+
         # Define a dummy function that does nothing if import fails
         # インポートに失敗した場合、何もしないダミー関数を定義する
         def scrape_deepwiki(url):
@@ -54,17 +58,15 @@ except ImportError:
     except ImportError:
         logging.error("Could not import DirectMarkdownScraper module")
 
-
         # Define a dummy class that does nothing if import fails
         # インポートに失敗した場合、何もしないダミークラスを定義する
         class DirectMarkdownScraper:
             def __init__(self, *args, **kwargs):
                 pass
+
             def scrape_page(self, *args, **kwargs):
                 raise NotImplementedError("DirectDeepwikiScraper is not available.")
 
-
-
 # Configure logging
 logging.basicConfig(
     level=logging.INFO,
@@ -74,22 +76,29 @@ logger = logging.getLogger(__name__)
 
 # Import fix_markdown_links function
 try:
-    from deepwiki_to_md.fix_markdown_links import fix_markdown_links
+    from deepwiki_to_md.fix_markdown_links import fix_markdown_links_parallel, fix_links_in_content
 except ImportError:
     # If the module import fails, try relative import
     try:
-        from .fix_markdown_links import fix_markdown_links
+        from .fix_markdown_links import fix_markdown_links_parallel, fix_links_in_content
     except ImportError:
         logger.error("Could not import fix_markdown_links module")
-        # Define a dummy function that does nothing if import fails
+
+        # Define dummy functions that do nothing if import fails
         # インポートに失敗した場合、何もしないダミー関数を定義する
-        def fix_markdown_links(directory):
+        def fix_markdown_links_parallel(directory, files=None, skip_files=None, max_workers=None):
             logger.error("fix_markdown_links module not available")
-            return
+            return {"files": 0, "changed": 0, "links": 0}
+
+        def fix_links_in_content(content):
+            logger.error("fix_markdown_links module not available")
+            return content, 0
 
 
 class DeepwikiScraper:
-    def __init__(self, output_dir="Documents", use_direct_scraper=False, use_alternative_scraper=False):
+    def __init__(self, output_dir="Documents", use_direct_scraper=False, use_alternative_scraper=False,
+                 use_direct_md_scraper=False, writer=None, dedup=False, output_format="directory",
+                 compression=None):
         """
         Initialize the DeepwikiScraper.
 
@@ -98,8 +107,21 @@ class DeepwikiScraper:
             use_direct_scraper (bool): Whether to use DirectDeepwikiScraper for scraping.
             use_alternative_scraper (bool): Whether to use scrape_deepwiki from direct_scraper.py for scraping. When True, this method is prioritized. Default is True.
             use_direct_md_scraper (bool): Whether to use DirectMarkdownScraper for direct Markdown scraping. When True, this method is prioritized over all others. Default is False.
+            writer (OutputWriter, optional): Background writer shared by all scrapers to save files.
+                A new one is created if None.
+            dedup (bool): Whether to store identical files once (under <output_dir>/.objects) and hardlink duplicates,
+                across pages and runs. Ignored if a writer is given.
+            output_format (str): "directory" (default), "zip"/"tar" to stream each library into one archive,
+                "sqlite" for one full-text indexed database, or "jsonl"/"yaml-stream" for one
+                record-per-section export file per library. Ignored if a writer is given.
+            compression (str, optional): "gzip" or "zstd" to store files compressed (e.g. page.md.zst).
+                Ignored if a writer is given.
         """
-        if use_direct_scraper:
+        if use_direct_md_scraper:
+            self.use_direct_scraper = False
+            self.use_alternative_scraper = False
+            self.use_direct_md_scraper = True
+        elif use_direct_scraper:
             self.use_direct_scraper = True
             self.use_alternative_scraper = False
             self.use_direct_md_scraper = False
@@ -113,15 +135,26 @@ class DeepwikiScraper:
             self.use_direct_md_scraper = True
         self.output_dir = output_dir
 
+        # Absolute paths of Markdown files written in this run; their links are already fixed
+        # この実行で書き込んだMarkdownファイルの絶対パス（リンクは修正済み）
+        self.saved_files = set()
+
+        # All scrapers hand their output to one background writer so disk I/O does not block fetching
+        # ディスクI/Oが取得処理をブロックしないよう、すべてのスクレイパーが1つのバックグラウンドライターに出力を渡す
+        if writer is None:
+            writer = create_writer(output_dir, output_format=output_format, dedup=dedup,
+                                   compression=compression)
+        self.writer = writer
+
         # Initialize DirectMarkdownScraper (highest priority)
         # DirectMarkdownScraperを初期化（最高優先度）
         if self.use_direct_md_scraper:
-            self.direct_md_scraper = DirectMarkdownScraper(output_dir)
+            self.direct_md_scraper = DirectMarkdownScraper(output_dir, writer=self.writer)
 
         # Initialize DirectDeepwikiScraper
         # DirectDeepwikiScraperを初期化
         if self.use_direct_scraper:
-            self.direct_scraper = DirectDeepwikiScraper(output_dir)
+            self.direct_scraper = DirectDeepwikiScraper(output_dir, writer=self.writer)
 
         # Initialize requests session for static content
         # 静的コンテンツ用のリクエストセッションを初期化
@@ -378,7 +411,7 @@ class DeepwikiScraper:
 
         return markdown
 
-    def save_markdown(self, library_name, title, markdown_content, path=None):
+    def save_markdown(self, library_name, title, markdown_content, path=None, url=None):
         """
         Save the Markdown content to a file.
 
@@ -387,6 +420,7 @@ class DeepwikiScraper:
             title (str): The title of the page.
             markdown_content (str): The Markdown content to save.
             path (str, optional): The path to use for the directory structure. If None, only library_name is used.
+            url (str, optional): The URL of the page (recorded by indexing output formats such as sqlite).
         """
         # Create directory structure if it doesn't exist
         # ディレクトリ構造が存在しない場合は作成する
@@ -402,7 +436,6 @@ class DeepwikiScraper:
             # Fallback to the old behavior
             # 古い動作にフォールバックする
             dir_path = os.path.join(os.getcwd(), self.output_dir, library_name, "md")
-        os.makedirs(dir_path, exist_ok=True)
 
         # Sanitize the title to create a valid filename
         # タイトルをサニタイズして有効なファイル名を作成する
@@ -417,35 +450,21 @@ class DeepwikiScraper:
                 markdown_content = '\n'.join(lines[28:])
                 logger.info(get_message('removed_first_lines', count=28, filename=filename))
 
+        # Fix markdown links in memory before the content is written
+        # 書き込み前にメモリ上でマークダウンリンクを修正する
+        # Links with URLs are replaced with links with empty parentheses
+        # URL付きのリンクを空の括弧付きのリンクに置き換える
+        markdown_content, modified_links = fix_links_in_content(markdown_content or "")
+
         # Save the Markdown content to a file
         # Markdownコンテンツをファイルに保存する
         file_path = os.path.join(dir_path, f"{filename}.md")
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        file_path = self.writer.write(file_path, markdown_content,
+                                      metadata={"library": library_name, "url": url or "", "heading": title})
+        self.saved_files.add(os.path.abspath(file_path))
 
         logger.info(get_message('saved_file', file_path=file_path))
-
-        # Fix markdown links in the file immediately after saving
-        # 保存直後にファイル内のマークダウンリンクを修正する
-        # Use a regular expression to replace links with URLs with links with empty parentheses
-        # 正規表現を使用して、URL付きのリンクを空の括弧付きのリンクに置き換える
-        link_pattern = re.compile(r'\[([^\]]+)\]\((?![s\)])[^\)]+\)')
-
-        # Read the file content
-        # ファイルの内容を読み取る
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Replace links with URLs with links with empty parentheses
-        # URL付きのリンクを空の括弧付きのリンクに置き換える
-        modified_content = link_pattern.sub(r'[\1]()', content)
-
-        # Write the modified content back to the file
-        # 変更された内容をファイルに書き戻す
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
-
-        logger.debug(f"Fixed links in {file_path}")
+        logger.debug(f"Fixed {modified_links} links in {file_path}")
 
     def scrape_library(self, library_name, library_url):
         """
@@ -532,13 +551,15 @@ class DeepwikiScraper:
                     main_content = self.extract_content(direct_html_content, library_url)
                     if main_content:
                         markdown = self.html_to_markdown(main_content)
-                        self.save_markdown(library_name, library_name, markdown, folder_path)
+                        self.save_markdown(library_name, library_name, markdown, folder_path, url=library_url)
 
                         # Fix markdown links in the output directory
                         # 出力ディレクトリ内のマークダウンリンクを修正する
                         md_directory = os.path.join(os.getcwd(), self.output_dir, folder_path, "md")
                         logger.info(get_message('fixing_markdown_links', directory=md_directory))
-                        fix_markdown_links(md_directory)
+                        self.writer.flush()
+                        if self.writer.writes_files:
+                            fix_markdown_links_parallel(md_directory, skip_files=self.saved_files)
                         return
                     else:
                         logger.warning(f"No main content found in response from scrape_deepwiki for {library_url}")
@@ -571,13 +592,15 @@ class DeepwikiScraper:
             main_content = self.extract_content(html_content, library_url)
             if main_content:
                 markdown = self.html_to_markdown(main_content)
-                self.save_markdown(library_name, library_name, markdown, folder_path)
+                self.save_markdown(library_name, library_name, markdown, folder_path, url=library_url)
 
                 # Fix markdown links in the output directory
                 # 出力ディレクトリ内のマークダウンリンクを修正する
                 md_directory = os.path.join(os.getcwd(), self.output_dir, folder_path, "md")
                 logger.info(get_message('fixing_markdown_links', directory=md_directory))
-                fix_markdown_links(md_directory)
+                self.writer.flush()
+                if self.writer.writes_files:
+                    fix_markdown_links_parallel(md_directory, skip_files=self.saved_files)
             return
 
         # Process each navigation item
@@ -612,13 +635,15 @@ class DeepwikiScraper:
 
             # Save the Markdown content
             # Markdownコンテンツを保存する
-            self.save_markdown(library_name, title, markdown, folder_path)
+            self.save_markdown(library_name, title, markdown, folder_path, url=url)
 
         # After all navigation items are processed, fix markdown links in the output directory
         # すべてのナビゲーション項目が処理された後、出力ディレクトリ内のマークダウンリンクを修正する
         md_directory = os.path.join(os.getcwd(), self.output_dir, folder_path, "md")
         logger.info(get_message('fixing_markdown_links', directory=md_directory))
-        fix_markdown_links(md_directory)
+        self.writer.flush()
+        if self.writer.writes_files:
+            fix_markdown_links_parallel(md_directory, skip_files=self.saved_files)
 
     def run(self, libraries):
         """
@@ -632,6 +657,10 @@ class DeepwikiScraper:
             url = library['url']
             self.scrape_library(name, url)
 
+        # Make sure every queued file is on disk before returning
+        # 戻る前にキュー内のすべてのファイルがディスクに書き込まれたことを確認する
+        self.writer.flush()
+
 
 if __name__ == "__main__":
     # Example usage
@@ -5,7 +5,7 @@ import time
 from urllib.parse import urljoin
 
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Comment
 
 from .localization import get_message
 
@@ -16,6 +16,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Heading tag names mapped to their Markdown level
+HEADING_LEVELS = {f'h{i}': i for i in range(1, 7)}
+# List tag names, rendered item by item with nested lists on their own lines
+LIST_TAGS = ('ul', 'ol')
+
 
 class DeepwikiScraper:
     def __init__(self, base_url="https://deepwiki.com", output_dir="Documents"):
@@ -123,58 +128,95 @@ class DeepwikiScraper:
             return ""
 
         # This is a simple implementation. For more complex conversions,
-        # consider using a library like html2text or markdownify
-        markdown = ""
-
-        # Process headings
-        for i in range(1, 7):
-            for heading in html_element.find_all(f'h{i}'):
-                text = heading.get_text(strip=True)
-                markdown += f"{'#' * i} {text}\n\n"
-                heading.decompose()
-
-        # Process paragraphs
-        for p in html_element.find_all('p'):
-            text = p.get_text(strip=True)
-            markdown += f"{text}\n\n"
-
-        # Process lists
-        for ul in html_element.find_all('ul'):
-            for li in ul.find_all('li'):
-                text = li.get_text(strip=True)
-                markdown += f"- {text}\n"
-            markdown += "\n"
-
-        for ol in html_element.find_all('ol'):
-            for i, li in enumerate(ol.find_all('li'), 1):
-                text = li.get_text(strip=True)
-                markdown += f"{i}. {text}\n"
-            markdown += "\n"
-
-        # Process code blocks
-        for pre in html_element.find_all('pre'):
-            code = pre.get_text()
-            markdown += f"```\n{code}\n```\n\n"
-
-        # Process inline code
-        for code in html_element.find_all('code'):
-            if code.parent.name != 'pre':  # Skip code inside pre (already handled)
-                text = code.get_text()
-                markdown += f"`{text}`"
-
-        # Process links
-        for a in html_element.find_all('a'):
-            text = a.get_text(strip=True)
-            href = a.get('href', '')
-            markdown += f"[{text}]({href})"
-
-        # Process images
-        for img in html_element.find_all('img'):
-            alt = img.get('alt', '')
-            src = img.get('src', '')
-            markdown += f"![{alt}]({src})"
-
-        return markdown
+        # consider using a library like html2text or markdownify.
+        # The tree is walked once, depth-first, so the output keeps document
+        # order and the cost stays linear in the number of nodes.
+        parts = []
+        stack = [html_element]
+
+        while stack:
+            node = stack.pop()
+            name = getattr(node, 'name', None)
+            if name is None:
+                # Bare text nodes are not emitted on their own
+                continue
+
+            if name in HEADING_LEVELS:
+                text = self._inline_markdown(node)
+                parts.append(f"{'#' * HEADING_LEVELS[name]} {text}\n\n")
+            elif name == 'p':
+                text = self._inline_markdown(node)
+                parts.append(f"{text}\n\n")
+            elif name in LIST_TAGS:
+                self._list_markdown(node, parts)
+                parts.append("\n")
+            elif name == 'pre':
+                code = node.get_text()
+                parts.append(f"```\n{code}\n```\n\n")
+            elif name == 'code':
+                text = node.get_text()
+                parts.append(f"`{text}`")
+            elif name == 'a':
+                text = node.get_text(strip=True)
+                href = node.get('href', '')
+                parts.append(f"[{text}]({href})")
+            elif name == 'img':
+                alt = node.get('alt', '')
+                src = node.get('src', '')
+                parts.append(f"![{alt}]({src})")
+            else:
+                # Push children in reverse so they are visited in document order
+                stack.extend(reversed(node.contents))
+
+        return ''.join(parts)
+
+    def _inline_markdown(self, html_element):
+        """
+        Render the inline content of a block element (text, links, images and inline code) in order.
+
+        Nested lists are skipped; _list_markdown renders them on their own lines.
+        """
+        parts = []
+        stack = list(reversed(html_element.contents))
+
+        while stack:
+            node = stack.pop()
+            name = getattr(node, 'name', None)
+            if name is None:
+                if not isinstance(node, Comment):
+                    parts.append(str(node))
+            elif name in LIST_TAGS:
+                continue
+            elif name == 'code':
+                parts.append(f"`{node.get_text()}`")
+            elif name == 'a':
+                text = node.get_text(strip=True)
+                href = node.get('href', '')
+                parts.append(f"[{text}]({href})")
+            elif name == 'img':
+                alt = node.get('alt', '')
+                src = node.get('src', '')
+                parts.append(f"![{alt}]({src})")
+            else:
+                stack.extend(reversed(node.contents))
+
+        # Collapse the whitespace of the HTML source as a browser would
+        return re.sub(r'\s+', ' ', ''.join(parts)).strip()
+
+    def _list_markdown(self, list_element, parts, depth=0):
+        """
+        Append the items of a ul or ol element to parts, nested lists indented below their item.
+        """
+        indent = "    " * depth
+        number = 0
+        for li in list_element.find_all('li', recursive=False):
+            number += 1
+            marker = f"{number}." if list_element.name == 'ol' else "-"
+            parts.append(f"{indent}{marker} {self._inline_markdown(li)}\n")
+            for nested in li.find_all(LIST_TAGS):
+                # Only lists directly below this item; deeper ones are rendered by their own item
+                if nested.find_parent('li') is li:
+                    self._list_markdown(nested, parts, depth + 1)
 
     def save_markdown(self, library_name, title, markdown_content):
         """
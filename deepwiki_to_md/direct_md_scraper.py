@@ -7,23 +7,27 @@ import requests
 from bs4 import BeautifulSoup
 
 from .localization import get_message
+from .output_writer import create_writer
 
 # Import fix_markdown_links function
 try:
-    from deepwiki_to_md.fix_markdown_links import fix_markdown_links
+    from deepwiki_to_md.fix_markdown_links import fix_links_in_content
 except ImportError:
     # If the module import fails, try relative import
     try:
-        from .fix_markdown_links import fix_markdown_links
+        from .fix_markdown_links import fix_links_in_content
     except ImportError:
         logger = logging.getLogger(__name__)
         logger.error("Could not import fix_markdown_links module")
 
-
-        def fix_markdown_links(directory):
+        def fix_links_in_content(content):
             logger = logging.getLogger(__name__)
             logger.error("fix_markdown_links module not available")
-            return
+            return content, 0
+
+# ASCII bytes that str.strip() treats as whitespace, trimmed around sections
+# str.strip() が空白とみなすASCIIバイト（セクション前後で取り除く）
+_WHITESPACE = frozenset(b' \t\r\n\f\v\x1c\x1d\x1e\x1f')
 
 # Configure logging
 logging.basicConfig(
@@ -111,20 +115,137 @@ def scrape_deepwiki(url):
         raise
 
 
+def split_markdown_sections(data):
+    """
+    Markdownを見出し(##)ごとに一度の走査で分割し、オフセットを返す
+    Split Markdown at level-2 headings (##) in a single line-oriented pass
+
+    Args:
+        data (bytes | str): Markdownコンテンツ（UTF-8のバイト列推奨）
+            # Markdown content (UTF-8 bytes recommended so sections can be sliced with a memoryview)
+
+    Returns:
+        list: (start, body_start, end) のタプルのリスト。start:body_start は見出し行、
+              body_start:end は本文。最初の見出しの前の内容は start == body_start == 0 となる
+            # list: (start, body_start, end) tuples. start:body_start is the heading line and
+            # body_start:end is the body. Content before the first heading has start == body_start == 0
+    """
+    if isinstance(data, str):
+        newline, marker, blanks = '\n', '##', (' ', '\t')
+    else:
+        newline, marker, blanks = b'\n', b'##', (32, 9)
+
+    length = len(data)
+    sections = []
+    section_start = 0
+    body_start = 0
+    pos = 0
+
+    while pos < length:
+        line_end = data.find(newline, pos)
+        if line_end < 0:
+            line_end = length
+
+        # "## " または "##\t" で始まる行を見出しとして扱う（"###" は対象外）
+        # Lines starting with "## " or "##\t" are headings ("###" is not)
+        if line_end - pos > 2 and data.startswith(marker, pos) and data[pos + 2] in blanks:
+            if pos > 0:
+                sections.append((section_start, body_start, pos))
+            section_start = pos
+            body_start = line_end
+
+        pos = line_end + 1
+
+    sections.append((section_start, body_start, length))
+    return sections
+
+
+def _strip_span(buffer, start, end):
+    """
+    Trim whitespace from both ends of buffer[start:end] by moving the offsets, like str.strip().
+    オフセットを動かして buffer[start:end] の前後の空白を取り除く（str.strip() と同じ）
+
+    Non-ASCII whitespace such as U+3000 (ideographic space) and NBSP is trimmed too; only
+    the characters at the edges are decoded.
+    """
+    while start < end:
+        byte = buffer[start]
+        if byte < 0x80:
+            if byte not in _WHITESPACE:
+                break
+            start += 1
+            continue
+        # UTF-8の先頭バイトから文字の長さを求める
+        # Length of the character from its UTF-8 lead byte
+        length = 2 if byte < 0xE0 else 3 if byte < 0xF0 else 4
+        if not bytes(buffer[start:start + length]).decode('utf-8', 'replace').isspace():
+            break
+        start += length
+
+    while end > start:
+        byte = buffer[end - 1]
+        if byte < 0x80:
+            if byte not in _WHITESPACE:
+                break
+            end -= 1
+            continue
+        # 継続バイト (0x80-0xBF) を遡って文字の先頭を探す
+        # Walk back over continuation bytes (0x80-0xBF) to the start of the character
+        char_start = end - 1
+        while char_start > start and 0x80 <= buffer[char_start] < 0xC0:
+            char_start -= 1
+        if not bytes(buffer[char_start:end]).decode('utf-8', 'replace').isspace():
+            break
+        end = char_start
+    return start, end
+
+
+def build_toc(entries):
+    """
+    Build a per-page table of contents from (section title, section filename) pairs.
+    (セクション見出し, セクションファイル名) のペアからページの目次を作成する
+
+    Args:
+        entries (list): (section_title, section_filename) のタプルのリスト
+
+    Returns:
+        str: Markdown形式の目次
+    """
+    lines = [f"- {title} (`{section_filename}`)" for title, section_filename in entries]
+    return "\n".join(lines) + "\n"
+
+
 class DirectMarkdownScraper:
-    def __init__(self, output_dir="DirectMarkdownDocuments"):
+    def __init__(self, output_dir="DirectMarkdownDocuments", writer=None, write_toc=False, dedup=False,
+                 output_format="directory", compression=None):
         """
         Initialize the DirectMarkdownScraper.
 
         Args:
             output_dir (str): The base directory to save the Markdown files.
+            writer (OutputWriter, optional): Background writer used to save files. A new one is created if None.
+            write_toc (bool): Whether to also save a per-page table of contents (<page>_toc.md).
+            dedup (bool): Whether to store identical sections once (under <output_dir>/.objects) and
+                hardlink duplicates, across pages and runs. Ignored if a writer is given.
+            output_format (str): "directory" (default), "zip"/"tar" to stream each library into one archive,
+                "sqlite" for one full-text indexed database, or "jsonl"/"yaml-stream" for one
+                record-per-section export file per library. Ignored if a writer is given.
+            compression (str, optional): "gzip" or "zstd" to store files compressed (e.g. page.md.zst).
+                Ignored if a writer is given.
         """
         self.output_dir = output_dir
-        # Dictionary to store the content hash of saved files to avoid duplicates
-        # 保存されたファイルのコンテンツハッシュを保存して重複を避けるための辞書
+        self.write_toc = write_toc
+        # ファイルはバックグラウンドのライターでアトミックに書き込む
+        # Files are written atomically by a background writer
+        if writer is None:
+            writer = create_writer(output_dir, output_format=output_format, dedup=dedup,
+                                   compression=compression)
+        self.writer = writer
+        # Hash of the last saved page, used to skip back-to-back duplicates when no dedup store is used
+        # 重複排除ストアを使わない場合に、連続する重複ページをスキップするための直前のページのハッシュ
         self.saved_content_hash = None
 
-    def save_markdown(self, content, library_name, page_path):
+    def save_markdown(self, content, library_name, page_path, url=None):
         """
         Markdownコンテンツをファイルに保存する
         見出し(##)ごとに別々のファイルに分割して保存する
@@ -134,23 +255,25 @@ class DirectMarkdownScraper:
             content (str): 保存するMarkdownコンテンツ
             library_name (str): ライブラリ名
             page_path (str): ページのパス
+            url (str, optional): ページのURL（メタデータとして保存）
             # library_name (str): Library name
             # content (str): Markdown content to save
             # page_path (str): Page path
+            # url (str, optional): Page URL (stored as metadata)
 
         Returns:
             list: 保存したファイルのパスのリスト
             # list: List of saved file paths
         """
+        # URLパスを分割（ファイル名にも使用する）
+        # Split the URL path (also used for the filename)
+        path_parts = page_path.strip('/').split('/') if page_path else []
+
         # ライブラリ名が指定されている場合はそれを使用し、そうでない場合はURLパスから取得
         # Use the specified library name if provided, otherwise get it from the URL path
         if library_name:
             dir_path_part = library_name
         else:
-            # URLパスから適切な部分を取得
-            # Get the appropriate part from the URL path
-            path_parts = page_path.strip('/').split('/')
-
             # URLが複数のパス部分を持つ場合（例：python/cpython/1-overview）
             # If the URL has multiple path parts (e.g., python/cpython/1-overview)
             if len(path_parts) > 2:
@@ -166,15 +289,10 @@ class DirectMarkdownScraper:
         # Keep the last part for the filename
         last_path_part = path_parts[-1] if path_parts else 'index'
 
-        # ライブラリディレクトリを作成
-        # Create the library directory
+        # 分割ファイル用のmdディレクトリ（作成はライターが行う）
+        # The md directory for split files (created by the writer)
         library_dir = os.path.join(self.output_dir, dir_path_part)
-        os.makedirs(library_dir, exist_ok=True)
-
-        # 分割ファイル用のmdディレクトリを作成
-        # Create the md directory for split files
         output_path = os.path.join(library_dir, 'md')
-        os.makedirs(output_path, exist_ok=True)
 
         # ファイル名を作成
         # Create the filename
@@ -217,14 +335,19 @@ class DirectMarkdownScraper:
                 logger.info(f"最初の28行を削除しました: {filename}.md")
                 # Deleted the first 28 lines: {filename}.md
 
+        # 書き込み前にメモリ上でリンクを修正する（重複排除されたファイルを後から書き換えないため）
+        # Fix links in memory before writing so deduplicated files never need rewriting later
+        cleaned_content, _ = fix_links_in_content(cleaned_content)
+
         # コンテンツのハッシュを計算
         # Calculate the content hash
         import hashlib
-        content_hash = hashlib.md5(cleaned_content.encode('utf-8')).hexdigest()
+        encoded = cleaned_content.encode('utf-8')
+        content_hash = hashlib.md5(encoded).hexdigest()
 
         # 既に同じ内容のファイルが保存されているか確認
         # Check if a file with the same content has already been saved
-        if self.saved_content_hash is not None and self.saved_content_hash == content_hash:
+        if self.writer.dedup is None and self.saved_content_hash == content_hash:
             logger.info(
                 f"同じ内容のファイルが既に保存されているため保存をスキップしますが処理は続行します: {filename}.md")
             # Skipping saving as a file with the same content has already been saved, but continuing processing: {filename}.md
@@ -237,101 +360,56 @@ class DirectMarkdownScraper:
         # Update the hash
         self.saved_content_hash = content_hash
 
-        # 見出し(##)でコンテンツを分割
-        # Split content by headings (##)
-        sections = re.split(r'(^##\s+.*)', cleaned_content, flags=re.MULTILINE)
+        # エンコード済みのコンテンツから見出し(##)の境界をオフセットで取得
+        # Find the heading (##) boundaries in the encoded content as offsets
+        buffer = memoryview(encoded)
+        sections = split_markdown_sections(encoded)
         saved_files = []
-
-        # 最初のセクション（見出しがない場合）
-        # First section (if no heading)
-        first_section = sections[0].strip()
-        if first_section:
-            # 最初のセクションのファイル名
-            # Filename for the first section
-            first_section_filename = f"{filename}_intro.md"
-            first_section_path = os.path.join(output_path, first_section_filename)
-            with open(first_section_path, 'w', encoding='utf-8') as f:
-                f.write(first_section)
-            logger.info(f"保存しました: {first_section_path}")
-            # Saved: {first_section_path}
-            saved_files.append(first_section_path)
-
-        # 見出しごとのセクションを処理
-        # Process sections for each heading
-        for i in range(1, len(sections), 2):
-            heading = sections[i].strip()
-            section_content = sections[i + 1].strip()
-
-            # 見出しからファイル名を生成
-            # Generate filename from heading
-            # Remove '## ' prefix and sanitize
-            # '## ' プレフィックスを削除してサニタイズ
-            section_title = heading[3:].strip()
-            section_filename = re.sub(r'[<>:"/\\|?*]', '_', section_title)
-            section_filename = re.sub(r'\s+', '_', section_filename)
-            section_filename = f"{filename}_{section_filename}.md"
+        toc_entries = []
+
+        for start, body_start, end in sections:
+            # 前後の空白を除いたスライス（コピーなし）
+            # Whitespace-trimmed slices of the original buffer (no copy)
+            text_start, text_end = _strip_span(buffer, body_start, end)
+
+            if body_start == start:
+                # 最初のセクション（見出しがない場合）
+                # First section (if no heading)
+                if text_start == text_end:
+                    continue
+                section_filename = f"{filename}_intro.md"
+                section_title = ""
+                chunks = (buffer[text_start:text_end],)
+            else:
+                heading_start, heading_end = _strip_span(buffer, start, body_start)
+                heading = bytes(buffer[heading_start:heading_end]).decode('utf-8')
+
+                # 見出しからファイル名を生成
+                # Generate filename from heading
+                # Remove '## ' prefix and sanitize
+                # '## ' プレフィックスを削除してサニタイズ
+                section_title = heading[3:].strip()
+                section_filename = re.sub(r'[<>:"/\\|?*]', '_', section_title)
+                section_filename = re.sub(r'\s+', '_', section_filename)
+                section_filename = f"{filename}_{section_filename}.md"
+                chunks = (buffer[heading_start:heading_end], b"\n\n", buffer[text_start:text_end])
+                toc_entries.append((section_title, section_filename))
 
             section_path = os.path.join(output_path, section_filename)
-            with open(section_path, 'w', encoding='utf-8') as f:
-                f.write(f"{heading}\n\n{section_content}")
+            section_path = self.writer.write(section_path, chunks,
+                                             metadata={"library": dir_path_part, "url": url or "",
+                                                       "heading": section_title})
             logger.info(f"保存しました: {section_path}")
             # Saved: {section_path}
             saved_files.append(section_path)
 
-        return saved_files
+        # 同じ分割結果から目次を作成する（追加のパスは不要）
+        # Build the table of contents from the same split (no extra pass)
+        if self.write_toc and toc_entries:
+            toc_path = os.path.join(output_path, f"{filename}_toc.md")
+            saved_files.append(self.writer.write(toc_path, build_toc(toc_entries)))
 
-    def _split_by_headings(self, content):
-        """
-        Markdownコンテンツを見出し(##)ごとに分割する
-
-        Args:
-            content (str): 分割するMarkdownコンテンツ
-
-        Returns:
-            list: (見出し, コンテンツ)のタプルのリスト
-        """
-        if not content:
-            return []
-
-        # 見出し(##)を検索するための正規表現
-        heading_pattern = re.compile(r'^##\s+(.+)$', re.MULTILINE)
-
-        # 見出しの位置を取得
-        headings = list(heading_pattern.finditer(content))
-
-        if not headings:
-            # 見出しがない場合は空のリストを返す
-            # Return an empty list if there are no headings
-            return []
-
-        sections = []
-
-        # 最初の見出しの前のコンテンツを取得
-        # Get the content before the first heading
-        if headings[0].start() > 0:
-            intro_content = content[:headings[0].start()].strip()
-            if intro_content:
-                sections.append((None, intro_content))
-
-        # 各見出しごとにセクションを作成
-        # Create sections for each heading
-        for i, match in enumerate(headings):
-            heading_text = match.group(1)
-            start_pos = match.start()
-
-            # 次の見出しがある場合はその位置まで、ない場合は最後まで
-            # Up to the position of the next heading if it exists, otherwise to the end
-            if i < len(headings) - 1:
-                end_pos = headings[i + 1].start()
-            else:
-                end_pos = len(content)
-
-            # セクションのコンテンツを取得
-            # Get the content of the section
-            section_content = content[start_pos:end_pos].strip()
-            sections.append((heading_text, section_content))
-
-        return sections
+        return saved_files
 
     def scrape_page(self, url, library_name):
         """
@@ -373,7 +451,7 @@ class DirectMarkdownScraper:
             # Save the response content as Markdown
             # このスクレイピング方法では、レスポンスの内容が直接Markdownとして使用可能
             # In this scraping method, the response content can be used directly as Markdown
-            return self.save_markdown(response.text, library_name, page_path)
+            return self.save_markdown(response.text, library_name, page_path, url=correct_url)
 
         except Exception as e:
             logger.error(f"ページのスクレイピングに失敗しました: {url} ({e})")
@@ -432,27 +510,6 @@ class DirectMarkdownScraper:
         logger.info(get_message('starting_library_scrape', name=library_name, url=library_url))
         # Start scraping the library
 
-        # ライブラリ名が指定されている場合はそれを使用し、そうでない場合はURLパスから取得
-        # Use the specified library name if provided, otherwise get it from the URL path
-        if library_name:
-            dir_path_part = library_name
-        else:
-            # URLから適切なパス部分を抽出
-            # Extract the appropriate path part from the URL
-            parsed_url = urlparse(library_url)
-            path_parts = parsed_url.path.strip('/').split('/')
-
-            # URLが複数のパス部分を持つ場合（例：python/cpython/1-overview）
-            # If the URL has multiple path parts (e.g., python/cpython/1-overview)
-            if len(path_parts) > 2:
-                # 2番目に最後の部分を使用（例：cpython）
-                # Use the second to last part (e.g., cpython)
-                dir_path_part = path_parts[-2]
-            else:
-                # それ以外の場合は最後の部分を使用
-                # Otherwise, use the last part
-                dir_path_part = path_parts[-1] if path_parts else 'index'
-
         # メインページをスクレイピング
         # Scrape the main page
         main_page_paths = self.scrape_page(library_url, library_name)
@@ -472,6 +529,7 @@ class DirectMarkdownScraper:
             if response.status_code != 200:
                 logger.error(get_message('html_fetch_failed', url=library_url, status_code=response.status_code))
                 # Failed to get HTML
+                self.writer.flush()
                 return main_page_paths  # メインページのみ返す
 
             # ナビゲーション項目を抽出
@@ -481,11 +539,7 @@ class DirectMarkdownScraper:
             if not nav_items:
                 logger.warning(get_message('no_nav_items', url=library_url))
                 # Navigation items not found
-                # メインページのみの場合でもMarkdownリンクを修正
-                # Fix markdown links even if only the main page exists
-                md_directory = os.path.join(os.getcwd(), self.output_dir, dir_path_part, "md")
-                logger.info(get_message('starting_fix', directory=md_directory))
-                fix_markdown_links(md_directory)
+                self.writer.flush()
                 return main_page_paths  # メインページのみ返す
 
             # 保存したファイルのパスのリスト
@@ -513,20 +567,15 @@ class DirectMarkdownScraper:
                 else:
                     logger.error(get_message('nav_item_scrape_failed', title=title, url=url))
 
-            # スクレイピング完了後、Markdownリンクを修正
-            md_directory = os.path.join(os.getcwd(), self.output_dir, dir_path_part, "md")
-            logger.info(get_message('starting_fix', directory=md_directory))
-            fix_markdown_links(md_directory)
-
+            # リンクはsave_markdownで書き込み前に修正済みのため、保存したファイルを読み直す必要はない
+            # Links were fixed by save_markdown before writing, so the saved files are not read back
+            self.writer.flush()
             return md_files
         except Exception as e:
             logger.error(get_message('nav_extraction_error', error=e))
             import traceback
             logger.error(traceback.format_exc())
-            # エラーが発生した場合でもMarkdownリンクを修正
-            md_directory = os.path.join(os.getcwd(), self.output_dir, dir_path_part, "md")
-            logger.info(get_message('starting_fix', directory=md_directory))
-            fix_markdown_links(md_directory)
+            self.writer.flush()
             return main_page_paths  # エラーが発生した場合はメインページのみ返す
 
     def run(self, libraries):
@@ -8,6 +8,7 @@ from bs4 import BeautifulSoup
 from markdownify import markdownify
 
 from .localization import get_message
+from .output_writer import create_writer
 
 # Configure logging
 logging.basicConfig(
@@ -119,14 +120,29 @@ def scrape_deepwiki(url, debug=False):
 
 
 class DirectDeepwikiScraper:
-    def __init__(self, output_dir="DynamicDocuments"):
+    def __init__(self, output_dir="DynamicDocuments", writer=None, dedup=False, output_format="directory",
+                 compression=None):
         """
         Initialize the DirectDeepwikiScraper.
 
         Args:
             output_dir (str): The base directory to save the converted Markdown files.
+            writer (OutputWriter, optional): Background writer used to save files. A new one is created if None.
+            dedup (bool): Whether to store identical files once (under <output_dir>/.objects) and
+                hardlink duplicates, across pages and runs. Ignored if a writer is given.
+            output_format (str): "directory" (default), "zip"/"tar" to stream each library into one archive,
+                "sqlite" for one full-text indexed database, or "jsonl"/"yaml-stream" for one
+                record-per-section export file per library. Ignored if a writer is given.
+            compression (str, optional): "gzip" or "zstd" to store files compressed (e.g. page.md.zst).
+                Ignored if a writer is given.
         """
         self.output_dir = output_dir
+        # ファイルはバックグラウンドのライターでアトミックに書き込む
+        # Files are written atomically by a background writer
+        if writer is None:
+            writer = create_writer(output_dir, output_format=output_format, dedup=dedup,
+                                   compression=compression)
+        self.writer = writer
 
     def extract_content(self, html_content):
         """
@@ -247,7 +263,7 @@ class DirectDeepwikiScraper:
 
         return markdown_content, html_content
 
-    def save_markdown(self, markdown_content, library_name, page_path, save_html=False, html_content=None):
+    def save_markdown(self, markdown_content, library_name, page_path, save_html=False, html_content=None, url=None):
         """
         Markdownコンテンツをファイルに保存する
 
@@ -257,14 +273,14 @@ class DirectDeepwikiScraper:
             page_path (str): ページのパス
             save_html (bool): HTMLも保存するかどうか
             html_content (str): 保存するHTMLコンテンツ
+            url (str, optional): ページのURL（メタデータとして保存）
 
         Returns:
             str: 保存したファイルのパス
         """
-        # 出力ディレクトリを作成
-        # Create the output directory
+        # 出力ディレクトリ（作成はライターが行う）
+        # The output directory (created by the writer)
         output_path = os.path.join(self.output_dir, library_name, 'md')
-        os.makedirs(output_path, exist_ok=True)
 
         # ファイル名を作成
         # Create the filename
@@ -283,17 +299,15 @@ class DirectDeepwikiScraper:
         # Markdownファイルを保存
         # Save the Markdown file
         md_file_path = os.path.join(output_path, f"{filename}.md")
-        with open(md_file_path, 'w', encoding='utf-8') as f:
-            f.write(markdown_content)
+        md_file_path = self.writer.write(md_file_path, markdown_content,
+                                         metadata={"library": library_name, "url": url or "", "heading": filename})
 
         # HTMLも保存する場合
         # If saving HTML as well
         if save_html and html_content:
             html_output_path = os.path.join(self.output_dir, library_name, 'html')
-            os.makedirs(html_output_path, exist_ok=True)
             html_file_path = os.path.join(html_output_path, f"{filename}.html")
-            with open(html_file_path, 'w', encoding='utf-8') as f:
-                f.write(html_content)
+            self.writer.write(html_file_path, html_content)
 
         return md_file_path
 
@@ -374,7 +388,8 @@ class DirectDeepwikiScraper:
 
             # ファイルに保存
             # Save to file
-            return self.save_markdown(markdown_content, library_name, page_path, save_html, html_content)
+            return self.save_markdown(markdown_content, library_name, page_path, save_html, html_content,
+                                      url=correct_url)
 
         except Exception as e:
             logger.error(f"ページのスクレイピングに失敗しました: {url} ({e})")
@@ -446,6 +461,7 @@ class DirectDeepwikiScraper:
             response = scrape_deepwiki(library_url)
             if response.status_code != 200:
                 logger.error(get_message('html_fetch_failed', url=library_url, status_code=response.status_code))
+                self.writer.flush()
                 return [main_page_path]  # メインページのみ返す
                 # Return only the main page
 
@@ -455,6 +471,7 @@ class DirectDeepwikiScraper:
 
             if not nav_items:
                 logger.warning(get_message('no_nav_items', url=library_url))
+                self.writer.flush()
                 return [main_page_path]  # メインページのみ返す
                 # Return only the main page
 
@@ -483,11 +500,15 @@ class DirectDeepwikiScraper:
                 else:
                     logger.error(get_message('nav_item_scrape_failed', title=title, url=url))
 
+            # すべての書き込みが完了してから返す
+            # Return only after every file has been written
+            self.writer.flush()
             return md_files
         except Exception as e:
             logger.error(get_message('nav_extraction_error', error=e))
             import traceback
             logger.error(traceback.format_exc())
+            self.writer.flush()
             return [main_page_path]  # エラーが発生した場合はメインページのみ返す
             # Return only the main page if an error occurs
 
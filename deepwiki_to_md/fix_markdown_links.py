@@ -2,7 +2,10 @@ import logging
 import os
 import re
 
+from .compression import compress_bytes, detect_compression, has_extension, read_text
 from .localization import get_message
+from .output_writer import atomic_write
+from .process_pool import map_in_processes
 
 # Configure logging
 logging.basicConfig(
@@ -11,13 +14,146 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def fix_markdown_links(directory):
+# Regular expression to match markdown links containing URLs
+# This pattern matches [text](url) where url is not empty
+# URLを含むマークダウンリンクに一致する正規表現
+# このパターンは [text](url) に一致し、urlは空ではありません
+LINK_PATTERN = re.compile(r'\[([^\]]+)\]\((?![s\)])[^\)]+\)')
+
+# Below this many files, fix_markdown_links_parallel works in-process
+# この数未満のファイルはプロセスプールを使わずに処理する
+PARALLEL_MIN_FILES = 64
+
+
+def fix_links_in_content(content):
+    """
+    Replace links with URLs with links with empty parentheses in a string.
+    文字列内のURL付きリンクを空の括弧を持つリンクに置き換える
+
+    Args:
+        content (str): The markdown content to process
+
+    Returns:
+        tuple: (modified_content, modified_links) - the rewritten content and the number of links replaced
+    """
+    return LINK_PATTERN.subn(r'[\1]()', content)
+
+
+def fix_markdown_links_in_file(file_path):
+    """
+    Replace links with URLs with links with empty parentheses in a single markdown file.
+    The file is only rewritten when at least one link was replaced. Compressed files
+    (.md.gz / .md.zst) are read and rewritten with the same compression.
+    1つのマークダウンファイル内のリンクを修正する（変更がない場合は書き込まない）
+
+    Args:
+        file_path (str): Path to the markdown file (optionally gzip/zstd compressed)
+
+    Returns:
+        int: The number of links replaced
+    """
+    # Read file content
+    # ファイルの内容を読み込む
+    content = read_text(file_path)
+
+    # Replace links with URLs with links with empty parentheses
+    # URL付きのリンクを空の括弧を持つリンクに置き換える
+    modified_content, modified_links = fix_links_in_content(content)
+
+    # Write modified content back to file only if something changed
+    # The file is replaced rather than truncated so hardlinked copies are left untouched
+    # 変更があった場合のみ、変更された内容をファイルに書き戻す
+    # ハードリンクされた他のファイルに影響しないよう、上書きではなく置き換える
+    if modified_links:
+        atomic_write(file_path, compress_bytes(modified_content.encode('utf-8'), detect_compression(file_path)))
+
+    return modified_links
+
+
+def _fix_file_worker(file_path):
+    """
+    Process pool worker for fix_markdown_links_parallel.
+    プロセスプール用のワーカー
+
+    Args:
+        file_path (str): Path to the markdown file
+
+    Returns:
+        tuple: (file_path, modified_links, error)
+    """
+    try:
+        return file_path, fix_markdown_links_in_file(file_path), None
+    except (OSError, UnicodeDecodeError) as e:
+        return file_path, 0, str(e)
+
+
+def _find_md_files(directory):
+    """
+    Recursively collect markdown files (including .md.gz / .md.zst) below a directory using os.scandir.
+    os.scandirを使用してディレクトリ以下のマークダウンファイルを再帰的に収集する
+
+    Args:
+        directory (str): The directory to search
+
+    Returns:
+        list: Paths of the markdown files found
+    """
+    md_files = []
+    pending = [directory]
+    while pending:
+        current = pending.pop()
+        with os.scandir(current) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                elif has_extension(entry.name, '.md') and entry.is_file():
+                    md_files.append(entry.path)
+    return md_files
+
+
+def _select_md_files(directory, files=None, skip_files=None):
+    """
+    Build the list of markdown files to process.
+    処理対象のマークダウンファイルのリストを作成する
+
+    Args:
+        directory (str): The directory containing markdown files to process
+        files (iterable, optional): Only process these files (e.g. files changed in this run)
+        skip_files (set, optional): Absolute paths of files whose links are already fixed
+
+    Returns:
+        list: Paths of the markdown files to process
+    """
+    if files is not None:
+        # Restrict to the given files that live in the directory and still exist
+        # 指定されたファイルのうち、ディレクトリ内に存在するものに限定する
+        root = os.path.join(os.path.abspath(directory), '')
+        md_files = sorted({
+            os.path.abspath(path) for path in files
+            if has_extension(path, '.md') and os.path.abspath(path).startswith(root) and os.path.isfile(path)
+        })
+    else:
+        md_files = _find_md_files(directory)
+
+    logger.info(get_message('found_md_files', count=len(md_files)))
+
+    # Skip files whose links were already fixed in memory before saving
+    # 保存前にメモリ上でリンクを修正済みのファイルはスキップする
+    if skip_files:
+        md_files = [path for path in md_files if os.path.abspath(path) not in skip_files]
+
+    return md_files
+
+
+def fix_markdown_links(directory, skip_files=None):
     """
     Find all markdown files in the specified directory and replace links with URLs
     with links with empty parentheses.
 
     Args:
         directory (str): The directory containing markdown files to process
+        skip_files (set, optional): Absolute paths of files whose links are already fixed
+            (e.g. files written in this run). These files are not read or rewritten.
     """
     # Check if directory exists
     if not os.path.isdir(directory):
@@ -26,54 +162,59 @@ def fix_markdown_links(directory):
 
     # Find all markdown files in the directory
     # ディレクトリ内のすべてのマークダウンファイルを検索
-    md_files = []
-    for root, _, files in os.walk(directory):
-        for file in files:
-            if file.endswith('.md'):
-                md_files.append(os.path.join(root, file))
-
-    logger.info(get_message('found_md_files', count=len(md_files)))
-
-    # Regular expression to match markdown links containing URLs
-    # This pattern matches [text](url) where url is not empty
-    # URLを含むマークダウンリンクに一致する正規表現
-    # このパターンは [text](url) に一致し、urlは空ではありません
-    link_pattern = re.compile(r'\[([^\]]+)\]\((?![s\)])[^\)]+\)')
+    md_files = _select_md_files(directory, skip_files=skip_files)
 
     # Process each file
     # 各ファイルを処理
-    # Process each file
     for file_path in md_files:
         logger.info(get_message('processing_file', file_path=file_path))
+        modified_links = fix_markdown_links_in_file(file_path)
+        logger.info(get_message('modified_links', count=modified_links, file_path=file_path))
 
-        # Read file content
-        # ファイルの内容を読み込む
-        # Read the file content
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
-
-        # Count original links
-        # 元のリンク数をカウント
-        # Count the number of original links
-        original_links = len(link_pattern.findall(content))
-
-        # Replace links with URLs with links with empty parentheses
-        # URL付きのリンクを空の括弧を持つリンクに置き換える
-        # Replace links with URLs with links having empty parentheses
-        modified_content = link_pattern.sub(r'[\1]()', content)
-
-        # Count modified links
-        # 変更されたリンク数をカウント
-        # Count the number of modified links
-        modified_links = original_links - len(link_pattern.findall(modified_content))
-
-        # Write modified content back to file
-        # 変更された内容をファイルに書き戻す
-        # Write the modified content back to the file
-        with open(file_path, 'w', encoding='utf-8') as f:
-            f.write(modified_content)
 
-        logger.info(get_message('modified_links', count=modified_links, file_path=file_path))
+def fix_markdown_links_parallel(directory, files=None, skip_files=None, max_workers=None):
+    """
+    Replace links with URLs with links with empty parentheses using a process pool.
+    Unchanged files are not rewritten. Small batches are processed in the current
+    process because starting the pool would cost more than the work itself.
+    プロセスプールを使用してリンクを修正する（変更のないファイルは書き込まない）
+
+    Args:
+        directory (str): The directory containing markdown files to process
+        files (iterable, optional): Only process these files (e.g. files changed in this run).
+            If None, every markdown file below the directory is processed.
+        skip_files (set, optional): Absolute paths of files whose links are already fixed
+        max_workers (int, optional): Number of worker processes (default: CPU count)
+
+    Returns:
+        dict: {"files": processed file count, "changed": rewritten file count, "links": replaced link count}
+    """
+    summary = {"files": 0, "changed": 0, "links": 0}
+
+    # Check if directory exists
+    if not os.path.isdir(directory):
+        logger.error(get_message('directory_not_found', directory=directory))
+        return summary
+
+    md_files = _select_md_files(directory, files=files, skip_files=skip_files)
+    if not md_files:
+        return summary
+
+    results = map_in_processes(_fix_file_worker, md_files, max_workers=max_workers, min_jobs=PARALLEL_MIN_FILES)
+    for file_path, modified_links, error in results:
+        summary["files"] += 1
+        if error:
+            logger.error(f"Failed to fix links in {file_path}: {error}")
+            continue
+        if modified_links:
+            summary["changed"] += 1
+            summary["links"] += modified_links
+            logger.debug(get_message('modified_links', count=modified_links, file_path=file_path))
+
+    logger.info(get_message('fixed_links_summary', count=summary["links"], changed=summary["changed"],
+                            total=summary["files"]))
+    return summary
+
 
 if __name__ == "__main__":
     # Path to the directory containing markdown files
@@ -1,17 +1,231 @@
+import glob
 import logging
 import os
 import re
 import time
 
 import yaml
-from bs4 import BeautifulSoup
-from markdownify import markdownify
+from bs4 import BeautifulSoup, Tag
+from markdownify import MarkdownConverter
+
+from .compression import has_extension, read_text, strip_compression_suffix
+from .output_writer import atomic_write
+from .process_pool import map_in_processes
 
 # ログ設定
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
+# Below this many files, convert_md_files_to_yaml works in-process
+# この数未満のファイルはプロセスプールを使わずに変換する
+PARALLEL_MIN_FILES = 16
+
+# Shared HTML to Markdown converter (ATX headings), applied to already parsed trees
+# 解析済みのツリーに適用する共有のHTML→Markdownコンバーター（ATX形式の見出し）
+MARKDOWN_CONVERTER = MarkdownConverter(heading_style="ATX")
+
+# Wildcard characters of glob patterns
+# globパターンのワイルドカード文字
+GLOB_MAGIC_PATTERN = re.compile(r'[*?[]')
+
+# Use libyaml's C emitter when PyYAML was built with it
+# PyYAMLがlibyaml付きでビルドされている場合はCのエミッターを使う
+try:
+    from yaml import CSafeDumper as FastDumper
+except ImportError:
+    FastDumper = None
+
+# Characters the C emitter escapes differently from the Python emitter (tabs, CR, controls, BOM,
+# NEL/LS/PS, characters outside the BMP) and spaces next to line breaks. Both force the double-quoted
+# style, whose long-line folding differs between the two emitters.
+# Cエミッターの出力がPythonエミッターと異なる文字（エスケープされる文字）と、改行に隣接する空白
+LIBYAML_INCOMPATIBLE_PATTERN = re.compile('[^\n\x20-\x7e\xa0-\u2027\u202a-\ud7ff\ue000-\ufefe\uff00-\ufffd]')
+LIBYAML_INCOMPATIBLE_SUBSTRINGS = (" \n", "\n ")
+
+# Inline link pattern ([text](url)); matches never span lines
+# インラインリンクのパターン（行をまたいでマッチしない）
+LINK_PATTERN = re.compile(r'\[(.*?)\]\((.*?)\)')
+
+# List item marker (-, * or number.) at the start of a line's content
+# 行の内容の先頭にあるリスト項目のマーカー（-、*、または 数字.）
+LIST_MARKER_PATTERN = re.compile(r'[-*]|\d+\.')
+
+
+def scan_markdown(markdown_content):
+    """
+    Collect the metadata used by markdown_to_yaml in a single pass over the lines.
+    1回の行走査でmarkdown_to_yamlが使うメタデータを収集する
+
+    The results match the original per-feature regular expressions exactly, including
+    their edge cases (e.g. a bare "#" line takes the next non-blank line as its header,
+    and an image ![alt](src) is also reported as a link).
+
+    Args:
+        markdown_content (str): The Markdown content to scan.
+
+    Returns:
+        dict: headers, links, images, paragraphs_count, lists_count and tables_count.
+    """
+    headers = []
+    links = []
+    images = []
+    paragraphs_count = 0
+    lists_count = 0
+    tables_count = 0
+
+    # A header whose "#" run is followed only by whitespace takes the next non-blank line
+    # "#"の後に空白しかない見出しは、次の空白でない行を見出しにする
+    header_pending = False
+    in_paragraph = False
+
+    lines = markdown_content.split('\n')
+    last_index = len(lines) - 1
+    for index, line in enumerate(lines):
+        stripped = line.lstrip()
+
+        # Paragraphs: runs of non-blank lines separated by blank lines
+        # 段落: 空行で区切られた空白でない行の連続
+        if not stripped:
+            in_paragraph = False
+            if header_pending and index == last_index:
+                headers.append("")
+            continue
+        if not in_paragraph:
+            paragraphs_count += 1
+            in_paragraph = True
+
+        # Headers
+        # 見出し
+        if header_pending:
+            headers.append(stripped)
+            header_pending = False
+        elif line[0] == '#':
+            rest = line.lstrip('#')
+            if rest:
+                if rest[0].isspace():
+                    if rest.strip():
+                        headers.append(rest.lstrip())
+                    elif index == last_index:
+                        headers.append("")
+                    else:
+                        header_pending = True
+            elif index != last_index:
+                header_pending = True
+
+        # Lists
+        # リスト
+        first = stripped[0]
+        if first in '-*' or first.isdecimal():
+            marker = LIST_MARKER_PATTERN.match(stripped)
+            if marker:
+                end = marker.end()
+                if (stripped[end].isspace() if end < len(stripped) else index != last_index):
+                    lists_count += 1
+
+        # Tables
+        # テーブル
+        if len(line) > 1 and line[0] == '|' and line[-1] == '|':
+            tables_count += 1
+
+        # Links and images
+        # リンクと画像
+        if '](' in line:
+            for match in LINK_PATTERN.finditer(line):
+                text, url = match.groups()
+                links.append({"text": text, "url": url})
+                if match.start() and line[match.start() - 1] == '!':
+                    images.append({"alt": text, "url": url})
+
+    return {
+        "headers": headers,
+        "links": links,
+        "images": images,
+        "paragraphs_count": paragraphs_count,
+        "lists_count": lists_count,
+        "tables_count": tables_count,
+    }
+
+
+def _libyaml_compatible(value):
+    """
+    Check whether every string in value is emitted identically by the C and Python emitters.
+    value内のすべての文字列がCとPythonのエミッターで同じように出力されるか確認する
+    """
+    if isinstance(value, str):
+        # 部分文字列の検索は正規表現より速いため先に行う（インデントされた行があればすぐに判定できる）
+        # Substring search is faster than the regex, so it runs first (indented lines are found at once)
+        return (not any(text in value for text in LIBYAML_INCOMPATIBLE_SUBSTRINGS)
+                and LIBYAML_INCOMPATIBLE_PATTERN.search(value) is None)
+    if isinstance(value, dict):
+        return all(_libyaml_compatible(key) and _libyaml_compatible(item) for key, item in value.items())
+    if isinstance(value, list):
+        return all(_libyaml_compatible(item) for item in value)
+    return True
+
+
+def dump_yaml(data):
+    """
+    Serialize data to YAML, using libyaml's emitter when it produces identical output.
+    YAMLにシリアライズする（出力が同一になる場合はlibyamlのエミッターを使う）
+
+    The output is byte-for-byte the same as yaml.dump(data, allow_unicode=True, sort_keys=False).
+    The entries of a top-level mapping are emitted one by one, so only the entries whose strings
+    libyaml would quote or fold differently (typically the content of a document with indented
+    lines) are emitted in Python; links, images and metadata still use libyaml.
+
+    Args:
+        data: Plain data (dicts, lists, strings, numbers).
+
+    Returns:
+        str: The YAML content.
+    """
+    if FastDumper is None:
+        return yaml.dump(data, allow_unicode=True, sort_keys=False)
+    if isinstance(data, dict) and data:
+        # ブロック形式の最上位マッピングはエントリーごとの出力を連結したものと同じになる
+        # A top-level block mapping is the concatenation of its entries dumped one by one
+        return "".join(_dump_value({key: value}) for key, value in data.items())
+    return _dump_value(data)
+
+
+def _dump_value(data):
+    if _libyaml_compatible(data):
+        return yaml.dump(data, Dumper=FastDumper, allow_unicode=True, sort_keys=False)
+    return yaml.dump(data, allow_unicode=True, sort_keys=False)
+
+
+def markdown_to_dict(markdown_content):
+    """
+    Build the structured data that markdown_to_yaml serializes.
+    markdown_to_yamlがシリアライズする構造化データを作成する
+
+    Args:
+        markdown_content (str): The Markdown content to convert.
+
+    Returns:
+        dict: timestamp, title, content, links, images and metadata.
+    """
+    # Extract headers, links, images and structure counts in one pass
+    scan = scan_markdown(markdown_content)
+    headers = scan["headers"]
+
+    # Create structured data
+    return {
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "title": headers[0] if headers else "No Title",
+        "content": markdown_content,  # Preserve the full markdown content with formatting
+        "links": scan["links"],
+        "images": scan["images"],
+        "metadata": {
+            "headers": headers,
+            "paragraphs_count": scan["paragraphs_count"],
+            "lists_count": scan["lists_count"],
+            "tables_count": scan["tables_count"]
+        }
+    }
+
+
 def markdown_to_yaml(markdown_content):
     """
     Convert Markdown content to YAML while preserving formatting.
@@ -26,50 +240,10 @@ def markdown_to_yaml(markdown_content):
         if not markdown_content:
             return None
 
-        # Extract headers, links, and structure from Markdown
-        headers = []
-        links = []
-
-        # Extract links using regex
-        link_pattern = re.compile(r'\[(.*?)\]\((.*?)\)')
-        for match in link_pattern.finditer(markdown_content):
-            text, url = match.groups()
-            links.append({"text": text, "url": url})
-
-        # Extract headers
-        header_pattern = re.compile(r'^(#+)\s+(.*?)$', re.MULTILINE)
-        for match in header_pattern.finditer(markdown_content):
-            headers.append(match.group(2))
-
-        # Count paragraphs (non-empty lines separated by empty lines)
-        paragraphs = re.split(r'\n\s*\n', markdown_content)
-        paragraphs_count = len([p for p in paragraphs if p.strip()])
-
-        # Count lists (lines starting with -, *, or number.)
-        list_pattern = re.compile(r'^\s*(?:[-*]|\d+\.)\s', re.MULTILINE)
-        lists_count = len(re.findall(list_pattern, markdown_content))
-
-        # Count tables (lines containing | character)
-        table_pattern = re.compile(r'^\|.*\|$', re.MULTILINE)
-        tables_count = len(re.findall(table_pattern, markdown_content))
-
-        # Create structured data
-        data = {
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
-            "title": headers[0] if headers else "No Title",
-            "content": markdown_content,  # Preserve the full markdown content with formatting
-            "links": links,
-            "images": [],  # We could extract images too if needed
-            "metadata": {
-                "headers": headers,
-                "paragraphs_count": paragraphs_count,
-                "lists_count": lists_count,
-                "tables_count": tables_count
-            }
-        }
+        data = markdown_to_dict(markdown_content)
 
         # Convert to YAML
-        yaml_content = yaml.dump(data, allow_unicode=True, sort_keys=False)
+        yaml_content = dump_yaml(data)
 
         return yaml_content
     except Exception as e:
@@ -78,22 +252,35 @@ def markdown_to_yaml(markdown_content):
         return None
 
 
+def _parse_html(html_content):
+    """
+    Parse HTML once; already parsed BeautifulSoup objects are returned unchanged.
+    HTMLを一度だけ解析する（解析済みのBeautifulSoupオブジェクトはそのまま返す）
+    """
+    if isinstance(html_content, Tag):
+        return html_content
+    return BeautifulSoup(html_content, 'html.parser')
+
+
 def html_to_markdown(html_content):
     """
     Convert HTML content to Markdown.
 
+    The HTML is parsed once and the parsed tree is converted directly, without
+    serializing it back to a string for markdownify to parse again.
+
     Args:
-        html_content (str): The HTML content to convert.
+        html_content (str | bs4.Tag): The HTML content to convert, or an already parsed tree.
 
     Returns:
         str: The Markdown content.
     """
     try:
         # Parse HTML with BeautifulSoup
-        soup = BeautifulSoup(html_content, 'html.parser')
+        soup = _parse_html(html_content)
 
-        # Convert to Markdown using markdownify
-        markdown_content = markdownify(str(soup), heading_style="ATX")
+        # Convert the parsed tree to Markdown using markdownify
+        markdown_content = MARKDOWN_CONVERTER.convert_soup(soup)
 
         return markdown_content
     except Exception as e:
@@ -102,22 +289,35 @@ def html_to_markdown(html_content):
         return None
 
 
+def html_to_all(html_content):
+    """
+    Convert HTML content to both Markdown and YAML with one parse and one conversion.
+    1回の解析と1回の変換でHTMLをMarkdownとYAMLの両方に変換する
+
+    Args:
+        html_content (str | bs4.Tag): The HTML content to convert, or an already parsed tree.
+
+    Returns:
+        tuple: (markdown_content, yaml_content); either is None if its conversion failed.
+    """
+    markdown_content = html_to_markdown(html_content)
+    yaml_content = markdown_to_yaml(markdown_content) if markdown_content else None
+    return markdown_content, yaml_content
+
+
 def html_to_yaml(html_content):
     """
     Convert HTML content to YAML.
 
     Args:
-        html_content (str): The HTML content to convert.
+        html_content (str | bs4.Tag): The HTML content to convert, or an already parsed tree.
 
     Returns:
         str: The YAML content.
     """
     try:
-        # First convert HTML to Markdown to preserve formatting
-        markdown_content = html_to_markdown(html_content)
-
-        # Then convert Markdown to YAML
-        return markdown_to_yaml(markdown_content)
+        # Convert HTML to Markdown to preserve formatting, then Markdown to YAML
+        return html_to_all(html_content)[1]
     except Exception as e:
         logger.error(f"HTMLからYAMLへの変換中にエラーが発生しました: {e}")
         logger.error(f"Error converting HTML to YAML: {e}")
@@ -129,16 +329,15 @@ def convert_md_file_to_yaml(md_file_path, output_dir=None):
     Convert an existing Markdown file to YAML format.
 
     Args:
-        md_file_path (str): Path to the Markdown file
+        md_file_path (str): Path to the Markdown file (.md, or compressed .md.gz / .md.zst)
         output_dir (str, optional): Directory to save the YAML file. If None, saves in the same directory as the Markdown file.
 
     Returns:
         str: Path to the created YAML file
     """
     try:
-        # Read the Markdown file
-        with open(md_file_path, 'r', encoding='utf-8') as f:
-            markdown_content = f.read()
+        # Read the Markdown file (decompressed transparently)
+        markdown_content = read_text(md_file_path)
 
         # Convert to YAML
         yaml_content = markdown_to_yaml(markdown_content)
@@ -151,7 +350,7 @@ def convert_md_file_to_yaml(md_file_path, output_dir=None):
         if output_dir is None:
             output_dir = os.path.dirname(md_file_path)
 
-        base_name = os.path.splitext(os.path.basename(md_file_path))[0]
+        base_name = os.path.splitext(os.path.basename(strip_compression_suffix(md_file_path)))[0]
         yaml_file_path = os.path.join(output_dir, f"{base_name}.yaml")
 
         # Save the YAML file
@@ -163,3 +362,136 @@ def convert_md_file_to_yaml(md_file_path, output_dir=None):
     except Exception as e:
         logger.error(f"Error converting Markdown file to YAML: {e}")
         return None
+
+
+def find_md_files(source):
+    """
+    Collect the Markdown files (.md, .md.gz, .md.zst) of a directory tree, a glob pattern or a single file.
+    ディレクトリツリー、globパターン、または単一ファイルからMarkdownファイルを収集する
+
+    Args:
+        source (str): A directory (searched recursively), a glob pattern (** is supported) or a file path.
+
+    Returns:
+        tuple: (root, files) - the directory the files are relative to, and the sorted file paths
+
+    Raises:
+        FileNotFoundError: If source is neither an existing path nor a glob pattern.
+    """
+    if not GLOB_MAGIC_PATTERN.search(source) and not os.path.exists(source):
+        raise FileNotFoundError(f"No such file or directory: {source}")
+    if os.path.isdir(source):
+        files = []
+        for dir_path, _, file_names in os.walk(source):
+            files.extend(os.path.join(dir_path, name) for name in file_names if has_extension(name, '.md'))
+        return source, sorted(files)
+
+    # Files are relative to the part of the pattern before the first wildcard
+    # ファイルはパターンの最初のワイルドカードより前の部分からの相対パスとする
+    root_parts = []
+    for part in os.path.dirname(source).replace(os.sep, '/').split('/'):
+        if GLOB_MAGIC_PATTERN.search(part):
+            break
+        root_parts.append(part)
+    root = '/'.join(root_parts) or '.'
+    files = sorted(path for path in glob.glob(source, recursive=True)
+                   if has_extension(path, '.md') and os.path.isfile(path))
+    return root, files
+
+
+def _yaml_path_for(md_file_path, root, output_dir):
+    """
+    Return the YAML path for a Markdown file, mirroring its place below root inside output_dir.
+    Markdownファイルに対応するYAMLのパスを返す（output_dir内にroot以下の構造を再現する）
+    """
+    base_name = os.path.splitext(os.path.basename(strip_compression_suffix(md_file_path)))[0]
+    if output_dir is None:
+        return os.path.join(os.path.dirname(md_file_path), f"{base_name}.yaml")
+    relative_dir = os.path.relpath(os.path.dirname(os.path.abspath(md_file_path)), os.path.abspath(root))
+    return os.path.normpath(os.path.join(output_dir, relative_dir, f"{base_name}.yaml"))
+
+
+def _is_up_to_date(md_file_path, yaml_file_path):
+    """
+    Check whether the YAML file exists and is not older than its Markdown source.
+    YAMLファイルが存在し、元のMarkdownより古くないか確認する
+    """
+    try:
+        return os.stat(yaml_file_path).st_mtime >= os.stat(md_file_path).st_mtime
+    except OSError:
+        return False
+
+
+def _convert_file_worker(paths):
+    """
+    Process pool worker for convert_md_files_to_yaml.
+    プロセスプール用のワーカー
+
+    Args:
+        paths (tuple): (md_file_path, yaml_file_path)
+
+    Returns:
+        tuple: (md_file_path, converted_bytes, error)
+    """
+    md_file_path, yaml_file_path = paths
+    try:
+        markdown_content = read_text(md_file_path)
+        yaml_content = markdown_to_yaml(markdown_content)
+        if not yaml_content:
+            return md_file_path, 0, "empty Markdown or conversion failed"
+        os.makedirs(os.path.dirname(yaml_file_path) or '.', exist_ok=True)
+        # Write atomically so an interrupted run never leaves a truncated YAML that looks up to date
+        # 中断時に最新に見える書きかけのYAMLが残らないようアトミックに書き込む
+        atomic_write(yaml_file_path, yaml_content)
+        return md_file_path, os.path.getsize(md_file_path), None
+    except (OSError, UnicodeDecodeError, ImportError) as e:
+        return md_file_path, 0, str(e)
+
+
+def convert_md_files_to_yaml(source, output_dir=None, force=False, max_workers=None):
+    """
+    Convert every Markdown file of a directory tree or glob pattern to YAML using a process pool.
+    プロセスプールを使用して、ディレクトリツリーまたはglobパターンのMarkdownファイルをすべてYAMLに変換する
+
+    Files whose YAML is already newer than the Markdown source are skipped unless force is True.
+    Small batches are converted in the current process.
+
+    Args:
+        source (str): A directory (searched recursively), a glob pattern or a single Markdown file.
+        output_dir (str, optional): Directory for the YAML files, mirroring the source tree.
+            If None, each YAML file is saved next to its Markdown file.
+        force (bool): Convert files even if their YAML is up to date.
+        max_workers (int, optional): Number of worker processes (default: CPU count).
+
+    Returns:
+        dict: {"files", "converted", "skipped", "failed", "bytes", "seconds", "files_per_second", "mb_per_second"}
+    """
+    start = time.perf_counter()
+    root, md_files = find_md_files(source)
+    summary = {"files": len(md_files), "converted": 0, "skipped": 0, "failed": 0, "bytes": 0}
+
+    jobs = []
+    for md_file_path in md_files:
+        yaml_file_path = _yaml_path_for(md_file_path, root, output_dir)
+        if not force and _is_up_to_date(md_file_path, yaml_file_path):
+            summary["skipped"] += 1
+        else:
+            jobs.append((md_file_path, yaml_file_path))
+
+    results = map_in_processes(_convert_file_worker, jobs, max_workers=max_workers, min_jobs=PARALLEL_MIN_FILES)
+    for md_file_path, converted_bytes, error in results:
+        if error:
+            summary["failed"] += 1
+            logger.error(f"Error converting Markdown file to YAML: {md_file_path}: {error}")
+        else:
+            summary["converted"] += 1
+            summary["bytes"] += converted_bytes
+
+    seconds = time.perf_counter() - start
+    summary["seconds"] = round(seconds, 3)
+    summary["files_per_second"] = round(summary["converted"] / seconds, 1) if seconds else 0.0
+    summary["mb_per_second"] = round(summary["bytes"] / 1024 / 1024 / seconds, 2) if seconds else 0.0
+    logger.info(f"Converted {summary['converted']} of {summary['files']} Markdown files to YAML "
+                f"({summary['skipped']} up to date, {summary['failed']} failed) in {summary['seconds']} s: "
+                f"{summary['files_per_second']} files/s, {summary['mb_per_second']} MB/s")
+    return summary
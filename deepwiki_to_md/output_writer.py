@@ -0,0 +1,352 @@
+import atexit
+import logging
+import os
+import queue
+import stat
+import tempfile
+import threading
+from typing import Dict, List, Optional, Sequence, Set, Tuple, Union
+
+from .compression import check_compression, compress_bytes, compressed_path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Sentinel placed on the queue to stop the writer thread
+# 書き込みスレッドを停止するためにキューに入れる番兵
+_STOP = object()
+
+# Content accepted by the writer: text, bytes, or a sequence of bytes-like chunks
+# (e.g. memoryview slices of a larger buffer) that are written back to back without joining.
+# ライターが受け付ける内容: 文字列、バイト列、またはバイト列チャンクのシーケンス
+Content = Union[str, bytes, Sequence[Union[bytes, bytearray, memoryview]]]
+
+
+def _read_umask() -> int:
+    # os.umask can only be read by setting it, so read it once at import time
+    # (before the writer threads start) instead of on every write
+    # os.umaskは設定しないと読めないため、書き込みスレッドの開始前に一度だけ読み取る
+    umask = os.umask(0o022)
+    os.umask(umask)
+    return umask
+
+
+# Mode of new files, as open() would create them
+# open()で作成した場合と同じ新規ファイルのモード
+_NEW_FILE_MODE = 0o666 & ~_read_umask()
+
+
+def content_to_bytes(content: Content, encoding: str = 'utf-8') -> bytes:
+    """
+    Convert writer content (str, bytes or a sequence of chunks) to bytes.
+    ライターのコンテンツ（文字列、バイト列、チャンクのシーケンス）をバイト列に変換する
+    """
+    if isinstance(content, str):
+        return content.encode(encoding)
+    if isinstance(content, (bytes, bytearray, memoryview)):
+        return bytes(content)
+    return b"".join(content)
+
+
+def atomic_write(path: str, data: Content, fsync: bool = False, encoding: str = 'utf-8') -> None:
+    """
+    Write data to a file atomically (temporary file in the same directory + rename).
+    一時ファイルに書き込んでからリネームすることで、ファイルをアトミックに書き込む
+
+    Args:
+        path (str): Destination file path.
+        data (str | bytes | sequence): Content to write. Strings are encoded with the given encoding;
+            sequences of bytes-like chunks are written one after another.
+        fsync (bool): Whether to fsync the temporary file before renaming it.
+        encoding (str): Encoding used when data is a string.
+    """
+    if isinstance(data, str):
+        data = data.encode(encoding)
+    chunks = (data,) if isinstance(data, (bytes, bytearray, memoryview)) else data
+
+    dir_path = os.path.dirname(path) or '.'
+    fd, tmp_path = tempfile.mkstemp(dir=dir_path, prefix=f".{os.path.basename(path)}.", suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(chunks)
+            if fsync:
+                f.flush()
+                os.fsync(f.fileno())
+        # mkstempは0600で作成するため、上書きするファイルのモード（新規ならopen()と同じモード）に合わせる
+        # mkstemp creates the file as 0600; use the mode of the file being replaced,
+        # or the mode open() would give a new file
+        try:
+            mode = stat.S_IMODE(os.stat(path).st_mode)
+        except OSError:
+            mode = _NEW_FILE_MODE
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        # 失敗した場合は一時ファイルを削除する
+        # Remove the temporary file on failure
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+def _fsync_directory(dir_path: str) -> None:
+    """
+    fsync a directory so that renames inside it are durable (no-op where unsupported).
+    ディレクトリをfsyncしてリネームを永続化する（未対応の環境では何もしない）
+    """
+    try:
+        fd = os.open(dir_path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def split_output_path(output_dir: str, path: str) -> Optional[Tuple[str, str]]:
+    """
+    Split a path under the output directory into (library, rest), or return None if it is outside.
+    出力ディレクトリ配下のパスを(ライブラリ, 残りのパス)に分割する（ディレクトリ外の場合はNone）
+
+    For example <output_dir>/cpython/md/1-overview_intro.md becomes ("cpython", "md/1-overview_intro.md").
+    """
+    relative = os.path.relpath(os.path.abspath(path), os.path.abspath(output_dir))
+    parts = relative.replace(os.sep, '/').split('/')
+    if parts[0] == '..' or len(parts) < 2:
+        return None
+    return parts[0], '/'.join(parts[1:])
+
+
+class OutputWriter:
+    """
+    バックグラウンドスレッドでファイルをアトミックに書き込むライター
+    Writer that saves files atomically on a background thread
+
+    Scrapers hand their output to write() and continue fetching; a single worker
+    thread drains the queue, creates directories once, writes each file through a
+    temporary file + rename, and optionally fsyncs in batches.
+    """
+
+    # Whether files end up at their own paths on disk (False for container backends)
+    # ファイルが各パスに書き込まれるかどうか（コンテナ形式のバックエンドではFalse）
+    writes_files = True
+
+    def __init__(self, fsync: bool = False, batch_size: int = 64, max_queue: int = 1024, dedup=None,
+                 compression: Optional[str] = None):
+        """
+        Initialize the OutputWriter.
+
+        Args:
+            fsync (bool): Whether to fsync files (and their directories once per batch) for durability.
+            batch_size (int): Maximum number of queued writes handled per batch.
+            max_queue (int): Maximum number of pending writes before write() blocks.
+            dedup (DedupStore, optional): Content-addressed store; when set, identical files are
+                stored once and materialized as hardlinks.
+            compression (str, optional): "gzip" or "zstd" to store every file compressed
+                (page.md is written as page.md.gz / page.md.zst).
+        """
+        check_compression(compression)
+        self.fsync = fsync
+        self.dedup = dedup
+        self.compression = compression
+        self.batch_size = max(1, batch_size)
+        self.errors: List[Tuple[str, Exception]] = []
+        self._queue: "queue.Queue" = queue.Queue(maxsize=max_queue)
+        self._created_dirs: Set[str] = set()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._closed = False
+        self._batch_dirs: Set[str] = set()
+
+    def _ensure_started(self) -> None:
+        """
+        Start the writer thread on first use.
+        最初の書き込み時に書き込みスレッドを開始する
+        """
+        if self._thread is not None:
+            return
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="OutputWriter", daemon=True)
+                self._thread.start()
+                # プロセス終了時に未書き込みのファイルを書き出す
+                # Drain pending writes when the process exits
+                atexit.register(self.close)
+
+    def write(self, path: str, content: Content, encoding: str = 'utf-8',
+              metadata: Optional[Dict[str, str]] = None) -> str:
+        """
+        Queue a file to be written.
+        ファイルの書き込みをキューに追加する
+
+        Args:
+            path (str): Destination file path.
+            content (str | bytes | sequence): Content to write, or a sequence of bytes-like chunks.
+            encoding (str): Encoding used when content is a string.
+            metadata (dict, optional): Extra fields about the content (library, url, heading).
+                Ignored when writing files; used by indexing backends such as SqliteWriter.
+
+        Returns:
+            str: The path the file is written to (with the compression suffix, if any).
+        """
+        if self._closed:
+            raise RuntimeError("OutputWriter is closed")
+        self._ensure_started()
+        path = compressed_path(path, self.compression)
+        self._queue.put((path, content, encoding, metadata))
+        return path
+
+    def flush(self) -> None:
+        """
+        Block until every queued file has been written.
+        キュー内のすべてのファイルが書き込まれるまで待機する
+        """
+        if self._thread is not None:
+            self._queue.join()
+
+    def close(self) -> None:
+        """
+        Write every queued file and stop the writer thread.
+        キュー内のファイルをすべて書き込み、書き込みスレッドを停止する
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def _ensure_dir(self, dir_path: str) -> None:
+        """
+        Create a directory once; later calls for the same directory are free.
+        ディレクトリを一度だけ作成する（同じディレクトリへの再呼び出しはコストなし）
+        """
+        if dir_path and dir_path not in self._created_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._created_dirs.add(dir_path)
+
+    def _run(self) -> None:
+        """
+        Writer thread main loop: take up to batch_size items and write them.
+        書き込みスレッドのメインループ: 最大batch_size件を取り出して書き込む
+        """
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stop = False
+            self._batch_dirs = set()
+            for item in batch:
+                if item is _STOP:
+                    stop = True
+                    continue
+                path, content, encoding, metadata = item
+                try:
+                    self._write_item(path, content, encoding, metadata)
+                except Exception as e:
+                    logger.error(f"Failed to write {path}: {e}")
+                    self.errors.append((path, e))
+
+            try:
+                self._end_batch(stop)
+            except Exception as e:
+                logger.error(f"Failed to finish write batch: {e}")
+                self.errors.append(("", e))
+
+            for _ in batch:
+                self._queue.task_done()
+
+            if stop:
+                return
+
+    def _write_item(self, path: str, content: Content, encoding: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        """
+        Write one queued file (runs on the writer thread).
+        キューの1ファイルを書き込む（書き込みスレッドで実行）
+        """
+        dir_path = os.path.dirname(path)
+        self._ensure_dir(dir_path)
+        if self.compression is not None:
+            content = compress_bytes(content_to_bytes(content, encoding), self.compression)
+        if self.dedup is not None:
+            self.dedup.materialize(path, content, fsync=self.fsync, encoding=encoding)
+        else:
+            atomic_write(path, content, fsync=self.fsync, encoding=encoding)
+        self._batch_dirs.add(dir_path or '.')
+
+    def _end_batch(self, stopping: bool) -> None:
+        """
+        Finish a batch (runs on the writer thread).
+        バッチを完了する（書き込みスレッドで実行）
+
+        Args:
+            stopping (bool): True if the writer is being closed after this batch.
+        """
+        # リネームを永続化するため、バッチごとにディレクトリを一度だけfsyncする
+        # fsync each directory once per batch so the renames are durable
+        if self.fsync:
+            for dir_path in self._batch_dirs:
+                _fsync_directory(dir_path)
+
+
+def create_writer(output_dir: str, output_format: str = "directory", dedup: bool = False,
+                  fsync: bool = False, compression: Optional[str] = None) -> OutputWriter:
+    """
+    Create the writer for a scraper's output format.
+    出力形式に応じたライターを作成する
+
+    Args:
+        output_dir (str): The base output directory.
+        output_format (str): "directory" (one file per page/section), "zip" or "tar" (one archive per library),
+            "sqlite" (one full-text indexed database per output directory), or "jsonl" / "yaml-stream"
+            (one export file per library with one record per page/section).
+        dedup (bool): Whether to deduplicate identical files (directory format only).
+        fsync (bool): Whether to fsync written files.
+        compression (str, optional): "gzip" or "zstd". Compresses each file in the directory format and
+            the whole file for tar and the export formats; zip archives are always deflate-compressed
+            and the sqlite format stores plain text so it stays searchable.
+
+    Returns:
+        OutputWriter: The writer.
+    """
+    if dedup and output_format != "directory":
+        logger.warning(f"Deduplication is only applied to the directory output format, not {output_format}")
+    if output_format in ("zip", "tar"):
+        from .archive_writer import ArchiveWriter
+        return ArchiveWriter(output_dir, archive_type=output_format, fsync=fsync, compression=compression)
+    if output_format in ("jsonl", "yaml-stream"):
+        from .stream_export import ExportWriter
+        return ExportWriter(output_dir, export_format=output_format, fsync=fsync, compression=compression)
+    if output_format == "sqlite":
+        from .sqlite_writer import SqliteWriter
+        if compression:
+            logger.warning(f"Compression is not applied to the sqlite output format: {compression}")
+        return SqliteWriter(output_dir, fsync=fsync)
+    if output_format != "directory":
+        raise ValueError(f"Invalid output format: {output_format}")
+
+    store = None
+    if dedup:
+        from .dedup_store import DedupStore
+        store = DedupStore(output_dir)
+    return OutputWriter(fsync=fsync, dedup=store, compression=compression)
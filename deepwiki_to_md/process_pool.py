@@ -0,0 +1,60 @@
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def _run_chunk(worker, chunk):
+    return [worker(job) for job in chunk]
+
+
+def map_in_processes(worker, jobs, max_workers=None, min_jobs=1):
+    """
+    Apply worker to every job using a process pool and return the results in order.
+    プロセスプールを使用してすべてのジョブにworkerを適用し、結果を順番に返す
+
+    Batches smaller than min_jobs, and max_workers == 1, run in the current process. Where
+    process pools are unavailable, the jobs also run in the current process, and so do the
+    jobs left unfinished when a worker process dies (e.g. out of memory or killed by a signal).
+
+    Args:
+        worker (callable): Picklable top-level function taking one job.
+        jobs (list): The jobs.
+        max_workers (int, optional): Number of worker processes (default: CPU count).
+        min_jobs (int): Minimum number of jobs for which a process pool is started.
+
+    Returns:
+        iterable: The results, in the order of the jobs.
+    """
+    if len(jobs) < min_jobs or max_workers == 1:
+        return map(worker, jobs)
+    try:
+        chunksize = max(1, len(jobs) // ((max_workers or os.cpu_count() or 1) * 4))
+        chunks = [jobs[start:start + chunksize] for start in range(0, len(jobs), chunksize)]
+        results = []
+        broken = False
+        with ProcessPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(_run_chunk, worker, chunk) for chunk in chunks]
+            for chunk, future in zip(chunks, futures):
+                try:
+                    results.extend(future.result())
+                except BrokenProcessPool as e:
+                    # A worker process died; run the chunks the pool did not finish in this process
+                    # ワーカープロセスが終了したため、プールが完了しなかったチャンクをこのプロセスで実行する
+                    if not broken:
+                        logger.warning(f"A worker process died, running the rest sequentially: {e}")
+                        broken = True
+                    results.extend(_run_chunk(worker, chunk))
+        return results
+    except (OSError, NotImplementedError) as e:
+        # Process pools are unavailable in some environments; fall back to sequential processing
+        # 一部の環境ではプロセスプールが使えないため、逐次処理にフォールバックする
+        logger.warning(f"Process pool unavailable, running sequentially: {e}")
+        return map(worker, jobs)
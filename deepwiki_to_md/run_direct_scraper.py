@@ -21,6 +21,19 @@ def parse_arguments():
     parser.add_argument('--save-html', action='store_true',
                         help=get_message('save_html_help'))
 
+    parser.add_argument('--dedup', action='store_true',
+                        help=get_message('dedup_help'))
+
+    parser.add_argument('--output-format', choices=['directory', 'archive', 'sqlite', 'jsonl', 'yaml-stream'],
+                        default='directory',
+                        help=get_message('output_format_help'))
+
+    parser.add_argument('--archive-type', choices=['zip', 'tar'], default='zip',
+                        help=get_message('archive_type_help'))
+
+    parser.add_argument('--compression', choices=['gzip', 'zstd'],
+                        help=get_message('compression_help'))
+
     parser.add_argument('library_url', nargs='?',
                         help=get_message('direct_library_url_help'))
 
@@ -58,7 +71,9 @@ def main():
 
     # スクレイパーを作成して実行
     # Create and run the scraper
-    scraper = DirectDeepwikiScraper(args.output_dir)
+    output_format = args.archive_type if args.output_format == 'archive' else args.output_format
+    scraper = DirectDeepwikiScraper(args.output_dir, dedup=args.dedup, output_format=output_format,
+                                    compression=args.compression)
 
     try:
         results = scraper.run(libraries)
@@ -73,6 +88,10 @@ def main():
     except requests.exceptions.RequestException as e:
         print(get_message('error', error=e), file=sys.stderr)
         return 1
+    finally:
+        # 保留中の書き込みを完了する（アーカイブも確定する）
+        # Finish all pending writes (and finalize archives)
+        scraper.writer.close()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,60 @@
+import argparse
+import os
+import sqlite3
+import sys
+
+from .localization import get_message
+from .sqlite_writer import database_path, search
+
+
+def parse_arguments(argv=None):
+    """Parse command line arguments."""
+    # """コマンドライン引数を解析する。"""
+    parser = argparse.ArgumentParser(prog='deepwiki-to-md query', description=get_message('query_description'))
+
+    parser.add_argument('query',
+                        help=get_message('query_text_help'))
+
+    parser.add_argument('--output-dir', '-o', default='Documents',
+                        help=get_message('query_dir_help', default='Documents'))
+
+    parser.add_argument('--library', '-l',
+                        help=get_message('query_library_help'))
+
+    parser.add_argument('--limit', '-n', type=int, default=10,
+                        help=get_message('query_limit_help', default=10))
+
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function to search the SQLite output."""
+    # """SQLite出力を検索するメイン関数。"""
+    args = parse_arguments(argv)
+
+    path = database_path(args.output_dir)
+    if not os.path.exists(path):
+        print(get_message('query_database_missing', path=path), file=sys.stderr)
+        return 1
+
+    try:
+        results = search(path, args.query, library=args.library, limit=args.limit)
+    except sqlite3.Error as e:
+        print(get_message('error', error=e), file=sys.stderr)
+        return 1
+
+    if not results:
+        print(get_message('query_no_results', query=args.query))
+        return 0
+
+    for result in results:
+        heading = f" - {result['heading']}" if result['heading'] else ""
+        print(f"[{result['library']}] {result['path']}{heading}")
+        if result['url']:
+            print(f"    {result['url']}")
+        print(f"    {' '.join(result['snippet'].split())}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
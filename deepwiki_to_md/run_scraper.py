@@ -36,6 +36,19 @@ def parse_arguments():
     parser.add_argument('--no-direct-md-scraper', action='store_true',
                         help=get_message('no_direct_md_scraper_help'))
 
+    parser.add_argument('--dedup', action='store_true',
+                        help=get_message('dedup_help'))
+
+    parser.add_argument('--output-format', choices=['directory', 'archive', 'sqlite', 'jsonl', 'yaml-stream'],
+                        default='directory',
+                        help=get_message('output_format_help'))
+
+    parser.add_argument('--archive-type', choices=['zip', 'tar'], default='zip',
+                        help=get_message('archive_type_help'))
+
+    parser.add_argument('--compression', choices=['gzip', 'zstd'],
+                        help=get_message('compression_help'))
+
     # Selenium-related arguments removed - only static requests are supported
     # Selenium関連の引数は削除されました - 静的リクエストのみがサポートされています
 
@@ -65,6 +78,12 @@ def parse_arguments():
 def main():
     """Main function to run the scraper."""
     # """スクレイパーを実行するメイン関数。"""
+    # "deepwiki-to-md query ..." searches the SQLite output instead of scraping
+    # "deepwiki-to-md query ..." はスクレイピングの代わりにSQLite出力を検索する
+    if len(sys.argv) > 1 and sys.argv[1] == 'query':
+        from .run_query import main as query_main
+        return query_main(sys.argv[2:])
+
     args = parse_arguments()
 
     # Format libraries as expected by DeepwikiScraper
@@ -92,7 +111,10 @@ def main():
         output_dir=args.output_dir,
         use_direct_scraper=use_direct_scraper,
         use_alternative_scraper=use_alternative_scraper,
-        use_direct_md_scraper=use_direct_md_scraper
+        use_direct_md_scraper=use_direct_md_scraper,
+        dedup=args.dedup,
+        output_format=args.archive_type if args.output_format == 'archive' else args.output_format,
+        compression=args.compression
     )
 
     try:
@@ -102,6 +124,10 @@ def main():
     except requests.exceptions.RequestException as e:
         print(get_message('error', error=e), file=sys.stderr)
         return 1
+    finally:
+        # Finish all pending writes (and finalize archives)
+        # 保留中の書き込みを完了する（アーカイブも確定する）
+        scraper.writer.close()
 
 
 if __name__ == "__main__":
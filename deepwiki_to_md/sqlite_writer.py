@@ -0,0 +1,228 @@
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from typing import Dict, List, Optional, Set
+
+from .output_writer import Content, OutputWriter, content_to_bytes, split_output_path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Name of the database file created in the output directory
+# 出力ディレクトリに作成するデータベースファイルの名前
+DATABASE_NAME = "deepwiki.sqlite3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sections (
+    id INTEGER PRIMARY KEY,
+    library TEXT NOT NULL,
+    path TEXT NOT NULL UNIQUE,
+    url TEXT NOT NULL DEFAULT '',
+    heading TEXT NOT NULL DEFAULT '',
+    body TEXT NOT NULL,
+    hash TEXT NOT NULL,
+    updated TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS sections_library ON sections (library);
+"""
+
+# External-content FTS5 index kept in sync with the sections table by triggers
+# トリガーでsectionsテーブルと同期する外部コンテンツ方式のFTS5インデックス
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS sections_fts USING fts5(
+    heading, body, content='sections', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS sections_ai AFTER INSERT ON sections BEGIN
+    INSERT INTO sections_fts (rowid, heading, body) VALUES (new.id, new.heading, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_ad AFTER DELETE ON sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, heading, body) VALUES ('delete', old.id, old.heading, old.body);
+END;
+CREATE TRIGGER IF NOT EXISTS sections_au AFTER UPDATE ON sections BEGIN
+    INSERT INTO sections_fts (sections_fts, rowid, heading, body) VALUES ('delete', old.id, old.heading, old.body);
+    INSERT INTO sections_fts (rowid, heading, body) VALUES (new.id, new.heading, new.body);
+END;
+"""
+
+
+def database_path(output_dir: str) -> str:
+    """
+    Return the path of the database for an output directory.
+    出力ディレクトリのデータベースのパスを返す
+    """
+    return os.path.join(output_dir, DATABASE_NAME)
+
+
+def _has_fts(connection: sqlite3.Connection) -> bool:
+    row = connection.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sections_fts'").fetchone()
+    return row is not None
+
+
+def open_database(path: str) -> sqlite3.Connection:
+    """
+    Open (and create if needed) a section database.
+    セクションのデータベースを開く（必要に応じて作成する）
+
+    The FTS5 index is created when the SQLite build supports it; otherwise only the
+    plain table is used and search() falls back to LIKE matching.
+    """
+    connection = sqlite3.connect(path)
+    connection.executescript(_SCHEMA)
+    try:
+        connection.executescript(_FTS_SCHEMA)
+    except sqlite3.OperationalError as e:
+        logger.warning(f"FTS5 is not available, full-text search will use LIKE: {e}")
+    connection.commit()
+    return connection
+
+
+def search(path: str, query: str, library: Optional[str] = None, limit: int = 10) -> List[Dict[str, str]]:
+    """
+    Search a section database.
+    セクションのデータベースを検索する
+
+    Args:
+        path (str): Path of the database file.
+        query (str): FTS5 query (e.g. words, "phrases", prefix*, AND/OR/NOT).
+        library (str, optional): Only return sections of this library.
+        limit (int): Maximum number of results.
+
+    Returns:
+        list: Matches (best first) as dicts with library, path, url, heading and snippet.
+    """
+    connection = sqlite3.connect(path)
+    connection.row_factory = sqlite3.Row
+    try:
+        library_filter = " AND s.library = ?" if library else ""
+        if _has_fts(connection):
+            sql = ("SELECT s.library, s.path, s.url, s.heading, "
+                   "snippet(sections_fts, 1, '**', '**', '...', 16) AS snippet "
+                   "FROM sections_fts JOIN sections s ON s.id = sections_fts.rowid "
+                   f"WHERE sections_fts MATCH ?{library_filter} ORDER BY rank LIMIT ?")
+            params = [query]
+        else:
+            sql = ("SELECT s.library, s.path, s.url, s.heading, substr(s.body, 1, 200) AS snippet "
+                   f"FROM sections s WHERE (s.heading LIKE ? OR s.body LIKE ?){library_filter} LIMIT ?")
+            params = [f"%{query}%", f"%{query}%"]
+        if library:
+            params.append(library)
+        params.append(limit)
+        return [dict(row) for row in connection.execute(sql, params)]
+    finally:
+        connection.close()
+
+
+class SqliteWriter(OutputWriter):
+    """
+    ページとセクションを全文検索インデックス付きのSQLiteデータベースに保存するライター
+    Writer that stores pages and sections in one SQLite database with a full-text index
+
+    Every Markdown file handed to write() becomes a row of the sections table in
+    <output_dir>/deepwiki.sqlite3 (library, path, page URL, heading, body and hash),
+    indexed by FTS5. The path relative to the output directory is the key, so
+    re-scraping a library updates rows in place, and rows whose hash is unchanged are
+    not rewritten. When the writer is closed, rows of the libraries written in this run
+    that the run did not write (pages gone from the wiki) are deleted, so the database
+    matches the current crawl as the directory output does. Each batch taken from the
+    queue is one transaction. Files that are not Markdown (e.g. saved HTML) are written
+    as regular files.
+    """
+
+    writes_files = False
+
+    def __init__(self, output_dir: str, fsync: bool = False, batch_size: int = 256, max_queue: int = 1024):
+        """
+        Initialize the SqliteWriter.
+
+        Args:
+            output_dir (str): The base output directory; the database is created directly inside it.
+            fsync (bool): Whether to use synchronous=FULL for the database (and fsync regular files).
+            batch_size (int): Maximum number of queued writes committed per transaction.
+            max_queue (int): Maximum number of pending writes before write() blocks.
+        """
+        super().__init__(fsync=fsync, batch_size=batch_size, max_queue=max_queue)
+        self.output_dir = output_dir
+        self.path = database_path(output_dir)
+        self._connection: Optional[sqlite3.Connection] = None
+        # Paths written in this run, per library directory (used to delete stale rows)
+        # この実行で書き込んだパス（ライブラリのディレクトリごと、古い行の削除に使用）
+        self._written: Dict[str, Set[str]] = {}
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Open the database on the writer thread (connections are bound to their thread).
+        書き込みスレッドでデータベースを開く（接続はスレッドに紐づくため）
+        """
+        if self._connection is None:
+            self._ensure_dir(self.output_dir)
+            self._connection = open_database(self.path)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(f"PRAGMA synchronous={'FULL' if self.fsync else 'NORMAL'}")
+        return self._connection
+
+    def _write_item(self, path: str, content: Content, encoding: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        split = split_output_path(self.output_dir, path)
+        if split is None or not path.endswith('.md'):
+            super()._write_item(path, content, encoding)
+            return
+
+        library, relative_path = split
+        metadata = metadata or {}
+        data = content_to_bytes(content, encoding)
+        digest = hashlib.sha256(data).hexdigest()
+        connection = self._connect()
+        self._written.setdefault(library, set()).add(f"{library}/{relative_path}")
+
+        row = connection.execute("SELECT id, hash FROM sections WHERE path = ?",
+                                 (f"{library}/{relative_path}",)).fetchone()
+        if row is not None and row[1] == digest:
+            return
+
+        values = (metadata.get("library") or library, metadata.get("url") or "", metadata.get("heading") or "",
+                  data.decode(encoding), digest, time.strftime("%Y-%m-%d %H:%M:%S"))
+        if row is None:
+            connection.execute(
+                "INSERT INTO sections (library, url, heading, body, hash, updated, path) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                values + (f"{library}/{relative_path}",))
+        else:
+            connection.execute(
+                "UPDATE sections SET library = ?, url = ?, heading = ?, body = ?, hash = ?, updated = ? WHERE id = ?",
+                values + (row[0],))
+
+    def _end_batch(self, stopping: bool) -> None:
+        # バッチ全体を1つのトランザクションとしてコミットする
+        # Commit the whole batch as one transaction
+        if self._connection is not None:
+            if stopping:
+                self._delete_stale_rows()
+            self._connection.commit()
+            if stopping:
+                self._connection.close()
+                self._connection = None
+                logger.info(f"Saved database: {self.path}")
+        super()._end_batch(stopping)
+
+    def _delete_stale_rows(self) -> None:
+        """
+        Delete the rows of the libraries written in this run that the run did not write.
+        この実行で書き込んだライブラリの行のうち、この実行で書き込まなかった行を削除する
+        """
+        for library, written in self._written.items():
+            prefix = f"{library}/"
+            rows = self._connection.execute("SELECT id, path FROM sections WHERE substr(path, 1, ?) = ?",
+                                            (len(prefix), prefix)).fetchall()
+            stale = [(row_id,) for row_id, path in rows if path not in written]
+            if stale:
+                # 削除トリガーがFTSインデックスからも取り除く
+                # The delete trigger also removes them from the FTS index
+                self._connection.executemany("DELETE FROM sections WHERE id = ?", stale)
+                logger.info(f"Removed {len(stale)} stale sections of {library} from {self.path}")
+        self._written.clear()
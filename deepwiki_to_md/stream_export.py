@@ -0,0 +1,232 @@
+import gzip
+import json
+import logging
+import os
+from typing import Dict, Optional
+
+from .compression import check_compression, compressed_path, read_text, zstd_stream_writer
+from .md_to_yaml import dump_yaml, find_md_files, markdown_to_dict
+from .output_writer import Content, OutputWriter, atomic_write, content_to_bytes, split_output_path
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Supported export formats and their file extensions
+# 対応するエクスポート形式とファイル拡張子
+EXPORT_FORMATS = {
+    "jsonl": ".jsonl",
+    "yaml-stream": ".yaml",
+}
+
+
+def export_record(markdown_content: str, library: Optional[str] = None, path: Optional[str] = None,
+                  url: Optional[str] = None, heading: Optional[str] = None) -> Dict:
+    """
+    Build one export record: the markdown_to_yaml schema plus where the content came from.
+    エクスポートの1レコードを作成する（markdown_to_yamlのスキーマと出所の情報）
+
+    Args:
+        markdown_content (str): The Markdown content of a page or section.
+        library (str, optional): Library name.
+        path (str, optional): Path of the page/section relative to the output directory.
+        url (str, optional): URL (or URL path) of the page.
+        heading (str, optional): Heading of the section.
+
+    Returns:
+        dict: The record (fields that are None are left out).
+    """
+    record = {key: value for key, value in
+              (("library", library), ("path", path), ("url", url), ("heading", heading)) if value is not None}
+    record.update(markdown_to_dict(markdown_content))
+    return record
+
+
+class StreamExporter:
+    """
+    1つのJSONLまたはマルチドキュメントYAMLファイルにレコードを逐次書き込むエクスポーター
+    Exporter that writes records one by one to a single JSONL or multi-document YAML file
+
+    Each record is serialized and written as soon as it is added, so memory use does
+    not grow with the number of pages. The file is written under a temporary name
+    and renamed by close(), so readers never see a partial export.
+    """
+
+    def __init__(self, path: str, export_format: str = "jsonl", compression: Optional[str] = None):
+        """
+        Initialize the StreamExporter.
+
+        Args:
+            path (str): Destination file path.
+            export_format (str): "jsonl" (one JSON object per line) or "yaml-stream" (one YAML document per record).
+            compression (str, optional): "gzip" or "zstd" to compress the stream (the suffix is added to path).
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format: {export_format}. Use one of {', '.join(EXPORT_FORMATS)}.")
+        check_compression(compression)
+        self.path = compressed_path(path, compression)
+        self.export_format = export_format
+        self.count = 0
+        self._closed = False
+        self._tmp_path = f"{self.path}.tmp"
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        self._file = open(self._tmp_path, 'wb')
+        if compression == "gzip":
+            self._stream = gzip.GzipFile(fileobj=self._file, mode='wb', mtime=0)
+        elif compression == "zstd":
+            self._stream = zstd_stream_writer(self._file)
+        else:
+            self._stream = self._file
+
+    def add(self, markdown_content: str, **fields) -> None:
+        """
+        Add the record of one page or section (see export_record for the fields).
+        1ページまたは1セクションのレコードを追加する
+        """
+        self.add_record(export_record(markdown_content, **fields))
+
+    def add_record(self, record: Dict) -> None:
+        """
+        Serialize and write one record.
+        1レコードをシリアライズして書き込む
+        """
+        if self.export_format == "jsonl":
+            text = json.dumps(record, ensure_ascii=False) + "\n"
+        else:
+            text = "---\n" + dump_yaml(record)
+        self._stream.write(text.encode('utf-8'))
+        self.count += 1
+
+    def close(self, fsync: bool = False) -> str:
+        """
+        Finish the export and move it into place.
+        エクスポートを完了してファイルを配置する
+
+        Returns:
+            str: The path of the export file.
+        """
+        if self._closed:
+            return self.path
+        self._closed = True
+        if self._stream is not self._file:
+            self._stream.close()
+        self._file.close()
+        if fsync:
+            with open(self._tmp_path, 'rb') as f:
+                os.fsync(f.fileno())
+        os.replace(self._tmp_path, self.path)
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            # 失敗した場合は一時ファイルを削除する
+            # Remove the temporary file on failure
+            self._closed = True
+            self._file.close()
+            try:
+                os.remove(self._tmp_path)
+            except OSError:
+                pass
+
+
+def export_markdown_tree(source: str, output_path: str, export_format: str = "jsonl",
+                         compression: Optional[str] = None) -> int:
+    """
+    Stream every Markdown file of a directory tree or glob pattern into one export file.
+    ディレクトリツリーまたはglobパターンのMarkdownファイルをすべて1つのエクスポートファイルに書き込む
+
+    Args:
+        source (str): A directory (searched recursively), a glob pattern or a single Markdown file.
+        output_path (str): Destination file path.
+        export_format (str): "jsonl" or "yaml-stream".
+        compression (str, optional): "gzip" or "zstd" to compress the export.
+
+    Returns:
+        int: Number of records written.
+    """
+    root, md_files = find_md_files(source)
+    with StreamExporter(output_path, export_format, compression=compression) as exporter:
+        for md_file_path in md_files:
+            relative_path = os.path.relpath(md_file_path, root).replace(os.sep, '/')
+            parts = relative_path.split('/')
+            library = parts[0] if len(parts) > 1 else os.path.basename(os.path.abspath(root))
+            exporter.add(read_text(md_file_path), library=library, path=relative_path)
+    logger.info(f"Exported {exporter.count} records to {exporter.path}")
+    return exporter.count
+
+
+class ExportWriter(OutputWriter):
+    """
+    ライブラリごとに1つのJSONL/マルチドキュメントYAMLファイルへ出力をストリーミングするライター
+    Writer that streams every page and section of a library into one JSONL or multi-document YAML file
+
+    Used by the scrapers for the "jsonl" and "yaml-stream" output formats: each Markdown
+    file handed to write() becomes one record of <output_dir>/<library>.jsonl (or .yaml),
+    with the library, path, page URL and heading passed as metadata. Records are written
+    as they arrive and the files are moved into place when the writer is closed. Files
+    that are not Markdown (e.g. saved HTML) are written as regular files.
+    """
+
+    writes_files = False
+
+    def __init__(self, output_dir: str, export_format: str = "jsonl", fsync: bool = False,
+                 batch_size: int = 64, max_queue: int = 1024, compression: Optional[str] = None):
+        """
+        Initialize the ExportWriter.
+
+        Args:
+            output_dir (str): The base output directory; export files are created directly inside it.
+            export_format (str): "jsonl" or "yaml-stream".
+            fsync (bool): Whether to fsync export files when they are finalized.
+            batch_size (int): Maximum number of queued writes handled per batch.
+            max_queue (int): Maximum number of pending writes before write() blocks.
+            compression (str, optional): "gzip" or "zstd" to compress each export file.
+        """
+        if export_format not in EXPORT_FORMATS:
+            raise ValueError(f"Invalid export format: {export_format}. Use one of {', '.join(EXPORT_FORMATS)}.")
+        check_compression(compression)
+        super().__init__(fsync=fsync, batch_size=batch_size, max_queue=max_queue)
+        self.output_dir = output_dir
+        self.export_format = export_format
+        self.export_compression = compression
+        self._exporters: Dict[str, StreamExporter] = {}
+
+    def _write_item(self, path: str, content: Content, encoding: str,
+                    metadata: Optional[Dict[str, str]] = None) -> None:
+        split = split_output_path(self.output_dir, path)
+        if split is None or not path.endswith('.md'):
+            self._ensure_dir(os.path.dirname(path))
+            atomic_write(path, content, fsync=self.fsync, encoding=encoding)
+            return
+
+        library, relative_path = split
+        exporter = self._exporters.get(library)
+        if exporter is None:
+            export_path = os.path.join(self.output_dir, f"{library}{EXPORT_FORMATS[self.export_format]}")
+            exporter = StreamExporter(export_path, self.export_format, compression=self.export_compression)
+            self._exporters[library] = exporter
+
+        metadata = metadata or {}
+        exporter.add(content_to_bytes(content, encoding).decode(encoding),
+                     library=metadata.get("library") or library,
+                     path=f"{library}/{relative_path}",
+                     url=metadata.get("url"),
+                     heading=metadata.get("heading"))
+
+    def _end_batch(self, stopping: bool) -> None:
+        if not stopping:
+            return
+        # 書き込み終了時にエクスポートファイルを確定する
+        # When closing, move every export file into place
+        for library, exporter in list(self._exporters.items()):
+            path = exporter.close(fsync=self.fsync)
+            logger.info(f"Saved export: {path} ({exporter.count} records)")
+            del self._exporters[library]
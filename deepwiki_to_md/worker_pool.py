@@ -0,0 +1,83 @@
+import logging
+import queue
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def run_worker_pool(jobs, workers, start_worker, handle_job, handle_error=None, thread_name_prefix="Worker"):
+    """
+    Run jobs on a pool of threads that each own one resource, such as a browser.
+    それぞれが1つのリソース（ブラウザなど）を持つスレッドのプールでジョブを実行する
+
+    Each thread starts its resource once and reuses it for the jobs it takes from a shared
+    queue, so at most `workers` resources exist at the same time. When a resource fails to
+    start, the other threads take over its jobs. When a job raises, its error is recorded
+    through handle_error and the thread restarts its resource (it may be a dead browser)
+    before taking the next job.
+
+    Args:
+        jobs (list): The jobs.
+        workers (int): Maximum number of threads (and resources).
+        start_worker (callable): Called with the worker number; returns a resource with close().
+        handle_job (callable): Called with the resource and a job; returns the job's result.
+        handle_error (callable, optional): Called with a job and the exception it raised; returns
+            the job's result. Without it, the result of a failed job is None.
+        thread_name_prefix (str): Prefix of the thread names.
+
+    Returns:
+        list: The results, in the order of the jobs; None for jobs that no thread could take.
+    """
+    pending = queue.Queue()
+    for index, job in enumerate(jobs):
+        pending.put((index, job))
+    results = [None] * len(jobs)
+    workers = min(workers, len(jobs))
+
+    def start(number):
+        try:
+            return start_worker(number)
+        except Exception as e:
+            # 起動できなかったリソースの分は他のワーカーが処理する
+            # The other workers take over the jobs of a resource that failed to start
+            logger.error(f"ワーカーを起動できませんでした: {e}")
+            logger.error(f"Failed to start a worker: {e}")
+            return None
+
+    def close(resource):
+        try:
+            resource.close()
+        except Exception as e:
+            logger.warning(f"ワーカーを終了できませんでした: {e}")
+            logger.warning(f"Failed to close a worker: {e}")
+
+    def worker(number):
+        resource = start(number)
+        while resource is not None:
+            try:
+                index, job = pending.get_nowait()
+            except queue.Empty:
+                break
+            try:
+                results[index] = handle_job(resource, job)
+            except Exception as e:
+                # 1つのジョブの失敗でバッチ全体を止めず、エラーを記録して次のジョブに進む
+                # Record the error of this job and go on instead of aborting the whole batch
+                logger.error(f"ジョブが失敗しました: {e}")
+                logger.error(f"A job failed: {e}")
+                results[index] = handle_error(job, e) if handle_error else None
+                close(resource)
+                resource = start(number)
+        if resource is not None:
+            close(resource)
+
+    if workers > 0:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix=thread_name_prefix) as executor:
+            for future in [executor.submit(worker, number) for number in range(workers)]:
+                future.result()
+    return results
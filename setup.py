@@ -38,6 +38,7 @@ setup(
             "deepwiki-to-md=deepwiki_to_md.run_scraper:main",
             "deepwiki-create=deepwiki_to_md.create:main",
             "deepwiki-chat=deepwiki_to_md.chat:main",
+            "deepwiki-browser=deepwiki_to_md.browser_daemon:main",
         ],
     },
 )